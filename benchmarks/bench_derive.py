@@ -0,0 +1,77 @@
+"""
+Compare metric derivation paths on a tiled copy of ``paid.daily_metrics``.
+
+* precomputed: read the ratio columns the export already ships;
+* vectorized:  ``recho.derive`` over the raw measures;
+* apply:       per-row ``DataFrame.apply`` as app.py used to do.
+
+Usage: python benchmarks/bench_derive.py [--source dashboard_metrics.json] [--scale 100]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from recho.derive import aggregate, daily_totals, rolling_roas, with_ratios  # noqa: E402
+from recho.store import MetricsStore  # noqa: E402
+
+
+def tiled(df, scale):
+    """``df`` repeated ``scale`` times with the dates shifted past each other."""
+    span = df["date"].max() - df["date"].min() + pd.Timedelta(days=1)
+    parts = [df.assign(date=df["date"] + span * i) for i in range(scale)]
+    return pd.concat(parts, ignore_index=True)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def per_row(df):
+    out = df.copy()
+    out["ctr"] = df.apply(lambda r: r["clicks"] / r["impressions"] * 100 if r["impressions"] else 0, axis=1)
+    out["cpa"] = df.apply(lambda r: r["spend"] / r["conversions"] if r["conversions"] else 0, axis=1)
+    out["roas"] = df.apply(lambda r: r["revenue"] / r["spend"] if r["spend"] else 0, axis=1)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", default="dashboard_metrics.json")
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    df = tiled(MetricsStore.from_json(args.source).frame("paid.daily_metrics"), args.scale)
+    print(f"{len(df):,} daily rows")
+
+    cases = {
+        "precomputed ratios": lambda: df[["ctr", "cpa", "roas"]].to_numpy(),
+        "vectorized ratios": lambda: with_ratios(df),
+        "vectorized campaigns": lambda: aggregate(df, "campaign_name"),
+        "vectorized rolling ROAS": lambda: rolling_roas(daily_totals(df)),
+        "per-row apply": lambda: per_row(df),
+    }
+    for name, fn in cases.items():
+        # apply is orders of magnitude slower; one run is enough to show it
+        repeat = 1 if name == "per-row apply" else args.repeat
+        print(f"{name:<26}{timed(fn, repeat) * 1000:>10.2f} ms")
+
+    derived = with_ratios(df)
+    drift = np.nanmax(np.abs(derived["roas"] - df["roas"]))
+    print(f"max |roas - precomputed roas|: {drift:.4f}")
+
+
+if __name__ == "__main__":
+    main()
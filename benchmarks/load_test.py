@@ -0,0 +1,164 @@
+"""
+Concurrent-session load test.
+
+Simulates N viewers in one process, the way Streamlit serves them: every
+session is an ``AppTest`` with its own session state, while
+``st.cache_resource`` (store, indexes, figure cache) is shared. All N
+sessions are opened and kept alive, then each clicks through pages, date
+ranges and an account filter in random interleaved order. ``AppTest``
+installs a process-global runtime for every run, so reruns execute one at a
+time; latencies are per rerun, not under CPU contention. Reported:
+
+* p50 / p95 / p99 rerun latency over all sessions;
+* process RSS before, at peak and with every session still open, and the
+  growth per open session;
+* the largest per-session state, to confirm sessions hold only view state.
+
+Usage: python benchmarks/load_test.py --sessions 50 100 200 [--data PATH]
+"""
+
+import argparse
+import os
+import pickle
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from recho.filters import DATE_RANGES  # noqa: E402
+from recho.pages import PAGES  # noqa: E402
+
+APP = os.path.join(ROOT, "app.py")
+
+
+def rss_mb():
+    """Current resident set size (Linux ``/proc``; 0 elsewhere)."""
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+class _RssSampler(threading.Thread):
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = rss_mb()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, rss_mb())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def _state_bytes(at):
+    total = 0
+    for key in at.session_state:
+        try:
+            total += len(pickle.dumps(at.session_state[key]))
+        except Exception:  # widgets can hold unpicklable values
+            continue
+    return total
+
+
+def _timed(at, run, latencies):
+    started = time.perf_counter()
+    run()
+    latencies.append(time.perf_counter() - started)
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def open_session(timeout, latencies):
+    """A new viewer after its first run."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    _timed(at, at.run, latencies)
+    return at
+
+
+def interact(at, rng, latencies):
+    """One random page, range or account change."""
+    action = rng.choice(("page", "range", "account"))
+    if action == "page":
+        widget = at.sidebar.radio[0].set_value(rng.choice(list(PAGES)))
+    elif action == "range":
+        widget = at.selectbox[0].set_value(rng.choice(list(DATE_RANGES)))
+    else:
+        accounts = at.multiselect[0].options[1:]
+        widget = at.multiselect[0].set_value(rng.sample(accounts, rng.randint(1, len(accounts))))
+    _timed(at, widget.run, latencies)
+
+
+def run(n_sessions, steps, timeout, seed=0):
+    rng = random.Random(seed)
+    before = rss_mb()
+    sampler = _RssSampler()
+    sampler.start()
+    started = time.perf_counter()
+    latencies = []
+    sessions = [open_session(timeout, latencies) for _ in range(n_sessions)]
+    turns = [at for at in sessions for _ in range(steps)]
+    rng.shuffle(turns)
+    for at in turns:
+        interact(at, rng, latencies)
+    elapsed = time.perf_counter() - started
+    sampler.stop()
+    max_state = max(_state_bytes(at) for at in sessions)
+    rss_live = rss_mb()
+    del sessions, turns
+    latencies = np.array(latencies) * 1000
+    return {
+        "sessions": n_sessions,
+        "reruns": len(latencies),
+        "seconds": elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "rss_before_mb": before,
+        "rss_peak_mb": sampler.peak,
+        "rss_live_mb": rss_live,
+        "max_state_bytes": max_state,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent dashboard sessions.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--steps", type=int, default=5, help="interactions per session")
+    parser.add_argument("--data", help="source to serve (sets RECHO_DATA)")
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args(argv)
+
+    if args.data:
+        os.environ["RECHO_DATA"] = os.path.abspath(args.data)
+    os.chdir(ROOT)
+
+    # Warm the shared resources once, as a running server would have.
+    open_session(args.timeout, [])
+
+    print(f"{'sessions':>8} {'reruns':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'live MB':>8} {'peak MB':>8} {'MB/sess':>8} {'state B':>8}")
+    for n in args.sessions:
+        r = run(n, args.steps, args.timeout)
+        per_session = (r["rss_live_mb"] - r["rss_before_mb"]) / n
+        print(f"{n:>8} {r['reruns']:>7} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['p99_ms']:>8.0f} "
+              f"{r['rss_live_mb']:>8.0f} {r['rss_peak_mb']:>8.0f} {per_session:>8.2f} {r['max_state_bytes']:>8,}")
+
+
+if __name__ == "__main__":
+    main()
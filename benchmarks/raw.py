@@ -0,0 +1,206 @@
+"""
+Synthetic raw exports for ``recho.pipeline`` at a multiple of the real size.
+
+Writes ``posts``, ``accounts``, ``ad_days``, ``campaigns``, ``mentions`` and
+``sessions`` exports (see ``recho.pipeline.RAW``) shaped after the seed
+``dashboard_metrics.json``: its accounts, campaigns and subreddits repeated
+``scale`` times under new names, as in ``benchmarks/synth.py``, over the
+seed's date range. Posts and sessions are written as NDJSON, the others as
+CSV, so both readers are exercised; ``--parts N`` splits the large exports
+into N part files in a directory each.
+
+Usage: python benchmarks/raw.py --scale 100 [--posts-per-account 200] [--mentions 100000] [--users 10000] [--parts 4] [--out DIR]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synth import CONVERSION_RATE, DEFAULT_DIR, MEAN_GAP_DAYS, MEAN_SESSIONS, PAID_SHARE, mentions  # noqa: E402
+
+ACCOUNT_TYPES = ("brand", "team_member")
+
+
+def default_dir(scale):
+    return os.path.join(DEFAULT_DIR, f"raw_{scale}x")
+
+
+def _names(names, scale):
+    return [name if copy == 0 else f"{name}_{copy}" for copy in range(scale) for name in names]
+
+
+def _days(document):
+    dates = pd.to_datetime([row["date"] for row in document["paid"]["daily_metrics"]]).normalize()
+    return pd.date_range(dates.min(), dates.max(), freq="D")
+
+
+def posts(document, scale, per_account, rng):
+    accounts = _names([row["account_name"] for row in document["accounts"]["comparison"]], scale)
+    subreddits = _names([row["subreddit"] for row in document["organic"]["subreddit_performance"]], scale)
+    days = _days(document)
+    n = len(accounts) * per_account
+    impressions = rng.lognormal(8, 0.8, n).astype(np.int64)
+    upvotes = rng.binomial(impressions, 0.06)
+    return pd.DataFrame({
+        "post_id": [f"post_{i}" for i in range(n)],
+        "account_name": np.repeat(accounts, per_account),
+        "subreddit": np.array(subreddits)[rng.integers(0, len(subreddits), n)],
+        "post_date": (days.values[rng.integers(0, len(days), n)]
+                      + (rng.random(n) * 86_400e9).astype("timedelta64[ns]")),
+        "title": [f"Post {i}" for i in range(n)],
+        "impressions": impressions,
+        "upvotes": upvotes,
+        "downvotes": rng.binomial(upvotes + 1, 0.15),
+        "comments": rng.binomial(impressions, 0.01),
+        "clicks": rng.binomial(impressions, 0.008),
+        "karma": upvotes,
+    })
+
+
+def accounts(document, scale, rng):
+    names = _names([row["account_name"] for row in document["accounts"]["comparison"]], scale)
+    n = len(names)
+    first = _days(document)[0]
+    return pd.DataFrame({
+        "account_name": names,
+        "account_type": np.array(ACCOUNT_TYPES)[rng.integers(0, len(ACCOUNT_TYPES), n)],
+        "created": first - pd.to_timedelta(rng.integers(30, 2000, n), unit="D"),
+        "comment_karma": rng.integers(0, 10_000, n),
+        "total_comments": rng.integers(0, 3_000, n),
+        "followers": rng.integers(0, 5_000, n),
+    })
+
+
+def ad_days(document, scale, rng):
+    seed = document["paid"]["campaign_summary"]
+    ids = _names([row["campaign_id"] for row in seed], scale)
+    names = _names([row["campaign_name"] for row in seed], scale)
+    subreddits = _names([row["subreddit"] for row in document["paid"]["subreddit_performance"]], scale)
+    days = _days(document)
+    # Every campaign runs in three subreddits every day.
+    campaign = np.repeat(np.arange(len(ids)), len(days) * 3)
+    n = len(campaign)
+    impressions = rng.lognormal(9, 0.6, n).astype(np.int64)
+    clicks = rng.binomial(impressions, 0.011)
+    conversions = rng.binomial(clicks, 0.03)
+    return pd.DataFrame({
+        "date": np.tile(np.repeat(days.values, 3), len(ids)),
+        "campaign_id": np.array(ids)[campaign],
+        "campaign_name": np.array(names)[campaign],
+        "subreddit": np.array(subreddits)[rng.integers(0, len(subreddits), n)],
+        "impressions": impressions,
+        "clicks": clicks,
+        "spend": np.round(clicks * rng.uniform(0.6, 1.1, n), 2),
+        "conversions": conversions,
+        "revenue": np.round(conversions * rng.lognormal(4.4, 0.3, n), 2),
+    })
+
+
+def campaigns(ads, rng):
+    spend = ads.groupby("campaign_name")["spend"].sum()
+    return pd.DataFrame({"campaign_name": spend.index, "budget": np.round(spend.to_numpy() * rng.uniform(0.8, 1.3, len(spend)), 2)})
+
+
+def sessions(document, scale, n_users, rng):
+    subreddits = _names([row["subreddit"] for row in document["traffic"]["by_subreddit"]], scale)
+    names = _names([row["campaign_name"] for row in document["paid"]["campaign_summary"]], scale)
+    days = _days(document)
+    first, last = days[0], days[-1] + pd.Timedelta(days=1)
+
+    per_user = 1 + rng.poisson(MEAN_SESSIONS - 1, n_users)
+    n = int(per_user.sum())
+    users = np.repeat(np.arange(n_users), per_user)
+    start = first.value + (rng.random(n_users) * (last - first).value).astype(np.int64)
+    gaps = (rng.exponential(MEAN_GAP_DAYS, n) * 86_400e9).astype(np.int64)
+    offsets = np.cumsum(gaps) - np.repeat(np.cumsum(gaps)[np.cumsum(per_user) - per_user], per_user)
+    times = np.minimum(np.repeat(start, per_user) + offsets, last.value - 1)
+
+    paid = rng.random(n) < PAID_SHARE
+    converted = rng.random(n) < CONVERSION_RATE
+    bounced = rng.random(n) < 0.45
+    return pd.DataFrame({
+        "user_id": [f"u{u:07d}" for u in users],
+        "date": pd.to_datetime(times),
+        "source": "reddit",
+        "medium": np.where(paid, "paid", "organic"),
+        "subreddit": np.array(subreddits)[rng.integers(0, len(subreddits), n)],
+        "campaign": np.where(paid, np.array(names)[rng.integers(0, len(names), n)], None),
+        "pageviews": np.where(bounced, 1, 2 + rng.poisson(3, n)),
+        "new_user": (np.arange(n) == np.repeat(np.cumsum(per_user) - per_user, per_user)).astype(int),
+        "bounced": bounced.astype(int),
+        "duration_seconds": np.where(bounced, 0, rng.exponential(240, n).astype(int)),
+        "conversions": converted.astype(int),
+        "revenue": np.where(converted, np.round(rng.lognormal(4.4, 0.5, n), 2), 0.0),
+    })
+
+
+def _write(df, out, name, fmt, parts):
+    """``df`` as ``out/name.fmt``, or ``parts`` files in ``out/name/``."""
+    df = df.assign(**{
+        col: df[col].dt.strftime("%Y-%m-%dT%H:%M:%S")
+        for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])
+    })
+    if parts > 1:
+        folder = os.path.join(out, name)
+        os.makedirs(folder, exist_ok=True)
+        targets = [
+            (os.path.join(folder, f"part-{i:04d}.{fmt}"), df.iloc[rows])
+            for i, rows in enumerate(np.array_split(np.arange(len(df)), parts))
+        ]
+    else:
+        targets = [(os.path.join(out, f"{name}.{fmt}"), df)]
+    for path, chunk in targets:
+        if fmt == "csv":
+            chunk.to_csv(path, index=False)
+        else:
+            chunk.to_json(path, orient="records", lines=True)
+
+
+def generate(scale, seed="dashboard_metrics.json", out=None, per_account=200, n_mentions=0, n_users=0, parts=1):
+    """Write the raw exports for ``scale`` (if they are not there yet) and return the directory."""
+    out = out or default_dir(scale)
+    if os.path.exists(out):
+        return out
+    with open(seed, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    rng = np.random.default_rng(0)
+    tmp = out + ".tmp"
+    os.makedirs(tmp, exist_ok=True)
+    ads = ad_days(document, scale, rng)
+    _write(posts(document, scale, per_account, rng), tmp, "posts", "ndjson", parts)
+    _write(accounts(document, scale, rng), tmp, "accounts", "csv", 1)
+    _write(ads, tmp, "ad_days", "csv", parts)
+    _write(campaigns(ads, rng), tmp, "campaigns", "csv", 1)
+    if n_mentions:
+        _write(pd.DataFrame(mentions(document, n_mentions * scale)), tmp, "mentions", "ndjson", parts)
+    if n_users:
+        _write(sessions(document, scale, n_users * scale, rng), tmp, "sessions", "ndjson", parts)
+    os.replace(tmp, out)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write scaled synthetic raw exports for recho.pipeline.")
+    parser.add_argument("--scale", type=int, required=True)
+    parser.add_argument("--posts-per-account", type=int, default=200)
+    parser.add_argument("--mentions", type=int, default=0, metavar="N", help="raw mentions per copy")
+    parser.add_argument("--users", type=int, default=0, metavar="USERS", help="users with sessions per copy")
+    parser.add_argument("--parts", type=int, default=1, help="part files per large export")
+    parser.add_argument("--seed", default="dashboard_metrics.json")
+    parser.add_argument("--out")
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    path = generate(args.scale, args.seed, args.out, args.posts_per_account, args.mentions, args.users, args.parts)
+    size = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+    print(f"{path}: {size / 2**20:,.1f} MiB in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Load, transform and render benchmarks for every dashboard page.
+
+For each scale the synthetic export is generated (``benchmarks/synth.py``)
+and every page is measured in a fresh interpreter, so peak RSS and cold
+caches belong to that page alone:
+
+* ``json_load_s``    streaming parse of the export (``iter_events``);
+* ``frames_s``       building the typed columnar store on top of the parse;
+* ``figures_s``      time spent inside chart builders on the cold run;
+* ``cold_run_s``     first headless ``AppTest`` run of the page, load included;
+* ``warm_run_s``     an identical rerun (cached data and figures);
+* ``peak_rss_mb``    peak resident set size of the worker process.
+
+Results are written to ``benchmarks/results/<label>.json``. With
+``--baseline`` any metric more than ``--threshold`` times slower than the
+baseline fails the run, so a regression in one page is caught before deploy.
+
+Usage:
+    python benchmarks/run.py --scales 1 100 [--pages Overview "Paid Ads"]
+    python benchmarks/run.py --scales 1 100 --baseline benchmarks/results/baseline.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synth import generate  # noqa: E402
+from recho.pages import PAGES  # noqa: E402
+
+APP = os.path.join(ROOT, "app.py")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+TIMINGS = ("json_load_s", "frames_s", "figures_s", "cold_run_s", "warm_run_s")
+# Short timings are dominated by noise; they are not compared below this.
+MIN_COMPARED_S = 0.05
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def measure(path, page, timeout):
+    """Measure one page against one export; runs inside a worker process."""
+    from streamlit.testing.v1 import AppTest
+
+    from recho.figure_cache import FigureCache
+    from recho.ingest import Ingestor, iter_events
+
+    started = time.perf_counter()
+    for _ in iter_events(path):
+        pass
+    json_load = time.perf_counter() - started
+
+    started = time.perf_counter()
+    Ingestor(path, use_disk_cache=False)
+    frames = max(time.perf_counter() - started - json_load, 0.0)
+    gc.collect()
+
+    figure_seconds = []
+    original_get = FigureCache.get
+
+    def timed_get(self, key, build):
+        def timed_build():
+            started = time.perf_counter()
+            try:
+                return build()
+            finally:
+                figure_seconds.append(time.perf_counter() - started)
+        return original_get(self, key, timed_build)
+
+    FigureCache.get = timed_get
+
+    os.environ["RECHO_DATA"] = path
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.session_state["page"] = page
+    started = time.perf_counter()
+    at.run()
+    cold_run = time.perf_counter() - started
+    figures = sum(figure_seconds)
+
+    started = time.perf_counter()
+    at.run()
+    warm_run = time.perf_counter() - started
+
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].message}")
+    return {
+        "json_load_s": json_load,
+        "frames_s": frames,
+        "figures_s": figures,
+        "cold_run_s": cold_run,
+        "warm_run_s": warm_run,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def run_worker(path, page, timeout, disk_cache):
+    env = dict(os.environ, RECHO_DISK_CACHE="1" if disk_cache else "0")
+    proc = subprocess.run(
+        [sys.executable, __file__, "--worker", path, page, "--timeout", str(timeout)],
+        capture_output=True, text=True, env=env, cwd=ROOT,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{page} failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    """Lines describing every metric that regressed past ``threshold``."""
+    regressions = []
+    for scale, pages in results["scales"].items():
+        for page, metrics in pages.items():
+            before = baseline.get("scales", {}).get(scale, {}).get(page)
+            if not before:
+                continue
+            for metric, value in metrics.items():
+                old = before.get(metric)
+                if not old or (metric in TIMINGS and old < MIN_COMPARED_S):
+                    continue
+                if value > old * threshold:
+                    regressions.append(
+                        f"{scale}x {page} {metric}: {old:.3f} -> {value:.3f} ({value / old:.2f}x)"
+                    )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every dashboard page.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--pages", nargs="+", help="page names (emoji optional); default all")
+    parser.add_argument("--seed", default=os.path.join(ROOT, "dashboard_metrics.json"))
+    parser.add_argument("--label", help="results file name; default timestamp")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--save-baseline", action="store_true", help="also write results/baseline.json")
+    parser.add_argument("--disk-cache", action="store_true", help="let workers use the .npy cache")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--worker", nargs=2, metavar=("PATH", "PAGE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(measure(*args.worker, args.timeout)))
+        return 0
+
+    pages = PAGES
+    if args.pages:
+        pages = [p for p in PAGES if any(p.endswith(name) for name in args.pages)]
+
+    results = {"created": datetime.now().isoformat(timespec="seconds"), "scales": {}}
+    for scale in args.scales:
+        path = generate(scale, args.seed)
+        print(f"\n{scale}x  {path} ({os.path.getsize(path) / 2**20:,.1f} MiB)")
+        print(f"{'page':<24}" + "".join(f"{m:>13}" for m in (*TIMINGS, "peak_rss_mb")))
+        results["scales"][str(scale)] = {}
+        for page in pages:
+            metrics = run_worker(path, page, args.timeout, args.disk_cache)
+            results["scales"][str(scale)][page] = metrics
+            print(f"{page:<24}" + "".join(f"{metrics[m]:>13.3f}" for m in (*TIMINGS, "peak_rss_mb")))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    label = args.label or datetime.now().strftime("%Y%m%d-%H%M%S")
+    out = os.path.join(RESULTS_DIR, f"{label}.json")
+    for target in [out] + ([os.path.join(RESULTS_DIR, "baseline.json")] if args.save_baseline else []):
+        with open(target, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print(f"\nSaved {out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.2f}x of {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
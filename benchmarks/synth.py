@@ -0,0 +1,182 @@
+"""
+Synthetic ``dashboard_metrics.json`` files at a multiple of the real size.
+
+Every section of the seed export is repeated ``scale`` times. Copy ``k > 0``
+renames its entities (``TeamMember1`` -> ``TeamMember1_k``, ``r/Fitness`` ->
+``r/Fitness_k``, ...) so filters and group-bys see ``scale`` times as many
+accounts, campaigns and subreddits over the same date range. Scalars are
+copied as-is. Output is streamed row by row, so a 10,000x file (several GB)
+is written without holding it in memory.
+
+``--touchpoints USERS`` also adds a ``traffic.touchpoints`` section (see
+``recho.attribution``) with the sessions of that many users per copy: a few
+sessions each over the seed's date range, organic or paid in the seed's
+subreddits and campaigns, some of them converting.
+
+``--mentions N`` adds a ``brand.mentions`` section (see ``recho.mentions``)
+with N raw mentions per copy: the own brand's follow the seed's mention
+trend, and three competitors share the rest of the conversation.
+
+Usage: python benchmarks/synth.py --scale 100 [--touchpoints 10000] [--mentions 100000] [--seed dashboard_metrics.json] [--out PATH]
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+ENTITY_COLUMNS = (
+    "account_name", "campaign", "campaign_id", "campaign_name", "post_id", "subreddit", "user_id",
+)
+
+CONVERSION_RATE = 0.04
+PAID_SHARE = 0.45
+MEAN_SESSIONS = 2.5
+MEAN_GAP_DAYS = 4.0
+
+# brand -> share of all mentions; the first is the own brand
+BRAND_SHARES = {"Your Brand": 0.342, "Competitor A": 0.285, "Competitor B": 0.221, "Competitor C": 0.152}
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def default_path(scale, touchpoints=0, mentions=0):
+    suffix = (f"_{touchpoints}u" if touchpoints else "") + (f"_{mentions}m" if mentions else "")
+    return os.path.join(DEFAULT_DIR, f"metrics_{scale}x{suffix}.json")
+
+
+def touchpoints(document, n_users, seed=0):
+    """Session rows for ``n_users`` users, shaped after the seed ``document``."""
+    rng = np.random.default_rng(seed)
+    dates = pd.to_datetime([row["date"] for row in document["paid"]["daily_metrics"]])
+    first, last = dates.min(), dates.max() + pd.Timedelta(days=1)
+    subreddits = [row["subreddit"] for row in document["traffic"]["by_subreddit"]]
+    weights = np.array([row["sessions"] for row in document["traffic"]["by_subreddit"]], dtype=float)
+    campaigns = [row["campaign_name"] for row in document["paid"]["campaign_summary"]]
+
+    per_user = 1 + rng.poisson(MEAN_SESSIONS - 1, n_users)
+    n = int(per_user.sum())
+    users = np.repeat(np.arange(n_users), per_user)
+    # Each user starts at a random time and comes back after exponential gaps.
+    span_ns = (last - first).value
+    start = first.value + (rng.random(n_users) * span_ns).astype(np.int64)
+    gaps = (rng.exponential(MEAN_GAP_DAYS, n) * 86_400e9).astype(np.int64)
+    offsets = np.cumsum(gaps) - np.repeat(np.cumsum(gaps)[np.cumsum(per_user) - per_user], per_user)
+    times = np.minimum(np.repeat(start, per_user) + offsets, last.value - 1)
+
+    paid = rng.random(n) < PAID_SHARE
+    converted = rng.random(n) < CONVERSION_RATE
+    frame = pd.DataFrame({
+        "user_id": [f"u{u:07d}" for u in users],
+        "date": pd.to_datetime(times).strftime("%Y-%m-%dT%H:%M:%S"),
+        "channel": np.where(paid, "paid", "organic"),
+        "subreddit": np.array(subreddits)[rng.choice(len(subreddits), n, p=weights / weights.sum())],
+        "campaign": np.where(paid, np.array(campaigns)[rng.integers(0, len(campaigns), n)], None),
+        "conversions": converted.astype(int),
+        "revenue": np.where(converted, np.round(rng.lognormal(4.4, 0.5, n), 2), 0.0),
+    })
+    return frame.sort_values("date", kind="stable").to_dict("records")
+
+
+def mentions(document, n_mentions, seed=0):
+    """``n_mentions`` raw brand mention rows, shaped after the seed ``document``."""
+    rng = np.random.default_rng(seed)
+    trend = document["brand"]["mention_trend"]
+    days = pd.to_datetime([row["date"] for row in trend]).normalize()
+    subreddits = [row["subreddit"] for row in document["brand"]["by_subreddit"]]
+    weights = np.array([row["mention_count"] for row in document["brand"]["by_subreddit"]], dtype=float)
+
+    brands = list(BRAND_SHARES)
+    brand = rng.choice(len(brands), n_mentions, p=np.array(list(BRAND_SHARES.values())))
+    own = brand == 0
+    # The own brand's mentions follow the seed trend, the competitors' are spread evenly.
+    own_days = np.array([row["mention_count"] for row in trend], dtype=float) + 1
+    day = np.where(
+        own,
+        rng.choice(len(days), n_mentions, p=own_days / own_days.sum()),
+        rng.integers(0, len(days), n_mentions),
+    )
+    times = days.values[day] + (rng.random(n_mentions) * 86_400e9).astype("timedelta64[ns]")
+    score = np.round(np.where(own, rng.beta(8, 2, n_mentions), rng.beta(5, 3, n_mentions)), 3)
+    frame = pd.DataFrame({
+        "date": pd.to_datetime(times).strftime("%Y-%m-%dT%H:%M:%S"),
+        "brand": np.array(brands)[brand],
+        "subreddit": np.array(subreddits)[rng.choice(len(subreddits), n_mentions, p=weights / weights.sum())],
+        "sentiment": np.where(score >= 0.6, "positive", np.where(score >= 0.4, "neutral", "negative")),
+        "sentiment_score": score,
+        "upvotes": rng.poisson(5, n_mentions),
+        "comments": rng.poisson(1.5, n_mentions),
+    })
+    return frame.sort_values("date", kind="stable").to_dict("records")
+
+
+def _renamed(row, copy):
+    if copy == 0:
+        return row
+    return {
+        key: f"{value}_{copy}" if key in ENTITY_COLUMNS and isinstance(value, str) else value
+        for key, value in row.items()
+    }
+
+
+def _write(f, node, scale):
+    if isinstance(node, dict):
+        f.write("{")
+        for i, (key, value) in enumerate(node.items()):
+            if i:
+                f.write(",")
+            f.write(json.dumps(key))
+            f.write(":")
+            _write(f, value, scale)
+        f.write("}")
+    elif isinstance(node, list):
+        f.write("[")
+        first = True
+        for copy in range(scale):
+            for row in node:
+                if not first:
+                    f.write(",\n")
+                first = False
+                f.write(json.dumps(_renamed(row, copy) if isinstance(row, dict) else row))
+        f.write("]")
+    else:
+        f.write(json.dumps(node))
+
+
+def generate(scale, seed="dashboard_metrics.json", out=None, n_users=0, n_mentions=0):
+    """Write the ``scale``x file (if it is not there yet) and return its path."""
+    out = out or default_path(scale, n_users, n_mentions)
+    if os.path.exists(out):
+        return out
+    with open(seed, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    if n_users:
+        document["traffic"]["touchpoints"] = touchpoints(document, n_users)
+    if n_mentions:
+        document["brand"]["mentions"] = mentions(document, n_mentions)
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    tmp = out + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        _write(f, document, scale)
+    os.replace(tmp, out)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a scaled synthetic metrics export.")
+    parser.add_argument("--scale", type=int, required=True)
+    parser.add_argument("--touchpoints", type=int, default=0, metavar="USERS",
+                        help="add a traffic.touchpoints section with this many users per copy")
+    parser.add_argument("--mentions", type=int, default=0, metavar="N",
+                        help="add a brand.mentions section with this many mentions per copy")
+    parser.add_argument("--seed", default="dashboard_metrics.json")
+    parser.add_argument("--out")
+    args = parser.parse_args(argv)
+    path = generate(args.scale, args.seed, args.out, args.touchpoints, args.mentions)
+    print(f"{path}: {os.path.getsize(path) / 2**20:,.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+RECHO dashboard internals.
+
+The Streamlit entry point lives in app.py; this package holds the data layer
+it renders from.
+"""
@@ -0,0 +1,154 @@
+"""
+Per-account analytics for the Accounts page.
+
+``accounts.comparison`` has one summary row per account. ``table(data,
+filters)`` derives the per-account metrics from it as column operations:
+posts and karma per week of account age, the post / comment karma split,
+clicks per post. It adds the karma trend of each account from
+``organic.karma_velocity`` (trailing karma per day): the source's ``daily``
+query sums it per day and account over the whole history (incrementally,
+see ``recho.rollups.DailySums``), and the filter's date window is a slice of
+that (days x accounts) array, giving
+
+* ``velocity``: mean karma per day over the window,
+* ``velocity_change``: percent change against the window before it,
+* ``trend``: at most ``TREND_POINTS`` samples of the window, drawn as a
+  sparkline in the grid.
+
+``detail(data, filters, account)`` is the drill-down of one account: its
+daily karma velocity and top posts in the window. It reads only that
+account's rows and runs only when the page opens it.
+
+Both are cached per data version and filters, so searching, sorting and
+paging the grid reuse one table.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from recho import perf
+from recho.derive import DAY, per_week, safe_div
+from recho.filters import Filters, day_positions
+from recho.lru import LRUCache
+
+SECTION = "accounts.comparison"
+VELOCITY = "organic.karma_velocity"
+POSTS = "organic.top_posts"
+
+TREND_POINTS = 30
+TOP_POSTS = 10
+
+
+def metrics(df):
+    """The derived per-account columns of ``accounts.comparison`` rows."""
+    return df.assign(
+        posts_per_week=per_week(df["total_posts"], df["account_age_days"]),
+        karma_per_week=per_week(df["total_karma"], df["account_age_days"]),
+        post_karma_share=safe_div(df["post_karma"], df["total_karma"], 100),
+        clicks_per_post=safe_div(df["total_clicks"], df["total_posts"]),
+    )
+
+
+def velocity_grid(data):
+    """Calendar days, account names and the (days x accounts) karma velocity array."""
+    if VELOCITY not in data.sections:
+        return None
+    daily = data.daily(VELOCITY, ("account_name",), ("karma_velocity",))
+    if not len(daily):
+        return None
+    days = daily["day"].to_numpy(dtype="datetime64[D]")
+    first = days.min()
+    n_days = int((days.max() - first) // DAY) + 1
+    codes, labels = pd.factorize(daily["account_name"])
+    flat = ((days - first) // DAY).astype(np.intp) * len(labels) + codes
+    values = daily["karma_velocity"].to_numpy(dtype=np.float64)
+    grid = np.bincount(flat, weights=values, minlength=n_days * len(labels)).reshape(n_days, len(labels))
+    return first + np.arange(n_days) * DAY, [str(label) for label in labels], grid
+
+
+def velocity_trends(data, filters):
+    """``velocity``, ``velocity_change`` and ``trend`` per account over the filter's window."""
+    columns = ["account_name", "velocity", "velocity_change", "trend"]
+    series = velocity_grid(data)
+    if series is None:
+        return pd.DataFrame(columns=columns)
+    dates, names, grid = series
+    (lo, hi), previous = day_positions(dates, *data.window(filters))
+    if hi <= lo:
+        return pd.DataFrame(columns=columns)
+    velocity = grid[lo:hi].mean(axis=0)
+    if previous is None:
+        change = np.full(len(names), np.nan)
+    else:
+        before = grid[previous[0]:previous[1]].mean(axis=0)
+        change = safe_div(velocity - before, before, 100)
+    samples = np.unique(np.linspace(lo, hi - 1, min(TREND_POINTS, hi - lo)).astype(np.intp))
+    return pd.DataFrame({
+        "account_name": names,
+        "velocity": velocity,
+        "velocity_change": change,
+        "trend": np.round(grid[samples].T, 1).tolist(),
+    })
+
+
+def build_table(data, filters):
+    """Every account the filters select, with its metrics and karma trend, most karma first."""
+    df = metrics(data.view(SECTION, filters).reset_index(drop=True))
+    df = df.assign(account_name=df["account_name"].astype(str))
+    df = df.merge(velocity_trends(data, filters), on="account_name", how="left")
+    return df.sort_values(["total_karma", "account_name"], ascending=[False, True], ignore_index=True)
+
+
+@dataclass
+class AccountDetail:
+    """The drill-down of one account over the filter's window."""
+
+    account: pd.Series
+    velocity: pd.DataFrame
+    top_posts: pd.DataFrame
+
+
+def build_detail(data, filters, account):
+    """``AccountDetail`` of ``account``, or None if the filters do not select it."""
+    rows = table(data, filters)
+    rows = rows[rows["account_name"] == account]
+    if not len(rows):
+        return None
+    # Only this account's rows are read.
+    own = Filters(filters.date_range, (account,))
+    velocity = data.view(VELOCITY, own)[["date", "karma_velocity"]] if VELOCITY in data.sections else None
+    top_posts = data.top(POSTS, own, "upvotes", TOP_POSTS) if POSTS in data.sections else None
+    return AccountDetail(
+        account=rows.iloc[0],
+        velocity=pd.DataFrame(columns=["date", "karma_velocity"]) if velocity is None else velocity,
+        top_posts=pd.DataFrame() if top_posts is None else top_posts,
+    )
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+_tables = LRUCache("account_table")
+_details = LRUCache("account_detail")
+
+
+def table(data, filters):
+    """``build_table``, cached per data version and filters."""
+
+    def build():
+        with perf.span("account_table"):
+            return build_table(data, filters)
+
+    return _tables.get((data.data_version, filters), build)
+
+
+def detail(data, filters, account):
+    """``build_detail``, cached per data version, filters and account."""
+
+    def build():
+        with perf.span("account_detail"):
+            return build_detail(data, filters, account)
+
+    return _details.get((data.data_version, filters, account), build)
@@ -0,0 +1,191 @@
+"""
+Multi-touch attribution over session-level touchpoints.
+
+``traffic.touchpoints`` has one row per session: ``user_id``, ``date`` (the
+session start, with time of day), ``channel`` (organic / paid),
+``subreddit``, ``campaign`` (empty for organic sessions), and the
+``conversions`` and ``revenue`` of a session that converted.
+
+Sorted by user and time, a user's sessions form paths: a path ends at a
+converting session and the next session starts a new one, and a trailing
+path without a conversion gets no credit. Each path's conversions and
+revenue are split over its sessions by the models in ``MODELS``:
+
+* ``last_click`` / ``first_click``: all to the last / first session;
+* ``linear``: evenly over the sessions;
+* ``time_decay``: in proportion to ``0.5 ** (age / half_life)``, where age
+  is the time from the session to the conversion.
+
+The source streams the sessions in order of user and time, in chunks of
+``CHUNK_ROWS`` (``chunks(..., order=ORDER)``: an ``ORDER BY`` on the SQLite
+backend). All models run at once, as array operations over the positions of
+a chunk, and the credits are summed per channel, subreddit or campaign with
+``np.bincount``. The last user's unfinished path is carried over to the
+next chunk, so memory is bounded by one chunk plus the longest path without
+a conversion. Paths are cut at the start of the date filter's window.
+
+``attribution(data, filters, by)`` caches results per data version,
+filters, grouping and half-life, so re-slicing the same view is free.
+"""
+
+import numpy as np
+import pandas as pd
+
+from recho import perf
+from recho.lru import LRUCache
+
+SECTION = "traffic.touchpoints"
+
+MODELS = {
+    "last_click": "Last click",
+    "first_click": "First click",
+    "linear": "Linear",
+    "time_decay": "Time decay",
+}
+
+GROUPS = ("channel", "subreddit", "campaign")
+
+COLUMNS = ["sessions"] + [c for m in MODELS for c in (m, f"{m}_revenue")]
+
+ORDER = ("user_id", "date")
+
+HALF_LIFE_DAYS = 7.0
+CHUNK_ROWS = 50_000
+
+NO_VALUE = "(none)"
+
+_DAY_NS = 86_400 * 10**9
+
+
+def _codes(series):
+    """Integer codes and labels of ``series`` (missing values get code -1)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy().astype(np.intp), list(series.cat.categories)
+    codes, labels = pd.factorize(series)
+    return codes.astype(np.intp), list(labels)
+
+
+def credits(users, times, converted, half_life_days=HALF_LIFE_DAYS):
+    """Per-model weights of each session, and the path each session is in.
+
+    ``users`` and ``times`` (int64 ns) must be sorted by user, then time, and
+    ``converted`` marks converting sessions. Returns ``(weights, path,
+    last)``: ``weights[model][i]`` is the share of its path's conversion that
+    session ``i`` gets, and ``last[p]`` the position of path ``p``'s final
+    session.
+    """
+    n = len(users)
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = (users[1:] != users[:-1]) | converted[:-1]
+    path = np.cumsum(starts) - 1
+    first = np.flatnonzero(starts)
+    last = np.append(first[1:] - 1, n - 1)
+    length = (last - first + 1)[path]
+    pos = np.arange(n) - first[path]
+
+    age_days = (times[last][path] - times) / _DAY_NS
+    decay = 0.5 ** (age_days / half_life_days)
+    decay /= np.bincount(path, weights=decay)[path]
+    weights = {
+        "last_click": (pos == length - 1).astype(np.float64),
+        "first_click": (pos == 0).astype(np.float64),
+        "linear": 1.0 / length,
+        "time_decay": decay,
+    }
+    return weights, path, last
+
+
+class _Totals:
+    """Per-model credits summed per ``by`` value over the chunks of a stream."""
+
+    def __init__(self, half_life_days):
+        self.half_life_days = half_life_days
+        # Group value -> code; code 0 collects sessions without a value.
+        self.codes = {}
+        self.sums = {c: np.zeros(1) for c in COLUMNS}
+
+    def groups(self, values):
+        """Stream-wide group codes of ``values``."""
+        codes, labels = _codes(values)
+        lookup = np.array([self.codes.setdefault(str(v), len(self.codes) + 1) for v in labels] + [0], dtype=np.intp)
+        n_groups = len(self.codes) + 1
+        for name, sums in self.sums.items():
+            if len(sums) < n_groups:
+                self.sums[name] = np.append(sums, np.zeros(n_groups - len(sums)))
+        # Code -1 (no campaign on an organic session) indexes the trailing 0.
+        return lookup[codes]
+
+    def add(self, users, times, conversions, revenue, group):
+        """Credit whole paths of sessions, sorted by user and time."""
+        if not len(users):
+            return
+        n_groups = len(self.sums["sessions"])
+        weights, path, last = credits(users, times, conversions > 0, self.half_life_days)
+        path_conversions = conversions[last][path]
+        path_revenue = revenue[last][path]
+        self.sums["sessions"] += np.bincount(group, minlength=n_groups)
+        for model, weight in weights.items():
+            self.sums[model] += np.bincount(group, weights=weight * path_conversions, minlength=n_groups)
+            self.sums[f"{model}_revenue"] += np.bincount(group, weights=weight * path_revenue, minlength=n_groups)
+
+
+def _unfinished(users, conversions):
+    """Position where the last user's path without a conversion (if any) starts."""
+    others = np.flatnonzero(users != users[-1])
+    start = others[-1] + 1 if len(others) else 0
+    converted = np.flatnonzero(conversions[start:] > 0)
+    return start + converted[-1] + 1 if len(converted) else start
+
+
+def attribute(chunks, by, half_life_days=HALF_LIFE_DAYS):
+    """Conversions and revenue credited to each ``by`` value under every model.
+
+    ``chunks`` are frames of touchpoints in order of user, then time. Returns
+    one row per value with ``sessions``, ``<model>`` (credited conversions)
+    and ``<model>_revenue`` columns, most last-click conversions first.
+    """
+    totals = _Totals(half_life_days)
+    carry = None
+    for df in chunks:
+        # Sessions without a user belong to no path.
+        df = df[df["user_id"].notna()]
+        if not len(df):
+            continue
+        part = [
+            df["user_id"].to_numpy(dtype=object),
+            df["date"].to_numpy(dtype="datetime64[ns]").view("i8"),
+            df["conversions"].to_numpy(dtype=np.float64),
+            df["revenue"].fillna(0).to_numpy(dtype=np.float64),
+            totals.groups(df[by]),
+        ]
+        if carry is not None:
+            part = [np.concatenate(pair) for pair in zip(carry, part)]
+        cut = _unfinished(part[0], part[2])
+        totals.add(*(values[:cut] for values in part))
+        carry = [values[cut:] for values in part]
+    if carry is not None:
+        totals.add(*carry)
+
+    out = pd.DataFrame({by: [NO_VALUE] + list(totals.codes), **totals.sums})
+    out = out[out["sessions"] > 0]
+    out["sessions"] = out["sessions"].astype(np.int64)
+    return out.sort_values(["last_click", by], ascending=[False, True], ignore_index=True)
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+_results = LRUCache("attribution")
+
+
+def attribution(data, filters, by, half_life_days=HALF_LIFE_DAYS):
+    """``attribute`` over the touchpoints ``filters`` select, cached per data version."""
+
+    def build():
+        with perf.span("attribute", by=by) as span:
+            result = attribute(data.chunks(SECTION, filters, CHUNK_ROWS, order=ORDER), by, half_life_days)
+            span.set(rows=len(result))
+        return result
+
+    key = (data.data_version, filters, by, float(half_life_days))
+    return _results.get(key, build).copy(deep=False)
@@ -0,0 +1,178 @@
+"""
+Vectorized derivation of ratio, rolling and pacing metrics.
+
+The export ships ``roas``, ``cpa``, ``ctr``, ``rolling_roas``, ``pacing`` and
+``karma_velocity`` precomputed for the whole history. This module derives
+them from raw additive measures (spend, clicks, revenue, ...) for whatever
+slice the filters select, with NumPy operations over whole columns.
+
+Defined edge cases:
+
+* a ratio with a zero denominator is ``fill`` (NaN by default, so charts show
+  a gap rather than a fake zero; KPI cards pass ``fill=0.0``);
+* rolling windows run over calendar days (missing days count as zero) and are
+  NaN until ``min_periods`` days are available, ``window`` by default;
+* pacing compares cumulative spend with a straight-line budget over the
+  campaign's flight, capped at the full budget.
+"""
+
+import numpy as np
+import pandas as pd
+
+DAY = np.timedelta64(1, "D")
+
+PAID_MEASURES = ("impressions", "clicks", "spend", "conversions", "revenue")
+
+# metric -> (numerator, denominator, scale)
+RATIOS = {
+    "ctr": ("clicks", "impressions", 100),
+    "cpc": ("spend", "clicks", 1),
+    "cvr": ("conversions", "clicks", 100),
+    "cpa": ("spend", "conversions", 1),
+    "roas": ("revenue", "spend", 1),
+    "ecpm": ("spend", "impressions", 1000),
+    "aov": ("revenue", "conversions", 1),
+    "session_cvr": ("conversions", "sessions", 100),
+}
+
+
+def safe_div(numerator, denominator, scale=1, fill=np.nan):
+    """``numerator / denominator * scale`` with ``fill`` where the denominator is 0."""
+    num = np.asarray(numerator, dtype=np.float64)
+    den = np.asarray(denominator, dtype=np.float64)
+    out = np.full(np.broadcast(num, den).shape, fill, dtype=np.float64)
+    np.divide(num * scale, den, out=out, where=den != 0)
+    return out if out.ndim else float(out)
+
+
+def ratios(values, fill=np.nan):
+    """Every ratio whose inputs are in ``values`` (a DataFrame or dict of totals)."""
+    out = {}
+    for metric, (num, den, scale) in RATIOS.items():
+        if num in values and den in values:
+            out[metric] = safe_div(values[num], values[den], scale, fill)
+    if all(col in values for col in ("upvotes", "comments", "impressions")):
+        out["engagement_rate"] = safe_div(
+            values["upvotes"] + values["comments"], values["impressions"], 100, fill
+        )
+    return out
+
+
+def with_ratios(df, fill=np.nan):
+    return df.assign(**ratios(df, fill))
+
+
+def aggregate(df, by, measures=PAID_MEASURES):
+    """Sum ``measures`` per ``by`` value and derive the ratios of each group."""
+    grouped = df.groupby(by, observed=True, sort=False)[list(measures)].sum()
+    return with_ratios(grouped.reset_index())
+
+
+def daily_totals(df, measures=PAID_MEASURES, date_col="date"):
+    """Per-day sums over a continuous calendar; days without rows are zero."""
+    if not len(df):
+        return pd.DataFrame(columns=[date_col, *measures])
+    days = df[date_col].to_numpy(dtype="datetime64[D]")
+    first = days.min()
+    n_days = int((days.max() - first) // DAY) + 1
+    slot = ((days - first) // DAY).astype(np.intp)
+    out = {date_col: first + np.arange(n_days) * DAY}
+    for measure in measures:
+        out[measure] = np.bincount(slot, weights=df[measure].to_numpy(dtype=np.float64), minlength=n_days)
+    frame = pd.DataFrame(out)
+    frame[date_col] = frame[date_col].astype("datetime64[ns]")
+    return frame
+
+
+def rolling_sum(values, window, min_periods=None, axis=-1):
+    """Trailing ``window`` sum along ``axis``; NaN before ``min_periods`` values."""
+    min_periods = window if min_periods is None else min_periods
+    values = np.moveaxis(np.asarray(values, dtype=np.float64), axis, -1)
+    cum = np.concatenate([np.zeros(values.shape[:-1] + (1,)), np.cumsum(values, axis=-1)], axis=-1)
+    n = values.shape[-1]
+    idx = np.arange(n)
+    out = cum[..., idx + 1] - cum[..., np.maximum(idx + 1 - window, 0)]
+    out[..., np.minimum(idx + 1, window) < min_periods] = np.nan
+    return np.moveaxis(out, -1, axis)
+
+
+def rolling_roas(daily, window=7, min_periods=None):
+    """Rolling revenue, spend and ROAS from ``daily_totals`` output."""
+    revenue = rolling_sum(daily["revenue"], window, min_periods)
+    spend = rolling_sum(daily["spend"], window, min_periods)
+    return pd.DataFrame({
+        "date": daily["date"].to_numpy(),
+        "rolling_revenue": revenue,
+        "rolling_spend": spend,
+        "rolling_roas": safe_div(revenue, spend),
+    })
+
+
+def campaign_budgets(spend_pacing):
+    """Total budget per campaign: cumulative spend plus what remains, on any row."""
+    first = spend_pacing.drop_duplicates("campaign_name")
+    budgets = first["cumulative_spend"].to_numpy() + first["budget_remaining"].to_numpy()
+    return pd.Series(budgets, index=first["campaign_name"].astype(str).to_numpy())
+
+
+def pacing(df, budgets, date_col="date"):
+    """Daily cumulative spend per campaign against a straight-line budget.
+
+    The flight of each campaign runs from its first to its last day in
+    ``df``; expected spend grows linearly over it and is capped at budget.
+    """
+    daily = (
+        df.groupby(["campaign_name", date_col], observed=True)["spend"].sum()
+        .reset_index()
+        .sort_values(["campaign_name", date_col], kind="stable")
+    )
+    if not len(daily):
+        return daily.assign(cumulative_spend=[], expected_spend=[], pacing=[], budget_remaining=[])
+    grouped = daily.groupby("campaign_name", observed=True)
+    cumulative = grouped["spend"].cumsum().to_numpy()
+    start = grouped[date_col].transform("min").to_numpy()
+    end = grouped[date_col].transform("max").to_numpy()
+    day_number = (daily[date_col].to_numpy() - start) // DAY + 1
+    flight_days = (end - start) // DAY + 1
+    budget = daily["campaign_name"].astype(str).map(budgets).to_numpy(dtype=np.float64)
+    expected = budget * np.minimum(day_number / flight_days, 1.0)
+    return daily.assign(
+        cumulative_spend=cumulative,
+        expected_spend=expected,
+        pacing=safe_div(cumulative, expected, 100),
+        budget_remaining=budget - cumulative,
+    )
+
+
+def karma_velocity(posts, period_days=7, date_col="post_date", karma_col="karma", start=None, end=None):
+    """Trailing karma per day for every account and calendar day.
+
+    Karma is summed into an (account x day) matrix with one ``bincount`` and
+    the trailing window is a cumulative-sum difference along the day axis.
+    The calendar runs from the first to the last post, or from ``start`` to
+    ``end`` (datetime64 days) when given.
+    """
+    if not len(posts):
+        return pd.DataFrame(columns=["date", "account_name", "karma_velocity", "period_days"])
+    accounts = posts["account_name"].astype("category")
+    codes = accounts.cat.codes.to_numpy().astype(np.intp)
+    days = posts[date_col].to_numpy(dtype="datetime64[D]")
+    first = days.min() if start is None else np.datetime64(start, "D")
+    last = days.max() if end is None else np.datetime64(end, "D")
+    n_days = int((last - first) // DAY) + 1
+    n_accounts = len(accounts.cat.categories)
+    slot = codes * n_days + ((days - first) // DAY).astype(np.intp)
+    karma = np.bincount(slot, weights=posts[karma_col].to_numpy(dtype=np.float64), minlength=n_accounts * n_days)
+    window = rolling_sum(karma.reshape(n_accounts, n_days), period_days, min_periods=1, axis=1)
+    dates = (first + np.arange(n_days) * DAY).astype("datetime64[ns]")
+    return pd.DataFrame({
+        "date": np.tile(dates, n_accounts),
+        "account_name": pd.Categorical.from_codes(np.repeat(np.arange(n_accounts), n_days), accounts.cat.categories),
+        "karma_velocity": (window / period_days).ravel(),
+        "period_days": period_days,
+    })
+
+
+def per_week(total, age_days):
+    """``total`` spread over ``age_days``, per week; NaN for zero-day accounts."""
+    return safe_div(total, np.asarray(age_days, dtype=np.float64) / 7)
@@ -0,0 +1,212 @@
+"""
+Binary columnar cache of a loaded ``MetricsStore``.
+
+The first process to load a source writes every section next to it as one
+``.npy`` file per column (dates as int64 nanoseconds, categoricals as codes
+plus a category list in the manifest). Later processes memory-map those
+files instead of parsing the JSON again, so cold starts cost a few ``open``
+calls and the OS page cache is shared by every replica on the host.
+Sections are only mapped when a page first reads them; the manifest carries
+each section's newest date so date windows resolve without loading any.
+
+Entries live in ``.recho_cache/`` beside the source and are keyed on the
+source's size and mtime; a changed source simply misses and writes a new
+entry. The entries it supersedes are only marked at first and removed once
+the mark is ``PRUNE_GRACE_SECONDS`` old, since other processes may still be
+mapping their sections lazily (their watchers move to the new entry within a
+poll or two). A refresh that only touched some sections hard-links the files
+of the others from the entry it supersedes, so its write costs the changed
+sections rather than the whole history. Set ``RECHO_DISK_CACHE=0`` to turn the cache
+off or ``RECHO_CACHE_DIR`` to move it.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from recho.store import MetricsStore, newest_date
+
+CACHE_DIR_NAME = ".recho_cache"
+MANIFEST = "manifest.json"
+SUPERSEDED = "superseded"
+PRUNE_GRACE_SECONDS = 600
+
+# Bump when the on-disk layout changes so old entries are ignored.
+FORMAT_VERSION = 3
+
+
+def enabled():
+    return os.environ.get("RECHO_DISK_CACHE", "1") != "0"
+
+
+def cache_root(source):
+    if os.environ.get("RECHO_CACHE_DIR"):
+        return os.environ["RECHO_CACHE_DIR"]
+    source = os.path.abspath(source)
+    base = source if os.path.isdir(source) else os.path.dirname(source)
+    return os.path.join(base, CACHE_DIR_NAME)
+
+
+def _prefix(source):
+    return os.path.basename(os.path.abspath(source).rstrip(os.sep)) + "-"
+
+
+def cache_path(source, signature):
+    digest = hashlib.sha1(repr((FORMAT_VERSION, signature)).encode()).hexdigest()[:16]
+    return os.path.join(cache_root(source), _prefix(source) + digest)
+
+
+def _column_kind(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return "category"
+    if pd.api.types.is_datetime64_dtype(series.dtype):
+        return "datetime"
+    if series.dtype.kind in "biuf":
+        return "numeric"
+    return "object"
+
+
+def write(source, signature, store, state, reuse=None):
+    """Write ``store`` as the cache entry for ``signature``; best effort.
+
+    ``reuse`` maps sections known to be unchanged to their directory in an
+    earlier entry; their column files are hard-linked instead of written.
+    """
+    reuse = reuse or {}
+    target = cache_path(source, signature)
+    if os.path.isdir(target):
+        # The source went back to an older version: this entry is current again.
+        _remove(os.path.join(target, SUPERSEDED))
+        return target
+    root = cache_root(source)
+    frames, values = store.parts()
+    tmp = None
+    try:
+        os.makedirs(root, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=root, prefix=".tmp-")
+        manifest = {"format": FORMAT_VERSION, "values": values, "state": state, "sections": {}}
+        for section, df in frames.items():
+            section_dir = os.path.join(tmp, section)
+            os.makedirs(section_dir)
+            columns = []
+            for i, col in enumerate(df.columns):
+                kind = _column_kind(df[col])
+                meta = {"name": col, "kind": kind}
+                if kind == "category":
+                    meta["categories"] = df[col].cat.categories.tolist()
+                name = f"c{i}.json" if kind == "object" else f"c{i}.npy"
+                path = os.path.join(section_dir, name)
+                if section not in reuse or not _link(os.path.join(reuse[section], name), path):
+                    _save_column(df[col], kind, path)
+                columns.append(meta)
+            manifest["sections"][section] = {
+                "rows": len(df),
+                "newest": newest_date(df),
+                "columns": columns,
+            }
+        with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        # Publishing with a rename means readers never see a partial entry.
+        os.rename(tmp, target)
+    except OSError:
+        # A read-only deploy just runs without the cache.
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return None
+    _prune(source, keep=target)
+    return target
+
+
+def _save_column(series, kind, path):
+    if kind == "category":
+        np.save(path, series.cat.codes.to_numpy())
+    elif kind == "datetime":
+        np.save(path, series.to_numpy(dtype="datetime64[ns]").view("i8"))
+    elif kind == "numeric":
+        np.save(path, series.to_numpy())
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(series.tolist(), f)
+
+
+def _link(existing, path):
+    """Hard-link ``path`` to ``existing``; False when that is not possible."""
+    try:
+        os.link(existing, path)
+    except OSError:
+        # Pruned meanwhile, or a filesystem without hard links.
+        return False
+    return True
+
+
+def _prune(source, keep):
+    """Mark the entries ``keep`` supersedes; delete those marked long enough ago."""
+    root = cache_root(source)
+    now = time.time()
+    for entry in os.scandir(root):
+        if entry.path == keep or not entry.name.startswith(_prefix(source)):
+            continue
+        marker = os.path.join(entry.path, SUPERSEDED)
+        try:
+            superseded = os.path.getmtime(marker)
+        except OSError:
+            try:
+                open(marker, "a").close()
+            except OSError:
+                pass
+            continue
+        if now - superseded >= PRUNE_GRACE_SECONDS:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def read(source, signature):
+    """``(store, state)`` memory-mapped from the cache entry, or None on a miss."""
+    target = cache_path(source, signature)
+    try:
+        with open(os.path.join(target, MANIFEST), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != FORMAT_VERSION:
+        return None
+
+    frames = {
+        section: functools.partial(_read_section, os.path.join(target, section), meta)
+        for section, meta in manifest["sections"].items()
+    }
+    newest = {section: meta["newest"] for section, meta in manifest["sections"].items()}
+    return MetricsStore(frames, manifest["values"], newest), manifest["state"]
+
+
+def _read_section(section_dir, meta):
+    columns = {}
+    for i, col in enumerate(meta["columns"]):
+        path = os.path.join(section_dir, f"c{i}")
+        kind = col["kind"]
+        if kind == "object":
+            with open(path + ".json", "r", encoding="utf-8") as f:
+                columns[col["name"]] = pd.Series(json.load(f), dtype=object)
+            continue
+        # asarray drops the memmap subclass but keeps the mapping as base
+        array = np.asarray(np.load(path + ".npy", mmap_mode="r"))
+        if kind == "category":
+            columns[col["name"]] = pd.Categorical.from_codes(array, categories=col["categories"])
+        elif kind == "datetime":
+            columns[col["name"]] = array.view("datetime64[ns]")
+        else:
+            columns[col["name"]] = array
+    return pd.DataFrame(columns, index=pd.RangeIndex(meta["rows"]), copy=False)
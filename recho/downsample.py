@@ -0,0 +1,133 @@
+"""
+Point-budget downsampling for long time-series charts.
+
+A chart cannot show more points than it has pixels, so series longer than
+the budget for their width are reduced before they become Plotly traces:
+
+* ``lttb`` (Largest-Triangle-Three-Buckets) keeps the visual shape of lines
+  and areas;
+* ``minmax`` keeps each bucket's lowest and highest point, so spikes in bar
+  charts survive.
+
+Both work on NumPy arrays; LTTB only loops over output buckets, never rows.
+Above ``SCATTERGL_THRESHOLD`` points ``scatter()`` switches to WebGL.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Streamlit does not report the rendered width, so budgets are derived from
+# the width a chart gets in the wide layout.
+FULL_WIDTH = 1200
+HALF_WIDTH = 600
+
+POINTS_PER_PIXEL = 1.0
+
+SCATTERGL_THRESHOLD = 5_000
+
+
+def point_budget(width=FULL_WIDTH):
+    return max(int(width * POINTS_PER_PIXEL), 3)
+
+
+def _as_float(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        values = values.view("i8")
+    return values.astype(np.float64, copy=False)
+
+
+def lttb(x, y, n_out):
+    """Positions of the ``n_out`` points LTTB keeps from (x, y)."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = _as_float(y)
+
+    # Buckets between the fixed first and last point.
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    sizes = np.diff(edges)
+    # Average of every bucket, used as the third triangle vertex for the
+    # bucket before it; computed in one pass with reduceat.
+    avg_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / sizes
+    avg_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / sizes
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    keep = np.empty(n_out, dtype=np.intp)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - avg_x[i]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y[i] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def minmax(y, n_out):
+    """Positions of each bucket's min and max, about ``n_out`` in total."""
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+    y = _as_float(y)
+    size = -(-n // n_buckets)
+    # Rounding the size up can leave fewer buckets than asked for; dropping
+    # them keeps every bucket's first value real.
+    n_buckets = -(-n // size)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    # Padding at the tail is NaN; fill it with the bucket's own first value
+    # so nanarg* never sees an all-NaN row.
+    buckets = padded.reshape(n_buckets, size)
+    buckets = np.where(np.isnan(buckets), buckets[:, :1], buckets)
+    offsets = np.arange(n_buckets) * size
+    lows = offsets + np.nanargmin(buckets, axis=1)
+    highs = offsets + np.nanargmax(buckets, axis=1)
+    keep = np.unique(np.concatenate([lows, highs]))
+    return keep[keep < n]
+
+
+def downsample(df, x, ys, budget=None, method="lttb"):
+    """Rows of ``df`` needed to draw columns ``ys`` against ``x`` within budget.
+
+    Series sharing one x axis are reduced independently and the kept rows
+    are merged, so every trace keeps its own extremes.
+    """
+    budget = budget or point_budget()
+    if len(df) <= budget:
+        return df
+    keep = []
+    for y in ys:
+        values = df[y].to_numpy()
+        if method == "minmax":
+            keep.append(minmax(values, budget))
+        else:
+            keep.append(lttb(df[x].to_numpy(), values, budget))
+    return df.iloc[np.unique(np.concatenate(keep))]
+
+
+def downsample_groups(df, x, y, by, budget=None, method="lttb"):
+    """``downsample`` applied to each ``by`` group (one trace per group)."""
+    budget = budget or point_budget()
+    if len(df) <= budget:
+        return df
+    parts = [
+        downsample(group, x, [y], budget, method)
+        for _, group in df.groupby(by, observed=True, sort=False)
+    ]
+    return pd.concat(parts) if parts else df
+
+
+def scatter(x, y, **kwargs):
+    """A Scatter trace, or Scattergl once the point count gets large."""
+    import plotly.graph_objects as go
+
+    trace = go.Scattergl if len(x) > SCATTERGL_THRESHOLD else go.Scatter
+    return trace(x=x, y=y, **kwargs)
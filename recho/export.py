@@ -0,0 +1,357 @@
+"""
+Export of the filtered view of every section.
+
+``write_export`` reads each table section of a data source's queries (see
+``recho.sources``) in ``CHUNK_ROWS`` row blocks of the rows the global
+filters select and hands every block to a format writer that appends it to
+the output file, so memory is bounded by one chunk whatever the row count:
+
+* ``csv``      a zip with one CSV per section (deflated while streaming);
+* ``parquet``  a zip with one Parquet file per section, one row group per
+  chunk (needs ``pyarrow``);
+* ``xlsx``     one worksheet per section via openpyxl's write-only mode
+  (needs ``openpyxl``; sections are cut at Excel's row limit);
+* ``html``     a standalone report with the first ``HTML_MAX_ROWS`` rows of
+  each section.
+
+``Exporter`` runs exports on a background thread and tracks them as
+``ExportJob`` objects, so the UI only polls for progress.
+
+Run ``python -m recho.export PATH --format csv`` to export from the shell.
+"""
+
+import argparse
+import html
+import importlib.util
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from recho.filters import DATE_RANGES, Filters
+from recho.sources import open_source
+
+CHUNK_ROWS = 50_000
+HTML_MAX_ROWS = 1_000
+XLSX_MAX_ROWS = 1_048_575  # Excel's limit, less the header row
+MAX_KEPT = 20
+
+VALUES_FILE = "_values.json"
+
+
+# ============================================================================
+# FORMAT WRITERS
+# ============================================================================
+class _CsvWriter:
+    extension = ".zip"
+
+    def __init__(self, path):
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+        self._handle = None
+        self._header = True
+
+    def begin(self, section, n_rows):
+        self._handle = io.TextIOWrapper(_open_entry(self._zip, f"{section}.csv"), encoding="utf-8", newline="")
+        self._header = True
+
+    def write(self, chunk):
+        chunk.to_csv(self._handle, header=self._header, index=False)
+        self._header = False
+
+    def end(self):
+        self._handle.close()
+
+    def close(self, values):
+        self._zip.writestr(VALUES_FILE, json.dumps(values, indent=2, default=str))
+        self._zip.close()
+
+
+class _ParquetWriter:
+    extension = ".zip"
+
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._pq = pq
+        # Parquet pages are already compressed.
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED)
+        self._handle = None
+        self._writer = None
+
+    def begin(self, section, n_rows):
+        self._handle = _open_entry(self._zip, f"{section}.parquet")
+        self._writer = None
+
+    def write(self, chunk):
+        # Chunks are slices of one frame, so they share one schema.
+        table = self._pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._handle, table.schema)
+        self._writer.write_table(table)
+
+    def end(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._handle.close()
+
+    def close(self, values):
+        self._zip.writestr(VALUES_FILE, json.dumps(values, indent=2, default=str))
+        self._zip.close()
+
+
+class _XlsxWriter:
+    extension = ".xlsx"
+
+    def __init__(self, path):
+        from openpyxl import Workbook
+
+        self._path = path
+        self._book = Workbook(write_only=True)
+        self._sheet = None
+        self._rows = 0
+
+    def begin(self, section, n_rows):
+        # Sheet names are capped at 31 characters.
+        self._sheet = self._book.create_sheet(section[-31:])
+        self._rows = 0
+        self._header = True
+
+    def write(self, chunk):
+        if self._header:
+            self._sheet.append(list(chunk.columns))
+            self._header = False
+        chunk = chunk.iloc[:max(XLSX_MAX_ROWS - self._rows, 0)]
+        self._rows += len(chunk)
+        for row in _cells(chunk):
+            self._sheet.append(row)
+
+    def end(self):
+        pass
+
+    def close(self, values):
+        sheet = self._book.create_sheet("values")
+        for name, value in values.items():
+            sheet.append([name, value if np.isscalar(value) else json.dumps(value)])
+        self._book.save(self._path)
+
+
+class _HtmlWriter:
+    extension = ".html"
+
+    def __init__(self, path):
+        self._f = open(path, "w", encoding="utf-8")
+        self._rows = 0
+        self._total = 0
+        self._f.write(
+            "<!DOCTYPE html><html><head><meta charset='utf-8'><title>RECHO Report</title>"
+            "<style>body{font-family:sans-serif;color:#1A1A1A}h1,h2{color:#D43E2B}"
+            "table{border-collapse:collapse;margin-bottom:24px}"
+            "td,th{border:1px solid #F0F0F0;padding:4px 8px;text-align:right}"
+            "th{background:#F8F8F8}</style></head><body><h1>🎯 RECHO Report</h1>"
+        )
+
+    def begin(self, section, n_rows):
+        self._rows = 0
+        self._total = n_rows
+        self._header = True
+        self._f.write(f"<h2>{html.escape(section)}</h2><table>")
+
+    def write(self, chunk):
+        if self._header:
+            self._f.write("<tr>" + "".join(f"<th>{html.escape(str(c))}</th>" for c in chunk.columns) + "</tr>")
+            self._header = False
+        chunk = chunk.iloc[:max(HTML_MAX_ROWS - self._rows, 0)]
+        self._rows += len(chunk)
+        for row in chunk.astype(str).to_numpy():
+            self._f.write("<tr>" + "".join(f"<td>{html.escape(v)}</td>" for v in row) + "</tr>")
+
+    def end(self):
+        self._f.write("</table>")
+        if self._total > self._rows:
+            self._f.write(f"<p>First {self._rows:,} of {self._total:,} rows.</p>")
+
+    def close(self, values):
+        self._f.write("<h2>Values</h2><table>")
+        for name, value in values.items():
+            self._f.write(f"<tr><th>{html.escape(name)}</th><td>{html.escape(str(value))}</td></tr>")
+        self._f.write("</table></body></html>")
+        self._f.close()
+
+
+def _open_entry(archive, name):
+    info = zipfile.ZipInfo(name, time.localtime()[:6])
+    info.compress_type = archive.compression
+    return archive.open(info, "w", force_zip64=True)
+
+
+def _cells(chunk):
+    """Rows of ``chunk`` as Python values openpyxl accepts."""
+    columns = []
+    for col in chunk.columns:
+        # Timestamps are datetime subclasses, which openpyxl writes as dates.
+        values = chunk[col].astype(object).to_numpy()
+        values[chunk[col].isna().to_numpy()] = None
+        if chunk[col].dtype == object:
+            # Cells hold scalars only; lists (primary_subreddits) become JSON.
+            values = [json.dumps(v) if isinstance(v, (list, dict)) else v for v in values]
+        columns.append(values)
+    return zip(*columns)
+
+
+# format -> (label, writer, required module)
+FORMATS = {
+    "csv": ("CSV (zip)", _CsvWriter, None),
+    "parquet": ("Parquet (zip)", _ParquetWriter, "pyarrow"),
+    "xlsx": ("Excel", _XlsxWriter, "openpyxl"),
+    "html": ("HTML report", _HtmlWriter, None),
+}
+
+
+def available_formats():
+    """Formats whose optional dependency is installed."""
+    return [
+        fmt for fmt, (_, _, module) in FORMATS.items()
+        if module is None or importlib.util.find_spec(module) is not None
+    ]
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+def write_export(data, filters, fmt, path, progress=None):
+    """Write every section of the queries ``data`` under ``filters`` to ``path``.
+
+    ``progress(section, rows_written)`` is called after every chunk.
+    Returns the number of rows written.
+    """
+    writer = FORMATS[fmt][1](path)
+    rows_written = 0
+    for section in data.sections:
+        writer.begin(section, data.count(section, filters))
+        # An empty section still yields one empty chunk, which keeps its header.
+        for chunk in data.chunks(section, filters, CHUNK_ROWS):
+            writer.write(chunk)
+            rows_written += len(chunk)
+            if progress is not None and len(chunk):
+                progress(section, rows_written)
+        writer.end()
+    writer.close(data.values)
+    return rows_written
+
+
+@dataclass
+class ExportJob:
+    """One background export."""
+
+    fmt: str
+    filters: Filters
+    path: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status: str = "running"
+    section: str = ""
+    rows_written: int = 0
+    error: str = ""
+    started: float = field(default_factory=time.time)
+    finished: float = 0.0
+
+    @property
+    def done(self):
+        return self.status != "running"
+
+    @property
+    def filename(self):
+        return os.path.basename(self.path)
+
+
+class Exporter:
+    """Runs exports on a background thread and keeps their results on disk."""
+
+    def __init__(self, out_dir=None, max_workers=1):
+        self.out_dir = out_dir or os.environ.get("RECHO_EXPORT_DIR") or os.path.join(
+            tempfile.gettempdir(), "recho_exports"
+        )
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="recho-export")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, data, filters, fmt):
+        """Start exporting the queries ``data`` under ``filters``; returns the ``ExportJob``."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.out_dir, f"recho-{stamp}-{uuid.uuid4().hex[:6]}{FORMATS[fmt][1].extension}")
+        job = ExportJob(fmt, filters, path)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._pool.submit(self._run, job, data)
+        return job
+
+    def job(self, job_id):
+        return self._jobs.get(job_id)
+
+    def _run(self, job, data):
+        def progress(section, rows_written):
+            job.section = section
+            job.rows_written = rows_written
+
+        try:
+            write_export(data, job.filters, job.fmt, job.path, progress)
+            job.status = "done"
+        except Exception as exc:  # reported to the user through the job
+            job.status = "failed"
+            job.error = f"{type(exc).__name__}: {exc}"
+            if os.path.exists(job.path):
+                os.remove(job.path)
+        finally:
+            job.finished = time.time()
+            self._prune()
+
+    def _prune(self):
+        with self._lock:
+            finished = sorted((j for j in self._jobs.values() if j.done), key=lambda j: j.finished)
+            for job in finished[:-MAX_KEPT]:
+                del self._jobs[job.id]
+                if os.path.exists(job.path):
+                    os.remove(job.path)
+
+
+def read_export(path):
+    """Bytes of a finished export, read only when it is downloaded.
+
+    Passed to ``st.download_button`` through a callable, so nothing is read
+    until the button is clicked. Streamlit's media file manager then holds the
+    whole file in memory until it is served (it reads file handles into bytes
+    as well, without closing them), so an export is bounded on disk by the
+    chunked writers but not at download time.
+    """
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the filtered view of every section.")
+    parser.add_argument("path", help="dashboard_metrics.json, an NDJSON section directory or a SQLite file")
+    parser.add_argument("--format", choices=list(FORMATS), default="csv")
+    parser.add_argument("--range", choices=list(DATE_RANGES), default="All Time")
+    parser.add_argument("--account", action="append", default=[], help="repeat for several accounts")
+    parser.add_argument("--out", help="output file; default recho-export<ext> in the current directory")
+    args = parser.parse_args(argv)
+
+    data = open_source(args.path, watch=False).queries()
+    out = args.out or f"recho-export{FORMATS[args.format][1].extension}"
+    started = time.perf_counter()
+    rows = write_export(data, Filters.from_controls(args.range, args.account), args.format, out)
+    print(f"Wrote {rows:,} rows to {out} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Process-wide cache of built Plotly figures.
+
+Figures are stored as their JSON serialization under a key of (page, chart,
+filters, data version), in LRU order with a total size cap. A hit rebuilds
+the figure from JSON without validation, which skips both the pandas work
+and the trace-by-trace Plotly construction of the original builder.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from recho import perf
+
+DEFAULT_MAX_BYTES = int(float(os.environ.get("RECHO_FIGURE_CACHE_MB", "64")) * 2**20)
+
+
+class FigureCache:
+    """LRU map of key -> figure JSON, bounded by total JSON size."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def get(self, key, build):
+        """The figure for ``key``, calling ``build()`` only on a miss."""
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        perf.cache_event("figures", cached is not None)
+        if cached is not None:
+            # Imported here so pages without charts never load plotly.
+            import plotly.io as pio
+
+            return pio.from_json(cached, skip_invalid=True)
+
+        with perf.span("build_figure"):
+            fig = build()
+        self._put(key, fig.to_json())
+        return fig
+
+    def _put(self, key, payload):
+        size = len(payload)
+        with self._lock:
+            self.misses += 1
+            if size > self.max_bytes:
+                return
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            self._entries[key] = payload
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
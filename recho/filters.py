@@ -0,0 +1,195 @@
+"""
+Date range and dimension filtering for every store section.
+
+``FilterIndex`` is built once per store and indexes each table section the
+first time it is filtered. For each section it keeps the row order sorted by date (so a date window is two binary searches) and, for
+each account / campaign / subreddit value, the sorted positions of its rows
+(so a subset of values is a union of pre-built posting lists instead of a
+scan). A filter switch therefore only touches the rows it returns.
+"""
+
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+ALL_ACCOUNTS = "All Accounts"
+
+DATE_RANGES = {
+    "Last 7 Days": 7,
+    "Last 30 Days": 30,
+    "Last 90 Days": 90,
+    "All Time": None,
+}
+
+DIMENSIONS = ("account_name", "campaign_name", "subreddit")
+
+DATE_KEYS = ("date", "post_date")
+
+
+@dataclass(frozen=True)
+class Filters:
+    """The global controls of one rerun."""
+
+    date_range: str = "Last 30 Days"
+    accounts: tuple = ()
+
+    @classmethod
+    def from_controls(cls, date_range, accounts):
+        if not accounts or ALL_ACCOUNTS in accounts:
+            accounts = ()
+        return cls(date_range, tuple(sorted(accounts)))
+
+    @property
+    def days(self):
+        return DATE_RANGES[self.date_range]
+
+
+def anchor(ends):
+    """Day of the newest of ``ends`` (int64 ns, None for undated sections)."""
+    ends = [end for end in ends if end is not None]
+    # Relative windows are anchored on the newest row in the dataset, not on
+    # the wall clock, so every section answers for the same period.
+    return np.datetime64(max(ends), "ns").astype("datetime64[D]") if ends else None
+
+
+def window(end_date, days):
+    """Inclusive (start, end) bounds as int64 ns for the last ``days`` days up to ``end_date``."""
+    if days is None or end_date is None:
+        return None, None
+    start = end_date - np.timedelta64(days - 1, "D")
+    end = end_date + np.timedelta64(1, "D") - np.timedelta64(1, "ns")
+    return start.astype("datetime64[ns]").view("i8"), end.astype("datetime64[ns]").view("i8")
+
+
+def previous_window(start, end):
+    """Bounds of the window as long as ``(start, end)`` that ends just before it; (None, None) for "All Time"."""
+    if start is None:
+        return None, None
+    length = end - start + 1
+    return start - length, start - 1
+
+
+def day_positions(days, start, end):
+    """Positions ``[lo, hi)`` of the ``window`` bounds in calendar ``days``, and of the window before it.
+
+    The previous window is None for "All Time" or when the history does not
+    reach back a full window.
+    """
+    if start is None:
+        return (0, len(days)), None
+    ns = days.astype("datetime64[ns]").view("i8")
+    lo, hi = int(np.searchsorted(ns, start, side="left")), int(np.searchsorted(ns, end, side="right"))
+    length = int((end - start + 1) // (86_400 * 10**9))
+    if lo - length < 0 or hi <= lo:
+        return (lo, hi), None
+    return (lo, hi), (lo - length, lo)
+
+
+class _SectionIndex:
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self.date_col = next((c for c in DATE_KEYS if c in df.columns), None)
+        self.order = None
+        self.keys = None
+        if self.date_col is not None:
+            keys = df[self.date_col].to_numpy(dtype="datetime64[ns]").view("i8")
+            if np.any(keys[1:] < keys[:-1]):
+                # Keep the section's own row order (e.g. top_posts is ranked)
+                # and index it through a stable date sort instead.
+                self.order = np.argsort(keys, kind="stable")
+                keys = keys[self.order]
+            self.keys = keys
+
+        self.postings = {}
+        for dim in DIMENSIONS:
+            if dim not in df.columns:
+                continue
+            codes = df[dim].cat.codes.to_numpy()
+            if self.order is not None:
+                codes = codes[self.order]
+            # One stable sort groups positions by value, already ascending
+            # within each group.
+            by_code = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[by_code], np.arange(len(df[dim].cat.categories) + 1))
+            self.postings[dim] = {
+                name: by_code[bounds[i]:bounds[i + 1]]
+                for i, name in enumerate(df[dim].cat.categories)
+            }
+
+    def date_bounds(self, start, end):
+        if self.keys is None:
+            return 0, self.n_rows
+        lo = 0 if start is None else int(np.searchsorted(self.keys, start, side="left"))
+        hi = self.n_rows if end is None else int(np.searchsorted(self.keys, end, side="right"))
+        return lo, hi
+
+
+class FilterIndex:
+    """Pre-built time and dimension indexes over a ``MetricsStore``."""
+
+    def __init__(self, store):
+        self._store = store
+        self._sections = {}
+        self._lock = threading.Lock()
+        self.end_date = anchor(store.newest_date(section) for section in store.sections)
+
+    def _index(self, section):
+        index = self._sections.get(section)
+        if index is None:
+            with self._lock:
+                index = self._sections.get(section)
+                if index is None:
+                    index = self._sections[section] = _SectionIndex(self._store.frame(section))
+        return index
+
+    def window(self, days):
+        return window(self.end_date, days)
+
+    def rows(self, section, start=None, end=None, **dims):
+        """Row positions of ``section`` inside the date bounds and dimension values.
+
+        Returns a slice when no dimension filter applies to a date-ordered
+        section, otherwise an ascending array of positions.
+        """
+        index = self._index(section)
+        lo, hi = index.date_bounds(start, end)
+
+        selected = None
+        for dim, values in dims.items():
+            if not values or dim not in index.postings:
+                continue
+            postings = index.postings[dim]
+            parts = []
+            for value in values:
+                positions = postings.get(value)
+                if positions is None or not len(positions):
+                    continue
+                a, b = np.searchsorted(positions, (lo, hi))
+                parts.append(positions[a:b])
+            found = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+            selected = found if selected is None else np.intersect1d(selected, found, assume_unique=True)
+
+        if selected is None:
+            if index.order is None:
+                return slice(lo, hi)
+            selected = np.arange(lo, hi)
+        if index.order is not None:
+            selected = np.sort(index.order[selected])
+        return selected
+
+    def select(self, section, start=None, end=None, **dims):
+        df = self._store.frame(section)
+        return df.iloc[self.rows(section, start, end, **dims)]
+
+    def view(self, section, filters):
+        """``section`` restricted to the global controls in ``filters``."""
+        start, end = self.window(filters.days)
+        return self.select(section, start, end, account_name=filters.accounts)
+
+    def has_dimension(self, section, dim):
+        return dim in self._index(section).postings
+
+
+def filter_index(store):
+    return store.derived("filter_index", FilterIndex)
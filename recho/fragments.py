@@ -0,0 +1,61 @@
+"""
+Partial reruns for self-contained widget regions.
+
+Widgets inside a function decorated with ``fragment`` rerun only that
+function when used, not the whole script, so a button click or an edit in
+a text area does not rebuild the page's charts and tables. app.py brackets
+every full run with ``begin_run`` / ``end_run``; a fragment that reruns on
+its own compares its time with the last full run and shows what it saved.
+"""
+
+import functools
+import time
+
+import streamlit as st
+
+RUN_ID = "_recho_run_id"
+RUN_SECONDS = "_recho_run_seconds"
+
+
+def begin_run():
+    """Mark the start of a full script run; returns its start time."""
+    st.session_state[RUN_ID] = st.session_state.get(RUN_ID, 0) + 1
+    return time.perf_counter()
+
+
+def end_run(started):
+    st.session_state[RUN_SECONDS] = time.perf_counter() - started
+
+
+@st.fragment(run_every=1)
+def rerun_when_done(future, message):
+    """Show ``message`` until the background ``future`` is done, then rerun."""
+    if future.done():
+        st.rerun()
+    st.caption(message)
+
+
+def fragment(func):
+    """``st.fragment`` that reports the work skipped on its own reruns."""
+    seen_key = f"_recho_fragment_{func.__module__}.{func.__qualname__}"
+
+    @st.fragment
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        state = st.session_state
+        # The run id only changes on full runs, so seeing the same id again
+        # means this is a fragment-only rerun.
+        partial = state.get(seen_key) == state.get(RUN_ID)
+        state[seen_key] = state.get(RUN_ID)
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        full = state.get(RUN_SECONDS)
+        if partial and full:
+            seconds = time.perf_counter() - started
+            st.caption(
+                f"⚡ Updated this section only in {seconds * 1000:.0f} ms "
+                f"(skipped a {full * 1000:.0f} ms full rerun)"
+            )
+        return result
+
+    return run
@@ -0,0 +1,635 @@
+"""
+Streaming ingestion of dashboard metrics into a ``MetricsStore``.
+
+Two source layouts are supported:
+
+* the single ``dashboard_metrics.json`` document, read incrementally with
+  ``json.JSONDecoder.raw_decode`` over a sliding text buffer, so only one
+  row (plus a bounded chunk of pending rows per section) is held as Python
+  objects at a time;
+* a directory of newline-delimited JSON, one ``<section>.ndjson`` file per
+  section (``paid.daily_metrics.ndjson``) plus ``_values.json`` for scalars.
+
+``Ingestor.refresh()`` is cheap when nothing changed (one ``stat`` per file).
+When a source grows, sections keyed by ``date`` only get their new rows
+appended to the store; the small summary sections are rebuilt. In the JSON
+document, the text of the rows already loaded is not decoded again: the
+parser only hashes that span of characters and checks it against the
+length and digest recorded at the last load. If the history was restated
+(rows edited, reordered or removed), the check fails and the document is
+reloaded in full.
+
+An ``incoming`` directory can also receive batches: JSON documents shaped
+like the export but holding only new rows (``{"paid": {"daily_metrics":
+[...]}}``). Each ``*.json`` batch is merged once, in name order: dated rows
+are appended, other sections replaced and scalars updated. Write batches
+under another name and rename them into place, so a half-written file is
+never picked up.
+
+Run ``python -m recho.ingest PATH`` to compare parse time and peak memory
+against a plain ``json.load``, or ``--split DIR`` to write the NDJSON layout.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import tracemalloc
+import weakref
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from recho import disk_cache, perf, schema
+from recho.store import MetricsStore, build_frame, concat_frames
+
+logger = logging.getLogger(__name__)
+
+CHUNK_ROWS = 50_000
+READ_SIZE = 1 << 20
+
+# Sections with this column are append-only daily series; everything else is
+# a summary that upstream rewrites, so it is rebuilt on change.
+APPEND_KEY = "date"
+
+VALUES_FILE = "_values.json"
+
+ROW, SECTION, VALUE = "row", "section", "value"
+# Rows skipped as already loaded, and the text span of a section's rows.
+SKIPPED, SPAN = "skipped", "span"
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+@dataclass
+class IngestStats:
+    """What one load or refresh did."""
+
+    from_cache: bool = False
+    rows_read: int = 0
+    rows_appended: int = 0
+    sections_rebuilt: int = 0
+    batches_applied: int = 0
+    seconds: float = 0.0
+    peak_bytes: int = 0
+    schema_issues: int = 0
+
+    def __str__(self):
+        peak = f", peak {self.peak_bytes / 2**20:.1f} MiB" if self.peak_bytes else ""
+        if self.from_cache:
+            return f"memory-mapped from disk cache in {self.seconds:.3f}s{peak}"
+        batches = f", {self.batches_applied} batches merged" if self.batches_applied else ""
+        issues = f", {self.schema_issues} schema issues" if self.schema_issues else ""
+        return (
+            f"{self.rows_read:,} rows read, {self.rows_appended:,} appended, "
+            f"{self.sections_rebuilt} sections rebuilt{batches}{issues} in {self.seconds:.3f}s{peak}"
+        )
+
+
+# ============================================================================
+# ITERATIVE JSON PARSING
+# ============================================================================
+class _Reader:
+    """Sliding-window text buffer that decodes one JSON value at a time."""
+
+    def __init__(self, f, read_size):
+        self._f = f
+        self._read_size = read_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        # Characters of the file before ``buf``.
+        self.base = 0
+        # Digest of the text from ``record()`` up to ``buf[_mark]``.
+        self._hash = None
+        self._mark = 0
+
+    def _fill(self):
+        data = self._f.read(self._read_size)
+        if not data:
+            self.eof = True
+            return False
+        self._hashed()
+        self._mark = 0
+        self.base += self.pos
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    @property
+    def offset(self):
+        return self.base + self.pos
+
+    def _hashed(self):
+        if self._hash is not None:
+            self._hash.update(self.buf[self._mark:self.pos].encode("utf-8"))
+            self._mark = self.pos
+
+    def record(self):
+        """Start hashing the text from the current position on."""
+        self._hash = hashlib.blake2b(digest_size=16)
+        self._mark = self.pos
+
+    def checkpoint(self):
+        """The hash of the recorded text up to the current position."""
+        self._hashed()
+        return self._hash.copy()
+
+    def skip(self, length):
+        """Move ``length`` characters on without decoding them; False at the end of the file."""
+        while length:
+            if self.pos == len(self.buf) and not self._fill():
+                return False
+            step = min(length, len(self.buf) - self.pos)
+            self.pos += step
+            length -= step
+        return True
+
+    def peek(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self, expected):
+        found = self.peek()
+        if found not in expected:
+            raise ValueError(f"Expected one of {expected!r} but found {found!r}")
+        self.pos += 1
+        return found
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # A number that ends exactly at the buffer edge may continue
+                # in the next read, so only trust it once more text follows.
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+class Restated(ValueError):
+    """A section's rows no longer start with the rows loaded before."""
+
+
+def _rows(reader, name, known):
+    """Events for the rows of section ``name``, after its opening bracket."""
+    start = reader.offset
+    reader.record()
+    n_rows = 0
+    span = known.get(name)
+    if span is not None:
+        n_rows, length, known_digest = span
+        if not reader.skip(length):
+            raise Restated(name)
+        end, digest = reader.offset, reader.checkpoint()
+        if digest.hexdigest() != known_digest:
+            raise Restated(name)
+        yield SKIPPED, name, n_rows
+        more = reader.take(",]") == ","
+    else:
+        more = True
+    while more:
+        yield ROW, name, reader.value()
+        n_rows += 1
+        end, digest = reader.offset, reader.checkpoint()
+        more = reader.take(",]") == ","
+    yield SPAN, name, (n_rows, end - start, digest.hexdigest())
+
+
+def _walk(reader, path, known):
+    reader.take("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+        return
+    while True:
+        key = reader.value()
+        reader.take(":")
+        name = f"{path}.{key}" if path else key
+        head = reader.peek()
+        if head == "{":
+            yield from _walk(reader, name, known)
+        elif head == "[":
+            reader.pos += 1
+            yield SECTION, name, None
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                yield from _rows(reader, name, known)
+        else:
+            yield VALUE, name, reader.value()
+        if reader.take(",}") == "}":
+            return
+
+
+def iter_events(path, read_size=READ_SIZE, known=None):
+    """Yield ``(kind, name, payload)`` for every section, row and scalar.
+
+    Each non-empty section's rows end with a ``SPAN`` event: ``(rows,
+    length, digest)`` of the text from its first row to the end of its last.
+    A section in ``known`` (name -> such a span) has that many leading rows
+    skipped, as one ``SKIPPED`` event with their count, once its text is
+    found unchanged; otherwise ``Restated`` is raised.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        yield from _walk(_Reader(f, read_size), "", known or {})
+
+
+def iter_ndjson(path, offset=0):
+    """Yield ``(row, end_offset)`` for each complete line after ``offset``."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                # A writer is still appending this line; pick it up next time.
+                return
+            offset += len(line)
+            if line.strip():
+                yield json.loads(line), offset
+
+
+# ============================================================================
+# SECTION BUILDING
+# ============================================================================
+class _SectionBuilder:
+    """Collects rows in bounded chunks and converts each chunk to columns."""
+
+    def __init__(self, section, issues):
+        self.section = section
+        self.issues = issues
+        self._rows = []
+        self._frames = []
+
+    def add(self, row):
+        self._rows.append(row)
+        if len(self._rows) >= CHUNK_ROWS:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._frames.append(build_frame(self._rows, self.section, self.issues))
+            self._rows = []
+
+    def frame(self):
+        self._flush()
+        if not self._frames:
+            return build_frame([], self.section)
+        return concat_frames(self._frames)
+
+
+# ============================================================================
+# INGESTOR
+# ============================================================================
+class Ingestor:
+    """Owns the store for one source path and keeps it in sync with it."""
+
+    def __init__(self, path, trace_memory=False, use_disk_cache=None, incoming=None):
+        self.path = path
+        self.incoming = incoming
+        self.use_disk_cache = disk_cache.enabled() if use_disk_cache is None else use_disk_cache
+        self.store = None
+        self.last_stats = None
+        # Schema drift seen in any load of this source (see recho.schema).
+        self.issues = set()
+        self._new_issues = set()
+        self._signature = None
+        # dated JSON section -> (rows, length, digest) of its loaded rows' text
+        self._spans = {}
+        self._offsets = {}
+        self._file_signatures = {}
+        self._applied = set()
+        # (store, path, section -> (generation, rows)) of the newest disk-cache entry
+        self._entry = None
+        self._lock = threading.Lock()
+        self.refresh(trace_memory)
+
+    def _stat(self):
+        if os.path.isdir(self.path):
+            return tuple(
+                (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+                for entry in sorted(os.scandir(self.path), key=lambda e: e.name)
+                if entry.name.endswith(".ndjson") or entry.name == VALUES_FILE
+            )
+        st = os.stat(self.path)
+        return st.st_size, st.st_mtime_ns
+
+    def _batches(self):
+        if not self.incoming or not os.path.isdir(self.incoming):
+            return ()
+        return tuple(sorted(
+            (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+            for entry in os.scandir(self.incoming)
+            if entry.name.endswith(".json") and entry.is_file()
+        ))
+
+    def refresh(self, trace_memory=False):
+        """Bring the store up to date with the source; returns the stats or None."""
+        with self._lock:
+            return self._refresh(trace_memory)
+
+    def _refresh(self, trace_memory):
+        signature = self._stat()
+        batches = self._batches()
+        pending = [name for name, _, _ in batches if name not in self._applied]
+        if signature == self._signature and not pending:
+            return None
+
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        stats = IngestStats()
+        self._new_issues = set()
+        self._load_lazy_sections()
+        try:
+            cache_key = (signature, batches)
+            if self.store is None and self.use_disk_cache:
+                stats.from_cache = self._load_cached(cache_key)
+                perf.cache_event("disk_cache", stats.from_cache)
+            if not stats.from_cache:
+                if signature != self._signature:
+                    if os.path.isdir(self.path):
+                        self._load_ndjson(stats)
+                    else:
+                        self._load_json(stats)
+                self._merge_batches(batches, stats)
+                if self.use_disk_cache:
+                    self._write_cache(cache_key)
+        finally:
+            self._log_issues(stats)
+            stats.seconds = time.perf_counter() - started
+            if trace_memory:
+                stats.peak_bytes = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+        self._signature = signature
+        self.last_stats = stats
+        return stats
+
+    def _log_issues(self, stats):
+        stats.schema_issues = len(self._new_issues)
+        for issue in sorted(self._new_issues - self.issues):
+            logger.warning("schema drift in %s: %s", self.path, issue)
+        self.issues |= self._new_issues
+
+    def _load_lazy_sections(self):
+        # Sections still backed by a disk-cache entry must be read before the
+        # entry is replaced; if another process already replaced it, start over.
+        if self.store is None or len(self.store.loaded_sections) == len(self.store.sections):
+            return
+        try:
+            self.store.load(self.store.sections)
+        except OSError:
+            self.store = None
+            self._signature = None
+            self._spans = {}
+            self._offsets = {}
+            self._file_signatures = {}
+            self._applied = set()
+
+    def _state(self):
+        return {
+            "spans": self._spans,
+            "offsets": self._offsets,
+            "file_signatures": self._file_signatures,
+            "applied": sorted(self._applied),
+            "rows": {section: len(self.store.frame(section)) for section in self.store.sections},
+        }
+
+    def _write_cache(self, cache_key):
+        # A section with the generation and row count it had in the last entry
+        # still holds the same rows, so the new entry links its files.
+        sizes = {section: (self.store.generation(section), len(self.store.frame(section))) for section in self.store.sections}
+        reuse = {}
+        if self._entry is not None and self._entry[0]() is self.store:
+            _, entry, written = self._entry
+            reuse = {section: os.path.join(entry, section) for section, size in sizes.items() if written.get(section) == size}
+        target = disk_cache.write(self.path, cache_key, self.store, self._state(), reuse)
+        self._entry = None if target is None else (weakref.ref(self.store), target, sizes)
+
+    def _load_cached(self, signature):
+        cached = disk_cache.read(self.path, signature)
+        if cached is None:
+            return False
+        self.store, state = cached
+        self._spans = {name: tuple(span) for name, span in state.get("spans", {}).items()}
+        self._offsets = state["offsets"]
+        self._file_signatures = {name: tuple(sig) for name, sig in state["file_signatures"].items()}
+        self._applied = set(state.get("applied", ()))
+        # A store read from the cache starts every section at generation 0.
+        written = {section: (0, rows) for section, rows in state.get("rows", {}).items()}
+        self._entry = (weakref.ref(self.store), disk_cache.cache_path(self.path, signature), written)
+        return True
+
+    def _publish(self, appended, replaced, values):
+        values = schema.check_values(values, self._new_issues)
+        if self.store is None:
+            self.store = MetricsStore({**replaced, **appended}, values)
+        elif appended or replaced or values:
+            self.store.update(appended, replaced, values)
+
+    def _read_json(self, known):
+        """Section builders, scalars, skipped row counts and new spans, skipping the ``known`` rows."""
+        builders, values, skipped, spans, dated = {}, {}, {}, {}, {}
+        rows_read = 0
+        for kind, name, payload in iter_events(self.path, known=known):
+            if kind == SECTION:
+                builders[name] = _SectionBuilder(name, self._new_issues)
+            elif kind == SKIPPED:
+                skipped[name] = payload
+                dated[name] = True
+            elif kind == ROW:
+                rows_read += 1
+                dated.setdefault(name, APPEND_KEY in payload)
+                builders[name].add(payload)
+            elif kind == SPAN:
+                # Summaries are rebuilt on every change, so only dated spans are kept.
+                if dated[name]:
+                    spans[name] = payload
+            else:
+                values[name] = payload
+        return builders, values, skipped, spans, rows_read
+
+    def _load_json(self, stats):
+        incremental = self.store is not None
+        try:
+            builders, values, skipped, spans, rows_read = self._read_json(self._spans if incremental else {})
+        except Restated as exc:
+            logger.warning("%s restated rows of %s; reloading it in full", self.path, exc)
+            incremental = False
+            self._new_issues = set()
+            builders, values, skipped, spans, rows_read = self._read_json({})
+        stats.rows_read += rows_read
+
+        appended, replaced = {}, {}
+        for name, builder in builders.items():
+            if name in skipped:
+                frame = builder.frame()
+                if len(frame):
+                    appended[name] = frame
+                    stats.rows_appended += len(frame)
+            else:
+                replaced[name] = builder.frame()
+                stats.sections_rebuilt += 1
+        self._spans = spans
+
+        if not incremental:
+            # Rebuilt from scratch, so every batch is merged again on top.
+            self.store = None
+            self._applied = set()
+        self._publish(appended, replaced, values)
+
+    def _load_ndjson(self, stats):
+        appended, replaced = {}, {}
+        for entry in sorted(os.scandir(self.path), key=lambda e: e.name):
+            if not entry.name.endswith(".ndjson"):
+                continue
+            name = entry.name[: -len(".ndjson")]
+            st = entry.stat()
+            if self._file_signatures.get(name) == (st.st_size, st.st_mtime_ns):
+                continue
+            self._file_signatures[name] = (st.st_size, st.st_mtime_ns)
+            offset = self._offsets.get(name, 0)
+            # Dated sections only ever grow, so reading on from the last
+            # offset is enough; summaries (and truncated files) are reread.
+            incremental = (
+                offset > 0
+                and st.st_size >= offset
+                and APPEND_KEY in self.store.frame(name).columns
+            )
+            builder = _SectionBuilder(name, self._new_issues)
+            end = offset if incremental else 0
+            for row, end in iter_ndjson(entry.path, end):
+                stats.rows_read += 1
+                builder.add(row)
+            frame = builder.frame()
+            if not incremental:
+                replaced[name] = frame
+                stats.sections_rebuilt += 1
+            elif len(frame):
+                appended[name] = frame
+                stats.rows_appended += len(frame)
+            self._offsets[name] = end
+
+        values = {}
+        values_path = os.path.join(self.path, VALUES_FILE)
+        if os.path.exists(values_path):
+            with open(values_path, "r", encoding="utf-8") as f:
+                values = json.load(f)
+        self._publish(appended, replaced, values)
+
+    def _merge_batches(self, batches, stats):
+        appended, replaced, values = {}, {}, {}
+        for name, _, _ in batches:
+            if name in self._applied:
+                continue
+            builders = {}
+            dated = {}
+            for kind, section, payload in iter_events(os.path.join(self.incoming, name)):
+                if kind == SECTION:
+                    builders[section] = _SectionBuilder(section, self._new_issues)
+                elif kind == ROW:
+                    stats.rows_read += 1
+                    dated.setdefault(section, APPEND_KEY in payload)
+                    builders[section].add(payload)
+                elif kind == VALUE:
+                    values[section] = payload
+            for section, builder in builders.items():
+                frame = builder.frame()
+                if dated.get(section) and section in replaced:
+                    replaced[section] = concat_frames([replaced[section], frame])
+                    stats.rows_appended += len(frame)
+                elif dated.get(section) and section in self.store.sections:
+                    appended.setdefault(section, []).append(frame)
+                    stats.rows_appended += len(frame)
+                else:
+                    replaced[section] = frame
+                    # A replacement supersedes rows appended by earlier batches.
+                    appended.pop(section, None)
+                    stats.sections_rebuilt += 1
+            self._applied.add(name)
+            stats.batches_applied += 1
+        appended = {section: concat_frames(frames) for section, frames in appended.items()}
+        self._publish(appended, replaced, values)
+
+
+def split_to_ndjson(path, out_dir):
+    """Write ``path`` as the per-section NDJSON directory layout."""
+    os.makedirs(out_dir, exist_ok=True)
+    values = {}
+    handle = None
+    try:
+        for kind, name, payload in iter_events(path):
+            if kind == SECTION:
+                if handle is not None:
+                    handle.close()
+                handle = open(os.path.join(out_dir, f"{name}.ndjson"), "w", encoding="utf-8")
+            elif kind == ROW:
+                handle.write(json.dumps(payload))
+                handle.write("\n")
+            elif kind == VALUE:
+                values[name] = payload
+    finally:
+        if handle is not None:
+            handle.close()
+    with open(os.path.join(out_dir, VALUES_FILE), "w", encoding="utf-8") as f:
+        json.dump(values, f, indent=2)
+
+
+def write_ndjson(store, out_dir):
+    """Write every section and scalar of ``store`` as the NDJSON directory layout."""
+    os.makedirs(out_dir, exist_ok=True)
+    for section in store.sections:
+        df = store.frame(section).copy(deep=False)
+        for col in df.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = df[col].dt.strftime("%Y-%m-%d %H:%M:%S")
+            elif df[col].dtype == np.float32:
+                # float32 digits beyond its precision would be written as noise.
+                df[col] = df[col].astype(np.float64).round(6)
+        path = os.path.join(out_dir, f"{section}.ndjson")
+        df.to_json(f"{path}.tmp", orient="records", lines=True)
+        os.replace(f"{path}.tmp", path)
+    with open(os.path.join(out_dir, VALUES_FILE), "w", encoding="utf-8") as f:
+        json.dump(store.values, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure or convert a dashboard metrics source.")
+    parser.add_argument("path", help="dashboard_metrics.json or an NDJSON section directory")
+    parser.add_argument("--split", metavar="DIR", help="write the per-section NDJSON layout to DIR")
+    args = parser.parse_args(argv)
+
+    if args.split:
+        split_to_ndjson(args.path, args.split)
+        print(f"Wrote NDJSON sections to {args.split}")
+        return
+
+    ingestor = Ingestor(args.path, trace_memory=True)
+    print(f"streaming:  {ingestor.last_stats}")
+
+    if not os.path.isdir(args.path):
+        tracemalloc.start()
+        started = time.perf_counter()
+        MetricsStore.from_json(args.path)
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"json.load:  {seconds:.3f}s, peak {peak / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+Weekly summary, alerts and action items computed from the data.
+
+``compute(data)`` reads a data source's queries (see ``recho.sources``) and
+derives, for the newest week in the data against the week before it:
+
+* week-over-week changes of paid spend, revenue, ROAS and CPA, organic
+  engagement and brand mentions;
+* mention spikes, overall and per subreddit, as detected by the brand
+  engine (``recho.mentions``);
+* campaigns in ``paid.campaign_summary`` whose CPA is above ``CPA_TARGET``
+  (``RECHO_CPA_TARGET``, default 25).
+
+The findings become an ``Insights`` with alert cards, a prioritized action
+table and a summary text written by a summarizer: any function of the
+``Insights``, by default ``template_summary``, which fills fixed templates
+locally.
+
+``InsightsWorker`` runs ``compute`` on a background thread, once per data
+version, and keeps the last few results. app.py requests the current
+version on every rerun, so the work starts when data loads or changes and
+pages only read finished results; a page opened first shows the previous
+version's insights (or a placeholder) until the new ones are ready.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from recho import mentions as brand
+from recho.derive import daily_totals, rolling_sum, safe_div
+from recho.filters import Filters
+
+CPA_TARGET = float(os.environ.get("RECHO_CPA_TARGET", "25"))
+
+WEEK = 7
+
+# Changes smaller than this (percent) are not worth an action item.
+NOTABLE_CHANGE = 10.0
+
+HIGH, MEDIUM, LOW = "🔴 High", "🟡 Medium", "🟢 Low"
+
+# priority -> days from the newest data date to the action's deadline
+DEADLINES = {HIGH: 2, MEDIUM: 6, LOW: 9}
+
+SECTIONS = (
+    "paid.daily_metrics",
+    "paid.campaign_summary",
+    "paid.subreddit_performance",
+    "organic.daily_metrics",
+    brand.TREND,
+    brand.MENTIONS,
+    brand.BY_SUBREDDIT,
+)
+
+ALL_TIME = Filters("All Time")
+
+
+@dataclass
+class Alert:
+    """One alert card: ``level`` is ``success``, ``warning`` or ``danger``."""
+
+    level: str
+    title: str
+    lines: list
+
+
+@dataclass
+class Insights:
+    """Findings for one data version."""
+
+    version: str
+    week_start: pd.Timestamp = None
+    week_end: pd.Timestamp = None
+    # metric -> (this week, last week, percent change)
+    changes: dict = field(default_factory=dict)
+    spikes: pd.DataFrame = None
+    subreddit_spikes: pd.DataFrame = None
+    over_target: pd.DataFrame = None
+    highlights: list = field(default_factory=list)
+    action_items: list = field(default_factory=list)
+    recommendations: list = field(default_factory=list)
+    alerts: list = field(default_factory=list)
+    actions: list = field(default_factory=list)
+    summary: str = ""
+    seconds: float = 0.0
+
+    def action(self, priority, text):
+        """Record an action item for the summary and the action table."""
+        self.action_items.append(text)
+        deadline = self.week_end + pd.Timedelta(days=DEADLINES[priority]) if self.week_end is not None else None
+        self.actions.append({
+            "Priority": priority,
+            "Action": text,
+            "Deadline": deadline.strftime("%Y-%m-%d") if deadline is not None else "",
+        })
+
+
+# ============================================================================
+# FINDINGS
+# ============================================================================
+def pct_change(current, previous):
+    """Percent change, NaN when there is nothing to compare with."""
+    if previous is None:
+        return np.nan
+    return float(safe_div(current - previous, abs(previous), 100))
+
+
+def weekly(df, measures, date_col="date"):
+    """Sums of ``measures`` over the newest week and the week before it.
+
+    Returns ``(this_week, last_week, week_end)``; the weeks are the last
+    ``WEEK`` calendar days up to the newest date in ``df`` and the ``WEEK``
+    days before them.
+    """
+    daily = daily_totals(df, measures, date_col)
+    if not len(daily):
+        return None, None, None
+    sums = {m: rolling_sum(daily[m].to_numpy(dtype=np.float64), WEEK, min_periods=1) for m in measures}
+    this_week = {m: float(s[-1]) for m, s in sums.items()}
+    last_week = {m: float(s[-1 - WEEK]) if len(s) > WEEK else np.nan for m, s in sums.items()}
+    return this_week, last_week, daily[date_col].iloc[-1]
+
+
+def cpa_over_target(campaigns, target=CPA_TARGET):
+    """Campaigns whose CPA is above ``target``, worst first."""
+    cpa = safe_div(campaigns["spend"], campaigns["conversions"])
+    out = campaigns.assign(cpa=cpa)[["campaign_name", "spend", "conversions", "cpa"]]
+    return out[out["cpa"] > target].sort_values("cpa", ascending=False, ignore_index=True)
+
+
+def _signed(value, unit="%"):
+    return "n/a" if value is None or np.isnan(value) else f"{value:+.1f}{unit}"
+
+
+def _day(ts):
+    return f"{ts:%b} {ts.day}, {ts.year}"
+
+
+def compute(data, target=CPA_TARGET):
+    """``Insights`` for the current version of the queries ``data``."""
+    started = time.perf_counter()
+    insights = Insights(version=data.data_version)
+
+    paid_this, paid_last, week_end = weekly(data.view("paid.daily_metrics", ALL_TIME), ("spend", "revenue", "conversions"))
+    organic_this, organic_last, _ = weekly(
+        data.view("organic.daily_metrics", ALL_TIME), ("impressions", "upvotes", "comments", "clicks")
+    )
+    # The brand engine's daily series: raw mentions when the source has them.
+    report = brand.report(data, ALL_TIME)
+    brand_daily = report.daily.rename(columns={"mentions": "mention_count"}) if report is not None else pd.DataFrame()
+    brand_this, brand_last, _ = weekly(brand_daily, ("mention_count",))
+
+    if week_end is not None:
+        insights.week_end = week_end
+        insights.week_start = week_end - pd.Timedelta(days=WEEK - 1)
+
+    changes = insights.changes
+    if paid_this is not None:
+        for measure in ("spend", "revenue", "conversions"):
+            changes[measure] = (paid_this[measure], paid_last[measure], pct_change(paid_this[measure], paid_last[measure]))
+        roas = (safe_div(paid_this["revenue"], paid_this["spend"]), safe_div(paid_last["revenue"], paid_last["spend"]))
+        cpa = (safe_div(paid_this["spend"], paid_this["conversions"]), safe_div(paid_last["spend"], paid_last["conversions"]))
+        changes["roas"] = (*roas, pct_change(*roas))
+        changes["cpa"] = (*cpa, pct_change(*cpa))
+    if organic_this is not None:
+        engagement = tuple(
+            safe_div(week["upvotes"] + week["comments"], week["impressions"], 100)
+            for week in (organic_this, organic_last)
+        )
+        changes["engagement_rate"] = (*engagement, pct_change(*engagement))
+        changes["clicks"] = (organic_this["clicks"], organic_last["clicks"], pct_change(organic_this["clicks"], organic_last["clicks"]))
+    if brand_this is not None:
+        mentions = (brand_this["mention_count"], brand_last["mention_count"])
+        changes["mentions"] = (*mentions, pct_change(*mentions))
+        sentiment = _weekly_sentiment(brand_daily)
+        changes["sentiment"] = (*sentiment, pct_change(*sentiment))
+
+    if report is not None:
+        insights.spikes, insights.subreddit_spikes = report.spikes, report.subreddit_spikes
+    else:
+        insights.spikes = pd.DataFrame(columns=["date", "mention_count", "baseline", "change_pct", "z"])
+    campaigns = data.aggregate("paid.campaign_summary", ALL_TIME, "campaign_name", ("spend", "conversions", "revenue"))
+    insights.over_target = cpa_over_target(campaigns, target)
+    subreddits = data.aggregate(
+        "paid.subreddit_performance", ALL_TIME, "subreddit", ("spend", "revenue"), sort="roas"
+    )
+
+    _highlights(insights, campaigns, subreddits, data.value("brand.sentiment_ratio"))
+    _actions(insights, subreddits, target)
+    _alerts(insights)
+    insights.seconds = time.perf_counter() - started
+    return insights
+
+
+def _weekly_sentiment(daily):
+    """Mention-weighted average sentiment of the newest week and the one before."""
+    if not len(daily):
+        return np.nan, np.nan
+    # Days without mentions have no average sentiment.
+    weighted = daily.assign(weighted=daily["sentiment"].fillna(0) * daily["mention_count"])
+    this_week, last_week, _ = weekly(weighted, ("weighted", "mention_count"))
+    return (
+        safe_div(this_week["weighted"], this_week["mention_count"]),
+        safe_div(last_week["weighted"], last_week["mention_count"]),
+    )
+
+
+def _highlights(insights, campaigns, subreddits, sentiment_ratio):
+    changes = insights.changes
+    out = insights.highlights
+    if len(campaigns):
+        best = campaigns.sort_values("roas", ascending=False).iloc[0]
+        out.append(f"{best['campaign_name']} leads paid campaigns at {best['roas']:.2f} ROAS")
+    if "roas" in changes:
+        roas, _, change = changes["roas"]
+        out.append(f"Paid ROAS this week {roas:.2f} ({_signed(change)} week over week)")
+    if len(subreddits):
+        top = subreddits.iloc[0]
+        out.append(f"{top['subreddit']} is the top paid subreddit at {top['roas']:.2f} ROAS")
+    if "engagement_rate" in changes:
+        rate, _, change = changes["engagement_rate"]
+        out.append(f"Organic engagement rate {rate:.2f}% ({_signed(change)} week over week)")
+    if "mentions" in changes:
+        mentions, _, change = changes["mentions"]
+        out.append(
+            f"Brand sentiment at {sentiment_ratio}% positive, "
+            f"{mentions:,.0f} mentions this week ({_signed(change)})"
+        )
+
+
+def _actions(insights, subreddits, target):
+    changes = insights.changes
+    recent = insights.spikes
+    if insights.week_start is not None:
+        recent = recent[recent["date"] >= insights.week_start]
+    for spike in recent.itertuples():
+        insights.action(HIGH, f"Review mentions spike on {_day(spike.date)} ({spike.change_pct:+.0f}% vs avg)")
+    if insights.subreddit_spikes is not None and insights.week_start is not None:
+        recent = insights.subreddit_spikes[insights.subreddit_spikes["date"] >= insights.week_start]
+        for subreddit, count in recent["subreddit"].value_counts(sort=False).items():
+            insights.action(MEDIUM, f"Join the conversation in {subreddit} - {count} mention spike day(s) this week")
+    for row in insights.over_target.itertuples():
+        insights.action(HIGH, f"{row.campaign_name} CPA at ${row.cpa:.2f} (target: ${target:.2f}) - reallocate budget")
+    if "roas" in changes and changes["roas"][2] <= -NOTABLE_CHANGE:
+        insights.action(MEDIUM, f"Paid ROAS down {-changes['roas'][2]:.0f}% week over week - review bids")
+    if "engagement_rate" in changes and changes["engagement_rate"][2] <= -NOTABLE_CHANGE:
+        insights.action(MEDIUM, f"Organic engagement down {-changes['engagement_rate'][2]:.0f}% - refresh creative")
+    if len(subreddits) > 1:
+        worst = subreddits.iloc[-1]
+        insights.action(MEDIUM, f"{worst['subreddit']} underperforming ({worst['roas']:.2f} ROAS) - test new creative")
+    insights.action(LOW, "Update content calendar")
+
+    recs = insights.recommendations
+    if len(subreddits):
+        leaders = " and ".join(subreddits["subreddit"].astype(str).head(2))
+        recs.append(f"Increase budget to top-performing subreddits ({leaders})")
+    if len(insights.over_target):
+        recs.append(f"Shift spend from {insights.over_target['campaign_name'].iloc[0]} until CPA is back under ${target:.0f}")
+    if "sentiment" in changes and changes["sentiment"][2] < 0:
+        recs.append("Engage with recent neutral and negative threads to lift sentiment")
+    else:
+        recs.append("Launch community appreciation series while sentiment is high")
+
+
+def _alerts(insights):
+    # Only spikes of the newest week are current.
+    recent = insights.spikes
+    if insights.week_start is not None:
+        recent = recent[recent["date"] >= insights.week_start]
+    if len(recent):
+        spike = recent.iloc[-1]
+        insights.alerts.append(Alert("warning", "⚠️ Mentions Spike", [
+            ("Date", _day(spike["date"])),
+            ("Increase", f"{spike['change_pct']:+.0f}% vs avg"),
+        ]))
+    else:
+        insights.alerts.append(Alert("success", "✅ No Mention Spikes", [
+            ("Baseline", f"{brand.EWMA_SPAN}-day EWMA"),
+            ("Threshold", f"{brand.SPIKE_Z:g}σ above avg"),
+        ]))
+    if "sentiment" in insights.changes:
+        _, _, change = insights.changes["sentiment"]
+        up = np.isnan(change) or change >= 0
+        insights.alerts.append(Alert("success" if up else "danger", "✅ Sentiment Up" if up else "🔻 Sentiment Down", [
+            ("Period", "Last 7 days"),
+            ("Change", _signed(change)),
+        ]))
+
+
+# ============================================================================
+# SUMMARY
+# ============================================================================
+def template_summary(insights):
+    """The weekly summary text, filled in from fixed templates."""
+    lines = []
+    if insights.week_start is not None:
+        start, end = insights.week_start, insights.week_end
+        span = f"{start:%B} {start.day}-{end.day}" if start.month == end.month else f"{start:%B} {start.day} - {end:%B} {end.day}"
+        lines += [f"**Week of {span}, {end.year}**", ""]
+    lines += ["🎯 **Highlights:**"] + [f"• {h}" for h in insights.highlights]
+    lines += ["", "⚠️ **Action Items:**"] + [f"• {a}" for a in insights.action_items]
+    lines += ["", "💡 **Recommendations:**"] + [f"{i}. {r}" for i, r in enumerate(insights.recommendations, 1)]
+    return "\n".join(lines)
+
+
+# ============================================================================
+# BACKGROUND WORKER
+# ============================================================================
+class InsightsWorker:
+    """Computes ``Insights`` on a background thread, once per data version."""
+
+    def __init__(self, summarize=template_summary, max_workers=1, keep=4):
+        self.summarize = summarize
+        self.keep = keep
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="recho-insights")
+        # data version -> Future, oldest first
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def request(self, data):
+        """The ``Future`` for the insights of ``data``'s current version."""
+        version = data.data_version
+        with self._lock:
+            future = self._jobs.get(version)
+            if future is None:
+                future = self._pool.submit(self._run, data)
+                self._jobs[version] = future
+                while len(self._jobs) > self.keep:
+                    self._jobs.popitem(last=False)
+            self._jobs.move_to_end(version)
+        return future
+
+    def forget(self, data, future=None):
+        """Drop the job of ``data``'s current version (if it is still ``future``) so it runs again."""
+        with self._lock:
+            if future is None or self._jobs.get(data.data_version) is future:
+                self._jobs.pop(data.data_version, None)
+
+    def refresh(self, data):
+        """A new job for ``data``'s current version, replacing any earlier one."""
+        self.forget(data)
+        return self.request(data)
+
+    def latest(self):
+        """The newest finished ``Insights`` of any version, or None."""
+        with self._lock:
+            futures = list(self._jobs.values())
+        for future in reversed(futures):
+            if future.done() and future.exception() is None:
+                return future.result()
+        return None
+
+    def _run(self, data):
+        data.load(SECTIONS)
+        insights = compute(data)
+        insights.summary = self.summarize(insights)
+        return insights
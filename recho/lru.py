@@ -0,0 +1,49 @@
+"""
+Bounded in-process caches for results derived from one data version.
+
+Analytics that are too costly to redo on every rerun (brand reports,
+attribution, the accounts table) are kept in an ``LRUCache`` under a key
+that includes the data version and the filters, so a new version simply
+stops being asked for the old entries and they age out. Hits and misses are
+reported to ``recho.perf`` under the cache's name.
+"""
+
+import threading
+from collections import OrderedDict
+
+from recho import perf
+
+DEFAULT_SIZE = 64
+
+
+class LRUCache:
+    """Thread-safe map of key -> result holding the ``size`` most recently used entries."""
+
+    def __init__(self, name, size=DEFAULT_SIZE):
+        self.name = name
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, build):
+        """The result for ``key``, calling ``build()`` only on a miss (None is a result too)."""
+        with self._lock:
+            hit = key in self._entries
+            result = self._entries.get(key)
+            if hit:
+                self._entries.move_to_end(key)
+        perf.cache_event(self.name, hit)
+        if not hit:
+            result = build()
+            with self._lock:
+                self._entries[key] = result
+                while len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
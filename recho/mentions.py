@@ -0,0 +1,366 @@
+"""
+Brand mention analytics: rolling sentiment, share of voice, spikes and shifts.
+
+The engine works on daily series. With a ``brand.mentions`` section (one row
+per mention: ``date``, ``brand``, ``subreddit``, ``sentiment`` label,
+``sentiment_score`` in [0, 1], ``upvotes``, ``comments``) they come from the
+source's ``daily`` query, which sums the mentions per day, brand and
+subreddit incrementally as they arrive (``recho.rollups.DailySums``, or one
+``GROUP BY`` on SQLite). Without it, the own brand's series is
+``brand.mention_trend`` and there is no share of voice.
+
+Over the whole history, as (days x series) arrays:
+
+* ``ewma``: exponentially weighted moving averages of ``EWMA_SPAN`` days,
+  of mention counts and of mention-weighted sentiment;
+* ``ewma_zscores``: each day against the EWMA mean and deviation of the days
+  before it, the deviation floored at the Poisson ``sqrt(mean)`` so quiet
+  series do not flag single mentions. Spikes are days at least ``SPIKE_Z``
+  (``SUBREDDIT_SPIKE_Z`` for the own brand per subreddit) above and
+  ``SPIKE_MIN_CHANGE`` percent over that baseline;
+* ``changepoints``: days where the mean of the next ``CHANGE_WINDOW`` days
+  differs from the previous ``CHANGE_WINDOW`` by ``CHANGE_Z`` standard errors,
+  from cumulative sums;
+* ``robust_z``: subreddits whose sentiment is unusual among all
+  subreddits (a median / MAD z-score beyond ``OUTLIER_Z``), from the
+  mentions or ``brand.by_subreddit``.
+
+``report(data, filters)`` slices the results to the filter's date window
+and compares it with the window before, cached per data version and filters.
+Every step is an array operation over days and series, so the cost does not
+depend on the number of mentions once they are summed per day.
+"""
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from recho import perf
+from recho.derive import daily_totals, safe_div
+from recho.filters import Filters, day_positions
+from recho.lru import LRUCache
+
+MENTIONS = "brand.mentions"
+TREND = "brand.mention_trend"
+BY_SUBREDDIT = "brand.by_subreddit"
+
+OWN_BRAND = os.environ.get("RECHO_BRAND", "Your Brand")
+
+EWMA_SPAN = 7
+WARMUP_DAYS = 14  # days of history before a day can be flagged
+SPIKE_Z = 2.0
+SPIKE_MIN_CHANGE = 50.0  # percent above the baseline
+# Stricter per subreddit: with dozens of series, 2 sigma days happen by chance.
+SUBREDDIT_SPIKE_Z = 3.0
+CHANGE_WINDOW = 14
+CHANGE_Z = 4.0
+OUTLIER_Z = 2.5
+
+_ALL_TIME = Filters("All Time")
+
+DAY = np.timedelta64(1, "D")
+
+
+# ============================================================================
+# SERIES
+# ============================================================================
+def ewma(values, span=EWMA_SPAN):
+    """EWMA along the first axis of a 1-D or (days x series) array."""
+    values = np.asarray(values, dtype=np.float64)
+    frame = pd.DataFrame(values.reshape(len(values), -1))
+    return frame.ewm(span=span, adjust=False).mean().to_numpy().reshape(values.shape)
+
+
+def ewma_zscores(counts, span=EWMA_SPAN, warmup=WARMUP_DAYS):
+    """``(baseline, z)``: each day's EWMA baseline from the days before it and its z-score.
+
+    Works on 1-D or (days x series) counts; the first ``warmup`` days get NaN.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    ewm = pd.DataFrame(counts.reshape(len(counts), -1)).ewm(span=span, adjust=False)
+    mean = ewm.mean().to_numpy()
+    std = ewm.std(bias=True).to_numpy()
+    baseline = np.full_like(mean, np.nan)
+    scale = np.full_like(mean, np.nan)
+    baseline[1:] = mean[:-1]
+    scale[1:] = np.maximum(std[:-1], np.sqrt(np.maximum(mean[:-1], 1)))
+    baseline[:warmup] = np.nan
+    z = (counts.reshape(baseline.shape) - baseline) / scale
+    return baseline.reshape(counts.shape), z.reshape(counts.shape)
+
+
+def is_spike(counts, baseline, z, min_z=SPIKE_Z, min_change=SPIKE_MIN_CHANGE):
+    """Days at least ``min_z`` and ``min_change`` percent above their baseline."""
+    with np.errstate(invalid="ignore"):
+        return (z >= min_z) & (safe_div(counts - baseline, baseline, 100, np.inf) >= min_change)
+
+
+def changepoints(values, window=CHANGE_WINDOW, min_z=CHANGE_Z):
+    """Positions where the level of ``values`` shifts, with the means before and after.
+
+    Day ``t`` is scored by the difference of the means of days
+    ``[t - window, t)`` and ``[t, t + window)`` over its standard error, and
+    kept if the score reaches ``min_z`` and is the largest within ``window``
+    days on either side.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n < 2 * window:
+        return np.empty(0, dtype=np.intp), np.empty(0), np.empty(0)
+    cum = np.concatenate([[0.0], np.cumsum(values)])
+    cum2 = np.concatenate([[0.0], np.cumsum(values ** 2)])
+    t = np.arange(window, n - window + 1)
+    before = (cum[t] - cum[t - window]) / window
+    after = (cum[t + window] - cum[t]) / window
+    var = ((cum2[t] - cum2[t - window]) + (cum2[t + window] - cum2[t])) / (2 * window) - ((before + after) / 2) ** 2
+    # Floored like the spike baseline: counts vary at least as much as a Poisson series.
+    var = np.maximum(var, np.maximum((before + after) / 2, 1))
+    score = np.abs(after - before) / np.sqrt(2 * var / window)
+    padded = np.pad(score, window, constant_values=-np.inf)
+    local_max = np.lib.stride_tricks.sliding_window_view(padded, 2 * window + 1).max(axis=1)
+    keep = (score >= min_z) & (score == local_max)
+    return t[keep], before[keep], after[keep]
+
+
+def robust_z(values):
+    """``(values - median) / (1.4826 * MAD)``; NaN when the values barely vary."""
+    values = np.asarray(values, dtype=np.float64)
+    median = np.nanmedian(values) if len(values) else np.nan
+    mad = 1.4826 * np.nanmedian(np.abs(values - median)) if len(values) else np.nan
+    return safe_div(values - median, mad)
+
+
+# ============================================================================
+# DAILY ARRAYS
+# ============================================================================
+def _grid(daily, by):
+    """Calendar days and (days x values) arrays of a ``daily`` query result."""
+    days = daily["day"].to_numpy(dtype="datetime64[D]")
+    first = days.min()
+    n_days = int((days.max() - first) // DAY) + 1
+    codes, labels = pd.factorize(daily[by])
+    flat = ((days - first) // DAY).astype(np.intp) * len(labels) + codes
+    shape = (n_days, len(labels))
+
+    def grid(col):
+        values = daily[col].to_numpy(dtype=np.float64)
+        return np.bincount(flat, weights=values, minlength=n_days * len(labels)).reshape(shape)
+
+    return first + np.arange(n_days) * DAY, [str(label) for label in labels], grid
+
+
+def _series(data):
+    """Own-brand daily arrays, plus per-brand and per-subreddit ones when mentions exist."""
+    if MENTIONS in data.sections:
+        daily = data.daily(MENTIONS, ("brand", "subreddit"), ("sentiment_score",))
+        if len(daily):
+            by_brand = daily.groupby(["day", "brand"], observed=True, as_index=False)[["rows", "sentiment_score"]].sum()
+            dates, brands, brand_grid = _grid(by_brand, "brand")
+            counts = brand_grid("rows")
+            own = brands.index(OWN_BRAND) if OWN_BRAND in brands else None
+            own_rows = daily[daily["brand"] == OWN_BRAND]
+            if len(own_rows):
+                sub_dates, subreddits, sub_grid = _grid(own_rows, "subreddit")
+                # Align the own brand's subreddits with the full calendar.
+                offset = int((sub_dates[0] - dates[0]) // DAY)
+                sub_counts = np.zeros((len(dates), len(subreddits)))
+                sub_scores = np.zeros((len(dates), len(subreddits)))
+                sub_counts[offset:offset + len(sub_dates)] = sub_grid("rows")
+                sub_scores[offset:offset + len(sub_dates)] = sub_grid("sentiment_score")
+            else:
+                subreddits, sub_counts, sub_scores = [], np.zeros((len(dates), 0)), np.zeros((len(dates), 0))
+            return {
+                "dates": dates,
+                "mentions": counts[:, own] if own is not None else np.zeros(len(dates)),
+                "scores": brand_grid("sentiment_score")[:, own] if own is not None else np.zeros(len(dates)),
+                "brands": brands,
+                "brand_mentions": counts,
+                "subreddits": subreddits,
+                "subreddit_mentions": sub_counts,
+                "subreddit_scores": sub_scores,
+            }
+
+    trend = data.view(TREND, _ALL_TIME)
+    if not len(trend):
+        return None
+    # Days without mentions have no average sentiment.
+    trend = trend.assign(scores=trend["avg_sentiment"].astype(np.float64).fillna(0) * trend["mention_count"])
+    daily = daily_totals(trend, ("mention_count", "scores"))
+    return {
+        "dates": daily["date"].to_numpy(dtype="datetime64[D]"),
+        "mentions": daily["mention_count"].to_numpy(),
+        "scores": daily["scores"].to_numpy(),
+    }
+
+
+# ============================================================================
+# REPORT
+# ============================================================================
+@dataclass
+class BrandReport:
+    """Brand mention analytics for one date window."""
+
+    # date, mentions, ewma, baseline, z, spike, sentiment, sentiment_ewma
+    daily: pd.DataFrame
+    mentions: float
+    previous_mentions: float
+    days: int
+    sentiment: float
+    previous_sentiment: float
+    # date, mention_count, baseline, change_pct, z (over the whole history)
+    spikes: pd.DataFrame
+    # date, before, after, change_pct (inside the window)
+    shifts: pd.DataFrame
+    # subreddit, mention_count, avg_sentiment, sentiment_z
+    subreddits: pd.DataFrame
+    # brand, mentions, share, change (None without raw mentions)
+    share_of_voice: pd.DataFrame = None
+    # date, subreddit, mention_count, baseline, z (inside the window)
+    subreddit_spikes: pd.DataFrame = None
+
+    @property
+    def daily_average(self):
+        return safe_div(self.mentions, self.days, fill=0.0)
+
+    @property
+    def mentions_change(self):
+        return safe_div(self.mentions - self.previous_mentions, self.previous_mentions, 100)
+
+    @property
+    def sentiment_change(self):
+        """Change of the average sentiment in points (score x 100)."""
+        return (self.sentiment - self.previous_sentiment) * 100
+
+    @property
+    def own_share(self):
+        if self.share_of_voice is None:
+            return None
+        own = self.share_of_voice[self.share_of_voice["brand"] == OWN_BRAND]
+        return own.iloc[0] if len(own) else None
+
+
+def _share(counts, bounds):
+    totals = counts[bounds[0]:bounds[1]].sum(axis=0)
+    return safe_div(totals, totals.sum(), 100, fill=0.0), totals
+
+
+def _subreddits(data, series, bounds):
+    if "subreddits" in series:
+        lo, hi = bounds
+        counts = series["subreddit_mentions"][lo:hi].sum(axis=0)
+        scores = series["subreddit_scores"][lo:hi].sum(axis=0)
+        df = pd.DataFrame({
+            "subreddit": series["subreddits"],
+            "mention_count": counts.astype(np.int64),
+            "avg_sentiment": safe_div(scores, counts),
+        })
+        df = df[df["mention_count"] > 0]
+    elif BY_SUBREDDIT in data.sections:
+        df = data.view(BY_SUBREDDIT, _ALL_TIME)[["subreddit", "mention_count", "avg_sentiment"]]
+        df = df.assign(subreddit=df["subreddit"].astype(str))
+    else:
+        return pd.DataFrame(columns=["subreddit", "mention_count", "avg_sentiment", "sentiment_z"])
+    df = df.assign(sentiment_z=robust_z(df["avg_sentiment"].to_numpy(dtype=np.float64)))
+    return df.sort_values("mention_count", ascending=False, ignore_index=True)
+
+
+def build_report(data, filters):
+    """``BrandReport`` of the queries ``data`` for the window ``filters`` select."""
+    series = _series(data)
+    if series is None:
+        return None
+    dates = series["dates"]
+    counts = np.asarray(series["mentions"], dtype=np.float64)
+    scores = np.asarray(series["scores"], dtype=np.float64)
+
+    smooth = ewma(counts)
+    baseline, z = ewma_zscores(counts)
+    spike = is_spike(counts, baseline, z)
+    # Mention-weighted: days without mentions do not pull the average to zero.
+    sentiment_ewma = safe_div(ewma(scores), smooth)
+
+    (lo, hi), previous = day_positions(dates, *data.window(filters))
+    window = slice(lo, hi)
+    daily = pd.DataFrame({
+        "date": dates[window].astype("datetime64[ns]"),
+        "mentions": counts[window],
+        "ewma": smooth[window],
+        "baseline": baseline[window],
+        "z": z[window],
+        "spike": spike[window],
+        "sentiment": safe_div(scores[window], counts[window]),
+        "sentiment_ewma": sentiment_ewma[window],
+    })
+    spikes = pd.DataFrame({
+        "date": dates[spike].astype("datetime64[ns]"),
+        "mention_count": counts[spike],
+        "baseline": baseline[spike],
+        "change_pct": safe_div(counts[spike] - baseline[spike], baseline[spike], 100),
+        "z": z[spike],
+    })
+    at, before, after = changepoints(counts)
+    inside = (at >= lo) & (at < hi)
+    shifts = pd.DataFrame({
+        "date": dates[at[inside]].astype("datetime64[ns]"),
+        "before": before[inside],
+        "after": after[inside],
+        "change_pct": safe_div(after[inside] - before[inside], before[inside], 100),
+    })
+
+    def totals(bounds):
+        if bounds is None:
+            return np.nan, np.nan
+        mentions = counts[bounds[0]:bounds[1]].sum()
+        return mentions, safe_div(scores[bounds[0]:bounds[1]].sum(), mentions)
+
+    mentions, sentiment = totals((lo, hi))
+    previous_mentions, previous_sentiment = totals(previous)
+    report = BrandReport(
+        daily=daily,
+        mentions=mentions,
+        previous_mentions=previous_mentions,
+        days=hi - lo,
+        sentiment=sentiment,
+        previous_sentiment=previous_sentiment,
+        spikes=spikes,
+        shifts=shifts,
+        subreddits=_subreddits(data, series, (lo, hi)),
+    )
+
+    if "brands" in series:
+        share, totals_now = _share(series["brand_mentions"], (lo, hi))
+        change = np.full(len(share), np.nan) if previous is None else share - _share(series["brand_mentions"], previous)[0]
+        report.share_of_voice = pd.DataFrame({
+            "brand": series["brands"], "mentions": totals_now.astype(np.int64), "share": share, "change": change,
+        }).sort_values("mentions", ascending=False, ignore_index=True)
+
+        sub_counts = series["subreddit_mentions"]
+        sub_baseline, sub_z = ewma_zscores(sub_counts)
+        day_idx, sub_idx = np.nonzero(is_spike(sub_counts, sub_baseline, sub_z, SUBREDDIT_SPIKE_Z)[window])
+        day_idx += lo
+        report.subreddit_spikes = pd.DataFrame({
+            "date": dates[day_idx].astype("datetime64[ns]"),
+            "subreddit": np.array(series["subreddits"], dtype=object)[sub_idx],
+            "mention_count": sub_counts[day_idx, sub_idx],
+            "baseline": sub_baseline[day_idx, sub_idx],
+            "z": sub_z[day_idx, sub_idx],
+        }).sort_values(["date", "z"], ascending=False, ignore_index=True)
+    return report
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+_reports = LRUCache("brand_report")
+
+
+def report(data, filters):
+    """``build_report``, cached per data version and filters."""
+
+    def build():
+        with perf.span("brand_report", date_range=filters.date_range):
+            return build_report(data, filters)
+
+    return _reports.get((data.data_version, filters.date_range), build)
@@ -0,0 +1,193 @@
+"""
+Lazily imported dashboard pages.
+
+Each page is a module in this package with
+
+* ``SECTIONS``: the store sections it reads (including the sections behind
+  any rollup cube it queries), and
+* ``render(ctx)``: draws the page from a ``PageContext``.
+
+app.py imports only the selected page's module, so plotly and every other
+page's code stay unloaded until that page is opened, and only the declared
+sections are materialized from the store.
+
+Pages read data only through the ``PageContext``, which forwards to the data
+source's queries (``recho.sources``): filtered rows, grouped sums and KPI
+totals. On the SQLite backend each of these is one SQL query. Results of
+background jobs (``recho.insights``) are read through it too and never
+waited for.
+"""
+
+import importlib
+import logging
+import sys
+import threading
+from dataclasses import dataclass
+
+import streamlit as st
+
+from recho import perf
+# Aliased: importing the accounts / attribution page modules rebinds the package attributes.
+from recho.accounts import SECTION as ACCOUNTS, VELOCITY as KARMA_VELOCITY, detail as account_detail, table as account_table
+from recho.attribution import SECTION as TOUCHPOINTS, attribution as cached_attribution
+from recho.derive import PAID_MEASURES
+from recho.filters import Filters
+from recho.mentions import TREND as MENTION_TREND, report as brand_report
+from recho.rollups import CUBES, resolution as series_resolution
+
+logger = logging.getLogger(__name__)
+
+# sidebar label -> module
+PAGES = {
+    "📊 Overview": "overview",
+    "🌱 Organic Performance": "organic",
+    "💰 Paid Ads": "paid",
+    "📢 Brand Monitoring": "brand",
+    "👥 Accounts": "accounts",
+    "🔀 Attribution": "attribution",
+    "🧠 Strategic Insights": "insights",
+}
+
+
+_import_lock = threading.Lock()
+
+
+def load(label):
+    """The page module behind sidebar ``label``."""
+    name = f"{__name__}.{PAGES[label]}"
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    with _import_lock:
+        # plotly.express imports PIL.Image, and plotly's JSON encoder reads
+        # PIL.Image from sys.modules without the import lock, so a session
+        # serializing a chart while another loads its first express page
+        # can hit the half-imported module. Import it before any page runs.
+        importlib.import_module("PIL.Image")
+
+        return importlib.import_module(name)
+
+
+def delta(change, unit="%"):
+    """``st.metric`` delta text for ``change``; None (no delta) when it is missing or NaN."""
+    return None if change is None or change != change else f"{change:+.1f}{unit}"
+
+
+@dataclass
+class PageContext:
+    """What a page needs from the current rerun."""
+
+    data: object
+    filters: Filters
+    figure: object
+    sections: tuple = ()
+    worker: object = None
+
+    def _check(self, section):
+        if section not in self.sections:
+            raise KeyError(f"{section} is read but not listed in the page's SECTIONS")
+
+    def view(self, section, limit=None):
+        """``section`` under the global filters, at most ``limit`` rows."""
+        self._check(section)
+        with perf.span("view", section=section) as span:
+            df = self.data.view(section, self.filters, limit)
+            span.set(rows=len(df))
+        return df
+
+    def aggregate(self, section, by, measures=PAID_MEASURES, sort=None, ascending=False, limit=None):
+        """``measures`` of ``section`` summed per ``by`` value, with ratios.
+
+        ``sort`` names a measure or ratio to order the groups by (largest
+        first unless ``ascending``); ``limit`` keeps the first groups only.
+        """
+        self._check(section)
+        with perf.span("aggregate", section=section, by=by) as span:
+            df = self.data.aggregate(section, self.filters, by, measures, sort, ascending, limit)
+            span.set(rows=len(df))
+        return df
+
+    def top(self, section, metric, k):
+        """The ``k`` rows of ``section`` with the largest ``metric`` under the global filters."""
+        self._check(section)
+        with perf.span("top", section=section, metric=metric) as span:
+            df = self.data.top(section, self.filters, metric, k)
+            span.set(rows=len(df))
+        return df
+
+    def attribution(self, by, half_life_days):
+        """Touchpoint conversions credited per ``by`` value by every attribution model."""
+        self._check(TOUCHPOINTS)
+        return cached_attribution(self.data, self.filters, by, half_life_days)
+
+    def brand(self):
+        """The brand engine's ``BrandReport`` for the global date window (None without mentions)."""
+        self._check(MENTION_TREND)
+        return brand_report(self.data, self.filters)
+
+    def accounts(self):
+        """Every account the filters select, with its derived metrics and karma trend."""
+        self._check(ACCOUNTS)
+        return account_table(self.data, self.filters)
+
+    def account(self, name):
+        """The drill-down ``AccountDetail`` of account ``name`` (None if the filters exclude it)."""
+        self._check(KARMA_VELOCITY)
+        return account_detail(self.data, self.filters, name)
+
+    def totals(self, name, previous=False):
+        """KPI totals of rollup cube ``name`` under the global filters.
+
+        With ``previous``, over the window of the same length before the
+        selected one: None for "All Time", undated cubes, or when the data
+        does not reach back that far.
+        """
+        self._check(CUBES[name][0])
+        with perf.span("totals", cube=name, previous=previous):
+            return self.data.totals(name, self.filters, previous)
+
+    def n_days(self, name):
+        self._check(CUBES[name][0])
+        return self.data.n_days(name, self.filters)
+
+    def resolution(self, name):
+        """The time-series resolution for cube ``name`` over the global date window."""
+        return series_resolution(self.n_days(name))
+
+    def series(self, name):
+        """Measures of cube ``name`` per bucket of ``resolution(name)`` under the global filters."""
+        self._check(CUBES[name][0])
+        with perf.span("series", cube=name) as span:
+            df = self.data.series(name, self.filters, self.resolution(name))
+            span.set(rows=len(df))
+        return df
+
+    def insights(self):
+        """``(insights, pending)`` for the current data version, without waiting.
+
+        While the current version is still being computed, ``insights`` is the
+        newest finished result of an older version (or None) and ``pending``
+        its ``Future``; once done, ``pending`` is None. A failed computation
+        is reported and dropped, so the next rerun starts it again, and the
+        last good result is shown meanwhile.
+        """
+        future = self.worker.request(self.data)
+        if not future.done():
+            return self.worker.latest(), future
+        error = future.exception()
+        if error is None:
+            return future.result(), None
+        self.worker.forget(self.data, future)
+        logger.error("insights failed for data version %s", self.data.data_version, exc_info=error)
+        st.error(f"⚠️ Insights could not be computed: {error}")
+        return self.worker.latest(), None
+
+    def refresh_insights(self):
+        """Compute the insights of the current data version again."""
+        self.worker.refresh(self.data)
+
+    def chart(self, name, build):
+        """Draw the (cached) figure ``name``, built by ``build()`` on a miss."""
+        fig = self.figure(name, build)
+        with perf.span("plotly_chart", chart=name):
+            st.plotly_chart(fig, use_container_width=True)
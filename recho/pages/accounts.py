@@ -0,0 +1,181 @@
+"""Accounts: searchable per-account comparison with an on-demand drill-down."""
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from recho.accounts import POSTS, SECTION, VELOCITY
+from recho.pages import delta
+from recho.tables import render_table
+
+SECTIONS = (
+    SECTION,
+    VELOCITY,
+    POSTS,
+)
+
+PAGE_SIZE = 50
+GRID_KEY = 'accounts'
+ALL_TYPES = "All Types"
+
+# sort label -> column, largest first
+SORTS = {
+    "Karma": "total_karma",
+    "Karma/Week": "karma_per_week",
+    "Posts/Week": "posts_per_week",
+    "Karma/Day in Period": "velocity",
+    "Trend": "velocity_change",
+    "Clicks": "total_clicks",
+}
+
+GRID_COLUMNS = [
+    'account_name', 'account_type', 'total_karma', 'post_karma_share', 'posts_per_week',
+    'karma_per_week', 'velocity', 'velocity_change', 'trend', 'total_clicks',
+]
+
+
+def render_kpis(df):
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("👥 Accounts", f"{len(df):,}")
+    
+    with col2:
+        st.metric("🏆 Karma", f"{df['total_karma'].sum():,.0f}")
+    
+    with col3:
+        st.metric("📝 Posts/Week", f"{df['posts_per_week'].sum():,.1f}")
+    
+    with col4:
+        st.metric("🖱️ Clicks", f"{df['total_clicks'].sum():,.0f}")
+
+
+def _first_page():
+    st.session_state.pop(f"{GRID_KEY}_page", None)
+
+
+def search(df):
+    """The accounts matching the search controls, in the chosen order."""
+    col1, col2, col3 = st.columns([2, 1, 1])
+    
+    # A new search or order starts again on page 1.
+    with col1:
+        query = st.text_input("🔎 Search accounts", placeholder="Account name", on_change=_first_page)
+    
+    with col2:
+        types = sorted(df['account_type'].dropna().astype(str).unique())
+        account_type = st.selectbox("Type", [ALL_TYPES] + types, on_change=_first_page)
+    
+    with col3:
+        sort = st.selectbox("Sort by", list(SORTS), on_change=_first_page)
+    
+    if query:
+        df = df[df['account_name'].str.contains(query, case=False, regex=False)]
+    if account_type != ALL_TYPES:
+        df = df[df['account_type'].astype(str) == account_type]
+    return df.sort_values(SORTS[sort], ascending=False, na_position='last', kind='stable')
+
+
+def render_grid(df):
+    render_table(
+        df,
+        GRID_COLUMNS,
+        key=GRID_KEY,
+        page_size=PAGE_SIZE,
+        column_overrides={
+            'post_karma_share': st.column_config.ProgressColumn(
+                "Post Karma", help="Share of karma from posts (the rest is from comments)",
+                format="%.0f%%", min_value=0, max_value=100,
+            ),
+            'velocity': st.column_config.NumberColumn("Karma/Day", format="%,.1f",
+                                                      help="Mean trailing karma per day in the period"),
+            'velocity_change': st.column_config.NumberColumn("Trend", format="%+.1f%%",
+                                                             help="Karma/day against the previous period"),
+            'trend': st.column_config.LineChartColumn("Karma/Day over Period"),
+        }
+    )
+
+
+def render_detail(ctx, df):
+    st.subheader("🔍 Account Details")
+    
+    # Nothing is computed until an account is picked.
+    name = st.selectbox(
+        "Account", df['account_name'].tolist(), index=None,
+        placeholder=f"Choose one of {len(df):,} accounts...", label_visibility="collapsed",
+    )
+    if name is None:
+        return
+    
+    detail = ctx.account(name)
+    if detail is None:
+        st.info("This account is not in the current filters.")
+        return
+    account = detail.account
+    
+    col1, col2, col3, col4, col5 = st.columns(5)
+    
+    with col1:
+        st.metric("Karma", f"{account['total_karma']:,}")
+    
+    with col2:
+        st.metric("Posts/Week", f"{account['posts_per_week']:.1f}")
+    
+    with col3:
+        st.metric("Karma/Week", f"{account['karma_per_week']:,.0f}")
+    
+    with col4:
+        st.metric("Karma/Day", f"{account['velocity']:,.1f}", delta=delta(account['velocity_change']))
+    
+    with col5:
+        st.metric("Clicks", f"{account['total_clicks']:,}")
+    
+    st.caption(
+        f"{account['account_type']} · {account['account_age_days']:,} days old · "
+        f"{account['post_karma']:,} post / {account['comment_karma']:,} comment karma · "
+        f"{account['followers']:,} followers · {account['unique_subreddits']} subreddits"
+    )
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        def build_velocity_chart():
+            fig = go.Figure([
+                go.Scatter(x=detail.velocity['date'], y=detail.velocity['karma_velocity'],
+                           fill='tozeroy', line_color='#D43E2B')
+            ])
+            fig.update_layout(height=300, template='simple_white', yaxis_title="Karma/Day")
+            return fig
+        
+        ctx.chart(f'account_velocity_{name}', build_velocity_chart)
+    
+    with col2:
+        if len(detail.top_posts):
+            render_table(detail.top_posts, ['title', 'subreddit', 'upvotes', 'comments', 'engagement_rate'])
+        else:
+            st.info("No posts in this period.")
+
+
+def render(ctx):
+    st.header("Account Analysis")
+    
+    df_accounts = ctx.accounts()
+    if not len(df_accounts):
+        st.info("No accounts in the current filters.")
+        return
+    
+    render_kpis(df_accounts)
+    
+    st.markdown("---")
+    
+    st.subheader("📊 Performance Comparison")
+    
+    matches = search(df_accounts)
+    if not len(matches):
+        st.info("No accounts match the search.")
+        return
+    
+    render_grid(matches)
+    
+    st.markdown("---")
+    
+    render_detail(ctx, matches)
@@ -0,0 +1,123 @@
+"""Cross-channel attribution: model comparison over touchpoints and the exported summary."""
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from recho.attribution import GROUPS, HALF_LIFE_DAYS, MODELS, SECTION
+from recho.tables import render_table
+
+SECTIONS = (
+    SECTION,
+    "cross_channel.contribution",
+)
+
+MODEL_COLORS = {
+    "last_click": "#D43E2B",
+    "first_click": "#FF9E8F",
+    "linear": "#666666",
+    "time_decay": "#CCCCCC",
+}
+
+TOP_GROUPS = 10
+
+
+def render_models(ctx):
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        by = st.selectbox("Credit by", GROUPS, format_func=str.capitalize)
+    
+    with col2:
+        half_life = st.slider("Time-decay half-life (days)", 1, 30, int(HALF_LIFE_DAYS))
+    
+    df = ctx.attribution(by, half_life)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("🌐 Sessions", f"{df['sessions'].sum():,}")
+    
+    with col2:
+        st.metric("🎯 Conversions", f"{df['last_click'].sum():,.0f}")
+    
+    with col3:
+        st.metric("💰 Revenue", f"${df['last_click_revenue'].sum():,.0f}")
+    
+    with col4:
+        sessions = df['sessions'].sum()
+        st.metric("📊 CVR", f"{df['last_click'].sum() / sessions * 100 if sessions else 0:.2f}%")
+    
+    st.subheader("📊 Conversions by Model")
+    
+    def build_model_chart():
+        top = df.head(TOP_GROUPS)
+        fig = go.Figure([
+            go.Bar(x=top[by], y=top[model], name=label, marker_color=MODEL_COLORS[model])
+            for model, label in MODELS.items()
+        ])
+        fig.update_layout(height=400, barmode='group', template='simple_white', yaxis_title="Conversions")
+        return fig
+    
+    ctx.chart(f'models_{by}_{half_life}', build_model_chart)
+    
+    render_table(
+        df,
+        [by, 'sessions', *MODELS, *(f'{m}_revenue' for m in MODELS)],
+        key='attribution',
+        column_overrides={
+            **{m: st.column_config.NumberColumn(label, format="%,.1f") for m, label in MODELS.items()},
+            **{f'{m}_revenue': st.column_config.NumberColumn(f"{label} $", format="$%,.0f") for m, label in MODELS.items()},
+        }
+    )
+
+
+def render_exported(ctx):
+    st.subheader("📦 Exported Summary")
+    
+    assisted = ctx.data.value('traffic.assisted_conversions')
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("🎯 Total Conversions", f"{assisted['total_conversions']:,}")
+    
+    with col2:
+        st.metric("👆 Last Click", f"{assisted['last_click_conversions']:,}")
+    
+    with col3:
+        st.metric("🤝 Assisted", f"{assisted['assisted_conversions']:,}")
+    
+    with col4:
+        st.metric("📊 Assist Rate", f"{assisted['assist_rate']}%")
+    
+    render_table(ctx.view('cross_channel.contribution'))
+    
+    efficiency = ctx.data.value('cross_channel.efficiency')
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("🌱 Organic CPA (est.)", f"${efficiency['organic.estimated_cpa']:,.2f}")
+    
+    with col2:
+        st.metric("💰 Paid CPA", f"${efficiency['paid.cpa']:,.2f}")
+    
+    with col3:
+        st.metric("🏆 More Efficient", efficiency['comparison.efficiency_winner'],
+                  delta=f"{efficiency['comparison.cpa_ratio']}x CPA gap", delta_color="off")
+
+
+def render(ctx):
+    st.header("Cross-Channel Attribution")
+    
+    if SECTION in ctx.data.sections:
+        render_models(ctx)
+    else:
+        st.info(
+            "This source has no session-level touchpoints. Add a `traffic.touchpoints` "
+            "section (see `recho/attribution.py`) to compare attribution models."
+        )
+    
+    st.markdown("---")
+    
+    render_exported(ctx)
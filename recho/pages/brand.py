@@ -0,0 +1,216 @@
+"""Brand monitoring: sentiment, share of voice, mention volume and alerts."""
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from recho.fragments import rerun_when_done
+from recho.mentions import BY_SUBREDDIT, MENTIONS, OUTLIER_Z, OWN_BRAND, TREND
+from recho.pages import delta
+from recho.tables import render_table
+
+SECTIONS = (
+    TREND,
+    MENTIONS,
+    BY_SUBREDDIT,
+    "brand.sentiment_distribution",
+)
+
+
+def render_kpis(ctx, report):
+    sentiment_ratio = ctx.data.value('brand.sentiment_ratio')
+    own = report.own_share
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("📢 Mentions", f"{report.mentions:,.0f}", delta=delta(report.mentions_change))
+    
+    with col2:
+        st.metric("😊 Positive", f"{sentiment_ratio}%", delta=delta(report.sentiment_change, " pts"),
+                  help="Delta: change of the average sentiment score against the previous period")
+    
+    with col3:
+        st.metric("📊 Daily Avg", f"{report.daily_average:.1f}")
+    
+    with col4:
+        if own is None:
+            st.metric("🏆 Share of Voice", "n/a")
+        else:
+            st.metric("🏆 Share of Voice", f"{own['share']:.1f}%", delta=delta(own['change'], " pts"))
+
+
+def render_mix(ctx, report):
+    sentiment_ratio = ctx.data.value('brand.sentiment_ratio')
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Sentiment Chart
+        st.subheader("😊 Sentiment Distribution")
+        
+        def build_sentiment_chart():
+            df_sentiment = ctx.aggregate(
+                'brand.sentiment_distribution', 'sentiment', ['mention_count'], sort='mention_count'
+            )
+            df_sentiment['sentiment'] = df_sentiment['sentiment'].str.capitalize()
+            
+            colors = {'Positive': '#28A745', 'Neutral': '#FFA500', 'Negative': '#D43E2B'}
+            
+            fig = go.Figure(data=[go.Pie(
+                labels=df_sentiment['sentiment'],
+                values=df_sentiment['mention_count'],
+                hole=.6,
+                marker_colors=[colors[s] for s in df_sentiment['sentiment']]
+            )])
+            
+            fig.update_layout(
+                height=400,
+                annotations=[dict(text=f'{sentiment_ratio}%<br>Positive', x=0.5, y=0.5, font_size=20, showarrow=False)]
+            )
+            return fig
+        
+        ctx.chart('sentiment', build_sentiment_chart)
+    
+    with col2:
+        # Share of Voice
+        st.subheader("🏆 Share of Voice")
+        
+        if report.share_of_voice is None:
+            st.info(
+                "Share of voice needs raw mentions of every brand. Add a `brand.mentions` "
+                "section (see `recho/mentions.py`) to compare against competitors."
+            )
+            return
+        
+        def build_share_of_voice_chart():
+            df_sov = report.share_of_voice
+            
+            fig = go.Figure(data=[
+                go.Bar(
+                    x=df_sov['brand'],
+                    y=df_sov['share'],
+                    marker_color=['#D43E2B' if b == OWN_BRAND else '#CCCCCC' for b in df_sov['brand']]
+                )
+            ])
+            
+            fig.update_layout(height=400, template='simple_white', yaxis_title="Share of mentions (%)")
+            return fig
+        
+        ctx.chart('share_of_voice', build_share_of_voice_chart)
+
+
+def render_trends(ctx, report):
+    df = report.daily
+    
+    # Mentions Over Time
+    st.subheader("📈 Mention Volume")
+    
+    def build_mention_chart():
+        spikes = df[df['spike']]
+        
+        fig = go.Figure([
+            go.Scatter(x=df['date'], y=df['mentions'], name="Mentions", fill='tozeroy', line_color='#D43E2B'),
+            go.Scatter(x=df['date'], y=df['ewma'], name="EWMA", line=dict(color='#666666', dash='dot')),
+            go.Scatter(x=spikes['date'], y=spikes['mentions'], name="Spike", mode='markers',
+                       marker=dict(color='#000000', size=10, symbol='triangle-up')),
+        ])
+        for shift in report.shifts.itertuples():
+            fig.add_vline(x=shift.date, line_dash='dash', line_color='#FFA500')
+        fig.update_layout(height=400, template='simple_white')
+        return fig
+    
+    ctx.chart('mention_volume', build_mention_chart)
+    
+    st.subheader("😊 Sentiment Trend")
+    
+    def build_sentiment_trend_chart():
+        fig = go.Figure([
+            go.Scatter(x=df['date'], y=df['sentiment'], name="Daily", mode='markers', marker_color='#CCCCCC'),
+            go.Scatter(x=df['date'], y=df['sentiment_ewma'], name="EWMA", line_color='#28A745'),
+        ])
+        fig.update_layout(height=300, template='simple_white', yaxis_title="Avg sentiment")
+        return fig
+    
+    ctx.chart('sentiment_trend', build_sentiment_trend_chart)
+
+
+def render_anomalies(report):
+    st.subheader("🔎 Anomalies in Period")
+    
+    lines = [
+        f"📈 **Spike** on {row.date:%b %d}: {row.mentions:,.0f} mentions vs {row.baseline:,.1f} expected ({row.z:.1f}σ)"
+        for row in report.daily[report.daily['spike']].itertuples()
+    ]
+    lines += [
+        f"↕️ **Level shift** from {shift.date:%b %d}: {shift.before:,.1f} → {shift.after:,.1f} mentions/day ({shift.change_pct:+.0f}%)"
+        for shift in report.shifts.itertuples()
+    ]
+    if report.subreddit_spikes is not None:
+        lines += [
+            f"🧵 **{row.subreddit}** spiked on {row.date:%b %d}: {row.mention_count:,.0f} mentions vs {row.baseline:,.1f} expected"
+            for row in report.subreddit_spikes.itertuples()
+        ]
+    outliers = report.subreddits[report.subreddits['sentiment_z'].abs() >= OUTLIER_Z]
+    lines += [
+        f"{'🔻' if row.sentiment_z < 0 else '🔺'} **{row.subreddit}** sentiment {row.avg_sentiment:.2f} is unusual ({row.sentiment_z:+.1f} robust z)"
+        for row in outliers.itertuples()
+    ]
+    st.markdown("\n".join(f"- {line}" for line in lines) if lines else "No anomalies detected in this period.")
+    
+    render_table(
+        report.subreddits,
+        key='brand_subreddits',
+        column_overrides={
+            'mention_count': st.column_config.NumberColumn("Mentions", format="%,d"),
+            'avg_sentiment': st.column_config.NumberColumn("Avg Sentiment", format="%.3f"),
+            'sentiment_z': st.column_config.NumberColumn("Sentiment z", format="%+.1f"),
+        }
+    )
+
+
+def render_alerts(ctx):
+    st.subheader("🚨 Alerts")
+    
+    # Weekly spike and sentiment checks run in the background (recho.insights)
+    insights, pending = ctx.insights()
+    if pending is not None:
+        rerun_when_done(pending, "⏳ Checking for alerts...")
+    if insights is None:
+        return
+    
+    for col, alert in zip(st.columns(len(insights.alerts)), insights.alerts):
+        lines = "".join(f"<p><strong>{label}:</strong> {value}</p>" for label, value in alert.lines)
+        with col:
+            st.markdown(f"""
+            <div class='alert-{alert.level}'>
+            <h4>{alert.title}</h4>
+            {lines}
+            </div>
+            """, unsafe_allow_html=True)
+
+
+def render(ctx):
+    st.header("Brand Monitoring")
+    
+    report = ctx.brand()
+    if report is None:
+        st.info("No brand mentions in this source.")
+        return
+    
+    render_kpis(ctx, report)
+    
+    st.markdown("---")
+    
+    render_mix(ctx, report)
+    
+    st.markdown("---")
+    
+    render_trends(ctx, report)
+    
+    st.markdown("---")
+    
+    render_anomalies(report)
+    
+    st.markdown("---")
+    
+    render_alerts(ctx)
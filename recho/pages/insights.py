@@ -0,0 +1,75 @@
+"""Strategic insights: weekly summary, content reliability and action items."""
+
+import pandas as pd
+import streamlit as st
+
+from recho.fragments import fragment, rerun_when_done
+from recho.tables import render_table
+
+SECTIONS = ()
+
+
+@fragment
+def weekly_summary(summary, regenerate):
+    # Editing the summary reruns only this fragment
+    st.text_area(
+        "Generated Insights",
+        value=summary,
+        height=300
+    )
+    
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        if st.button("🤖 Generate"):
+            # Recompute in the background; the full rerun shows the progress
+            regenerate()
+            st.rerun()
+
+
+def render(ctx):
+    st.header("Strategic Insights & Content Lab")
+    
+    st.subheader("📝 Weekly AI Summary")
+    
+    # Computed in the background per data version; never waited for here
+    insights, pending = ctx.insights()
+    if pending is not None:
+        rerun_when_done(pending, "⏳ Updating insights for the latest data..." if insights else "⏳ Computing insights...")
+    
+    if insights is not None:
+        weekly_summary(insights.summary, ctx.refresh_insights)
+        st.caption(f"Generated from the data in {insights.seconds * 1000:.0f} ms")
+    
+    st.markdown("---")
+    
+    # Content Reliability
+    st.subheader("🎯 Content Reliability")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+        <div style='text-align: center; padding: 40px; background: #F8F8F8; border-radius: 12px;'>
+            <div style='font-size: 4rem; font-weight: 800; color: #D43E2B;'>87%</div>
+            <div style='font-size: 1.2rem; color: #666;'>RELIABILITY SCORE</div>
+            <p style='color: #28A745; font-weight: 600; margin-top: 15px;'>✅ ABOVE TARGET (85%)</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+        <div style='text-align: center; padding: 40px; background: #F8F8F8; border-radius: 12px;'>
+            <div style='font-size: 4rem; font-weight: 800; color: #28A745;'>12%</div>
+            <div style='font-size: 1.2rem; color: #666;'>AI DETECTION</div>
+            <p style='color: #28A745; font-weight: 600; margin-top: 15px;'>✅ LOW RISK</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # Action Items
+    st.subheader("✅ Recommended Actions")
+    
+    if insights is not None:
+        df_actions = pd.DataFrame(insights.actions)
+        render_table(df_actions, key='insights_actions')
@@ -0,0 +1,79 @@
+"""Organic performance: karma growth, top posts and subreddit results."""
+
+import plotly.express as px
+import streamlit as st
+
+from recho.downsample import SCATTERGL_THRESHOLD, downsample_groups
+from recho.insights import pct_change
+from recho.pages import delta
+from recho.tables import render_table
+
+SECTIONS = (
+    "organic.daily_metrics",
+    "organic.karma_velocity",
+    "organic.subreddit_performance",
+    "organic.top_posts",
+)
+
+
+def render(ctx):
+    st.header("Organic Performance")
+    
+    # KPIs
+    organic = ctx.totals('organic')
+    # Deltas compare with the window of the same length before the selected one
+    before = ctx.totals('organic', previous=True) or {}
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("📝 Posts", f"{organic['posts']}")
+    
+    with col2:
+        engagement = organic['upvotes'] + organic['comments']
+        engagement_before = before['upvotes'] + before['comments'] if before else None
+        st.metric("🔥 Engagement", f"{engagement:,}", delta=delta(pct_change(engagement, engagement_before)))
+    
+    with col3:
+        st.metric("📊 Avg Rate", f"{organic['engagement_rate']:.2f}%")
+    
+    with col4:
+        st.metric("🏆 Karma", f"{organic['karma']:,}", delta=delta(pct_change(organic['karma'], before.get('karma'))))
+    
+    st.markdown("---")
+    
+    # Karma Growth Chart
+    st.subheader("📈 Karma Growth by Account")
+    
+    def build_karma_chart():
+        df_karma = ctx.view('organic.karma_velocity')
+        df_karma = downsample_groups(df_karma, 'date', 'karma_velocity', 'account_name')
+        
+        fig = px.line(
+            df_karma,
+            x='date',
+            y='karma_velocity',
+            color='account_name',
+            labels={'karma_velocity': 'Karma/Day', 'account_name': 'Account'},
+            color_discrete_sequence=['#D43E2B', '#FF6B5A', '#666666'],
+            render_mode='webgl' if len(df_karma) > SCATTERGL_THRESHOLD else 'svg'
+        )
+        
+        fig.update_layout(height=400, hovermode='x unified', template='simple_white')
+        return fig
+    
+    ctx.chart('karma_velocity', build_karma_chart)
+    
+    st.markdown("---")
+    
+    # Top Posts
+    st.subheader("🌟 Top Posts")
+    df_posts = ctx.top('organic.top_posts', 'engagement_rate', 10)
+    render_table(df_posts, ['title', 'subreddit', 'upvotes', 'comments', 'engagement_rate'])
+    
+    st.markdown("---")
+    
+    # Subreddit Performance
+    st.subheader("📍 Performance by Subreddit")
+    df_subs = ctx.view('organic.subreddit_performance')
+    render_table(df_subs, ['subreddit', 'post_count', 'total_upvotes', 'ctr', 'avg_upvote_rate'], key='organic_subreddits')
@@ -0,0 +1,160 @@
+"""Executive overview: headline KPIs, activity trend and top tables."""
+
+import streamlit as st
+from plotly.subplots import make_subplots
+
+from recho.downsample import scatter
+from recho.insights import CPA_TARGET, pct_change
+from recho.pages import delta
+from recho.tables import render_table
+
+SECTIONS = (
+    "accounts.comparison",
+    "organic.daily_metrics",
+    "paid.daily_metrics",
+    "traffic.by_subreddit",
+    "traffic.organic_vs_paid",
+)
+
+
+def render_insights(ctx, paid, paid_before, organic):
+    st.subheader("💡 Key Insights")
+    
+    roas_change = delta(pct_change(paid['roas'], paid_before.get('roas')))
+    trend = "" if roas_change is None else f" ({roas_change} vs the previous period)"
+    st.markdown(f"""
+    <div class='alert-success'>
+    <strong>📈 Performance:</strong> {paid['conversions']:,} paid conversions at {paid['roas']:.2f} ROAS{trend}. 
+    Organic engagement rate at {organic['engagement_rate']:.2f}%.
+    </div>
+    """, unsafe_allow_html=True)
+    
+    campaigns = ctx.aggregate('paid.daily_metrics', 'campaign_name', sort='cpa')
+    over = campaigns[campaigns['cpa'] > CPA_TARGET]
+    if len(over):
+        worst = over.iloc[0]
+        st.markdown(f"""
+        <div class='alert-warning'>
+        <strong>⚠️ Attention Needed:</strong> {len(over)} campaign(s) above the ${CPA_TARGET:.0f} CPA target, 
+        {worst['campaign_name'].replace('_', ' ')} highest at ${worst['cpa']:.2f}. 
+        Consider reallocating budget to higher-performing placements.
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        st.markdown(f"""
+        <div class='alert-success'>
+        <strong>✅ On Target:</strong> Every campaign is within the ${CPA_TARGET:.0f} CPA target.
+        </div>
+        """, unsafe_allow_html=True)
+
+
+def render(ctx):
+    st.header("Executive Overview")
+    
+    # KPIs come straight from the rollup cubes; deltas compare with the
+    # window of the same length before the selected one
+    paid = ctx.totals('paid')
+    paid_before = ctx.totals('paid', previous=True) or {}
+    traffic = ctx.totals('traffic')
+    organic = ctx.totals('organic')
+    total_karma = ctx.totals('accounts')['total_karma']
+    
+    # KPI Row 1
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("💰 Revenue", f"${paid['revenue']:,.0f}", delta=delta(pct_change(paid['revenue'], paid_before.get('revenue'))))
+    
+    with col2:
+        st.metric("📈 ROAS", f"{paid['roas']:.2f}", delta=delta(pct_change(paid['roas'], paid_before.get('roas'))))
+    
+    with col3:
+        st.metric("🎯 Conversions", f"{traffic['conversions']:,}")
+    
+    with col4:
+        st.metric("⭐ Total Karma", f"{total_karma:,}")
+    
+    # KPI Row 2
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("🌐 Traffic", f"{traffic['sessions']:,}")
+    
+    with col2:
+        st.metric("📊 CVR", f"{traffic['session_cvr']:.2f}%")
+    
+    with col3:
+        organic_before = ctx.totals('organic', previous=True) or {}
+        st.metric("📝 Posts", f"{organic['posts']}", delta=delta(pct_change(organic['posts'], organic_before.get('posts'))))
+    
+    with col4:
+        sentiment = ctx.data.value('brand.sentiment_ratio')
+        st.metric("😊 Sentiment", f"{sentiment}%")
+    
+    if ctx.filters.accounts:
+        st.caption("The Accounts filter applies to Total Karma only: paid, traffic and organic totals have no account breakdown.")
+    
+    st.markdown("---")
+    
+    render_insights(ctx, paid, paid_before, organic)
+    
+    st.markdown("---")
+    
+    # Activity Chart
+    st.subheader("📈 Activity & Traffic Trend")
+    
+    def build_activity_chart():
+        # Day, week or month buckets, whichever suits the date range
+        daily_data = ctx.series('organic')
+        
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        
+        fig.add_trace(
+            scatter(
+                x=daily_data['date'],
+                y=daily_data['posts'],
+                name="Posts",
+                line=dict(color='#D43E2B', width=2),
+                mode='lines+markers'
+            ),
+            secondary_y=False
+        )
+        
+        fig.add_trace(
+            scatter(
+                x=daily_data['date'],
+                y=daily_data['clicks'],
+                name="Traffic",
+                line=dict(color='#666666', width=2)
+            ),
+            secondary_y=True
+        )
+        
+        fig.update_layout(
+            height=400,
+            hovermode='x unified',
+            template='simple_white'
+        )
+        
+        fig.update_xaxes(title_text=ctx.resolution('organic').capitalize())
+        fig.update_yaxes(title_text="Posts", secondary_y=False)
+        fig.update_yaxes(title_text="Clicks", secondary_y=True)
+        return fig
+    
+    ctx.chart('activity', build_activity_chart)
+    
+    st.markdown("---")
+    
+    # Tables
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("🏆 Top Subreddits")
+        df_subs = ctx.top('traffic.by_subreddit', 'sessions', 5)
+        render_table(df_subs, ['subreddit', 'sessions', 'conversions'])
+    
+    with col2:
+        st.subheader("💰 Campaigns")
+        df_camps = ctx.aggregate('paid.daily_metrics', 'campaign_name', sort='spend')
+        df_camps['campaign_name'] = df_camps['campaign_name'].str.replace('_', ' ')
+        render_table(df_camps, ['campaign_name', 'roas', 'conversions'], key='overview_campaigns')
@@ -0,0 +1,108 @@
+"""Paid ads: spend trend, campaign table and ROAS by subreddit."""
+
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+from recho.downsample import scatter
+from recho.insights import pct_change
+from recho.pages import delta
+from recho.tables import render_table
+
+SECTIONS = (
+    "paid.daily_metrics",
+)
+
+PERIODS = {"day": "Daily", "week": "Weekly", "month": "Monthly"}
+
+
+def render(ctx):
+    st.header("Paid Advertising")
+    
+    # Deltas compare with the window of the same length before the selected one
+    paid = ctx.totals('paid')
+    before = ctx.totals('paid', previous=True) or {}
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("💵 Spend", f"${paid['spend']:,.0f}", delta=delta(pct_change(paid['spend'], before.get('spend'))), delta_color="off")
+    
+    with col2:
+        st.metric("📈 ROAS", f"{paid['roas']:.2f}", delta=delta(pct_change(paid['roas'], before.get('roas'))))
+    
+    with col3:
+        st.metric("💰 CPA", f"${paid['cpa']:.2f}", delta=delta(pct_change(paid['cpa'], before.get('cpa'))), delta_color="inverse")
+    
+    with col4:
+        st.metric("🎯 Conversions", f"{paid['conversions']:,}", delta=delta(pct_change(paid['conversions'], before.get('conversions'))))
+    
+    if ctx.filters.accounts:
+        st.caption("The Accounts filter does not apply here: paid ads data has no account breakdown.")
+    
+    st.markdown("---")
+    
+    # Spend vs Conversions
+    st.subheader(f"📊 {PERIODS[ctx.resolution('paid')]} Spend vs Conversions")
+    
+    def build_spend_chart():
+        # Day, week or month buckets, whichever suits the date range
+        df_daily_agg = ctx.series('paid')
+        
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        
+        fig.add_trace(
+            go.Bar(x=df_daily_agg['date'], y=df_daily_agg['spend'], name="Spend", marker_color='#D43E2B'),
+            secondary_y=False
+        )
+        
+        fig.add_trace(
+            scatter(x=df_daily_agg['date'], y=df_daily_agg['conversions'], name="Conversions", line=dict(color='#28A745', width=3)),
+            secondary_y=True
+        )
+        
+        fig.update_layout(height=400, hovermode='x unified', template='simple_white')
+        fig.update_yaxes(title_text="Spend ($)", secondary_y=False)
+        fig.update_yaxes(title_text="Conversions", secondary_y=True)
+        return fig
+    
+    ctx.chart('spend_vs_conversions', build_spend_chart)
+    
+    st.markdown("---")
+    
+    # Campaign Performance
+    st.subheader("📋 Campaign Performance")
+    
+    # Campaign metrics are derived from the filtered daily rows
+    df_campaigns = ctx.aggregate('paid.daily_metrics', 'campaign_name', sort='spend')
+    df_campaigns['campaign_name'] = df_campaigns['campaign_name'].str.replace('_', ' ')
+    
+    render_table(
+        df_campaigns,
+        ['campaign_name', 'spend', 'roas', 'cpa', 'conversions', 'revenue'],
+        key='paid_campaigns'
+    )
+    
+    st.markdown("---")
+    
+    # Subreddit ROAS
+    st.subheader("🎯 ROAS by Subreddit")
+    
+    def build_roas_chart():
+        df_subs = ctx.aggregate('paid.daily_metrics', 'subreddit', sort='roas', limit=10)
+        
+        fig = go.Figure(data=[
+            go.Bar(
+                x=df_subs['subreddit'],
+                y=df_subs['roas'],
+                marker_color=['#28A745' if r >= 5 else '#D43E2B' if r >= 3 else '#FFA500' for r in df_subs['roas']],
+                text=df_subs['roas'].round(2),
+                textposition='outside'
+            )
+        ])
+        
+        fig.add_hline(y=3.0, line_dash="dash", line_color="gray", annotation_text="Target: 3.0")
+        fig.update_layout(height=400, template='simple_white')
+        return fig
+    
+    ctx.chart('roas_by_subreddit', build_roas_chart)
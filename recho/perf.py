@@ -0,0 +1,319 @@
+"""
+Per-rerun tracing of the dashboard's hot paths.
+
+``span(name, **attributes)`` times a block of a rerun: loading data, each
+query that builds a DataFrame, each figure build and each chart or table
+sent to the browser. ``cache_event(cache, hit)`` counts cache hits and
+misses. Both do one context-variable lookup and return when tracing is off.
+
+Tracing is turned on for a process with ``RECHO_PERF=1``, or for a single
+session with ``?perf=1`` in the URL. ``memory`` instead of ``1`` also
+records the net Python allocations of every span with ``tracemalloc``,
+which slows the whole process while it runs: it is started by the first
+memory-traced rerun and stopped again when the last one ends. A traced rerun gets a hidden
+"⏱ Performance" sidebar panel with its waterfall and cache hit rates.
+
+With ``RECHO_PERF_FILE`` set, every span is appended there as one JSON line
+in the OpenTelemetry (OTLP/JSON) span layout, so the file can be replayed
+into a collector or read with ``jq``.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+import weakref
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+PERF_ENV = os.environ.get("RECHO_PERF", "")
+PERF_FILE = os.environ.get("RECHO_PERF_FILE")
+MEMORY = "memory"
+
+_current = contextvars.ContextVar("recho_trace", default=None)
+_file_lock = threading.Lock()
+
+# Process-wide cache counters over every traced rerun:
+# cache -> Counter(hit=..., miss=...)
+CACHE_TOTALS = {}
+_totals_lock = threading.Lock()
+
+# Memory-traced reruns in progress, and whether tracemalloc was started for
+# them (rather than by someone else, e.g. ``Ingestor(trace_memory=True)``).
+_memory_lock = threading.Lock()
+_memory_traces = 0
+_started_tracemalloc = False
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """One timed block of a traced rerun."""
+
+    __slots__ = ("trace", "name", "attributes", "span_id", "parent", "depth", "start", "end", "alloc", "_mem")
+
+    def __init__(self, trace, name, attributes):
+        self.trace = trace
+        self.name = name
+        self.attributes = attributes
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent = None
+        self.depth = 0
+        self.start = self.end = 0
+        self.alloc = None
+        self._mem = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        stack = self.trace._stack
+        if stack:
+            self.parent = stack[-1].span_id
+            self.depth = len(stack)
+        stack.append(self)
+        if self.trace.memory:
+            self._mem = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter_ns()
+        if self._mem is not None:
+            self.alloc = tracemalloc.get_traced_memory()[0] - self._mem
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.trace._stack.pop()
+        self.trace.spans.append(self)
+        return False
+
+    @property
+    def seconds(self):
+        return (self.end - self.start) / 1e9
+
+
+class Trace:
+    """Spans and cache events of one rerun."""
+
+    def __init__(self, memory=False):
+        self.trace_id = uuid.uuid4().hex
+        self.memory = memory
+        self.spans = []
+        self.caches = {}
+        self._stack = []
+        # Wall-clock anchor for exporting perf_counter times.
+        self._epoch_ns = time.time_ns() - time.perf_counter_ns()
+        self.root = Span(self, "rerun", {})
+        self._release = None
+        if memory:
+            _start_memory()
+            # Released at end(), or when a rerun cut short by st.stop() /
+            # st.rerun() drops the trace unfinished.
+            self._release = weakref.finalize(self, _stop_memory)
+
+    def span(self, name, attributes):
+        return Span(self, name, attributes)
+
+    def cache_event(self, cache, hit):
+        self.caches.setdefault(cache, Counter())["hit" if hit else "miss"] += 1
+
+    def ordered(self):
+        """Spans in start order, for the waterfall."""
+        return sorted(self.spans, key=lambda s: s.start)
+
+    def to_otlp(self, span):
+        attributes = [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()]
+        if span.alloc is not None:
+            attributes.append({"key": "alloc_bytes", "value": _otlp_value(span.alloc)})
+        return {
+            "traceId": self.trace_id,
+            "spanId": span.span_id,
+            "parentSpanId": span.parent or "",
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self._epoch_ns + span.start),
+            "endTimeUnixNano": str(self._epoch_ns + span.end),
+            "attributes": attributes,
+        }
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def mode(query_value=None):
+    """``''`` (off), ``'1'`` or ``'memory'`` from the environment or ``?perf=``."""
+    value = (query_value or PERF_ENV or "").strip().lower()
+    if value in ("", "0", "false", "off"):
+        return ""
+    return MEMORY if value == MEMORY else "1"
+
+
+def begin(query_value=None, **attributes):
+    """Start tracing this rerun if enabled; returns the ``Trace`` or None."""
+    selected = mode(query_value)
+    if not selected:
+        _current.set(None)
+        return None
+    trace = Trace(selected == MEMORY)
+    trace.root.set(**attributes)
+    _current.set(trace)
+    trace.root.__enter__()
+    return trace
+
+
+def end(trace):
+    """Close the rerun's root span and write the trace out."""
+    if trace is None:
+        return
+    _current.set(None)
+    trace.root.__exit__(None, None, None)
+    if trace._release is not None:
+        trace._release()
+    logger.info(
+        "rerun %.0f ms, %d spans, slowest %s",
+        trace.root.seconds * 1000,
+        len(trace.spans),
+        max(trace.spans[:-1], key=lambda s: s.end - s.start).name if len(trace.spans) > 1 else "-",
+    )
+    if PERF_FILE:
+        lines = "".join(json.dumps(trace.to_otlp(span)) + "\n" for span in trace.ordered())
+        with _file_lock, open(PERF_FILE, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+def _start_memory():
+    global _memory_traces, _started_tracemalloc
+    with _memory_lock:
+        if _memory_traces == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracemalloc = True
+        _memory_traces += 1
+
+
+def _stop_memory():
+    global _memory_traces, _started_tracemalloc
+    with _memory_lock:
+        _memory_traces -= 1
+        if _memory_traces == 0 and _started_tracemalloc:
+            tracemalloc.stop()
+            _started_tracemalloc = False
+
+
+def span(name, **attributes):
+    """Context manager timing a block of the current rerun (a no-op when off)."""
+    trace = _current.get()
+    if trace is None:
+        return _NOOP
+    return trace.span(name, attributes)
+
+
+def cache_event(cache, hit):
+    """Count a hit or miss of ``cache`` for the traced rerun and the process totals."""
+    trace = _current.get()
+    if trace is None:
+        return
+    trace.cache_event(cache, hit)
+    with _totals_lock:
+        CACHE_TOTALS.setdefault(cache, Counter())["hit" if hit else "miss"] += 1
+
+
+# ============================================================================
+# PANEL
+# ============================================================================
+def _hit_rate(counts):
+    total = counts["hit"] + counts["miss"]
+    return counts["hit"] / total * 100 if total else 0.0
+
+
+def render_panel(trace):
+    """The sidebar "⏱ Performance" panel for a finished ``trace``."""
+    import pandas as pd
+    import plotly.graph_objects as go
+    import streamlit as st
+
+    spans = trace.ordered()
+    origin = trace.root.start
+    with st.sidebar.expander("⏱ Performance", expanded=False):
+        st.caption(f"Rerun {trace.root.seconds * 1000:,.0f} ms · {len(spans) - 1} spans")
+
+        rows = pd.DataFrame({
+            "span": [
+                "  " * s.depth + " ".join([s.name] + [str(v) for v in s.attributes.values() if isinstance(v, str)])
+                for s in spans
+            ],
+            "rows": [s.attributes.get("rows") for s in spans],
+            "start_ms": [(s.start - origin) / 1e6 for s in spans],
+            "ms": [(s.end - s.start) / 1e6 for s in spans],
+            "alloc_kib": [None if s.alloc is None else s.alloc / 1024 for s in spans],
+        })
+        # Spans are plotted by position, since names repeat (one per query).
+        fig = go.Figure(go.Bar(
+            y=rows.index,
+            x=rows["ms"],
+            customdata=rows["span"],
+            base=rows["start_ms"],
+            orientation="h",
+            marker_color=["#D43E2B" if s.depth <= 1 else "#FF9E8F" for s in spans],
+            hovertemplate="%{customdata}<br>%{base:.1f} → %{x:.1f} ms<extra></extra>",
+        ))
+        fig.update_layout(
+            height=120 + 18 * len(spans),
+            margin=dict(l=0, r=0, t=10, b=0),
+            yaxis=dict(
+                autorange="reversed", tickfont=dict(size=10),
+                tickmode="array", tickvals=rows.index, ticktext=rows["span"],
+            ),
+            xaxis_title="ms",
+            template="simple_white",
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        columns = ["span", "ms", "rows"] + (["alloc_kib"] if trace.memory else [])
+        st.dataframe(
+            rows.sort_values("ms", ascending=False)[columns].iloc[1:],
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "ms": st.column_config.NumberColumn("ms", format="%.1f"),
+                "rows": st.column_config.NumberColumn("rows", format="%,d"),
+                "alloc_kib": st.column_config.NumberColumn("KiB", format="%,.0f"),
+            },
+        )
+
+        caches = sorted(set(trace.caches) | set(CACHE_TOTALS))
+        if caches:
+            st.dataframe(
+                pd.DataFrame({
+                    "cache": caches,
+                    "rerun hits": [trace.caches.get(c, Counter())["hit"] for c in caches],
+                    "rerun misses": [trace.caches.get(c, Counter())["miss"] for c in caches],
+                    "process hit %": [_hit_rate(CACHE_TOTALS.get(c, Counter())) for c in caches],
+                }),
+                hide_index=True,
+                use_container_width=True,
+                column_config={"process hit %": st.column_config.NumberColumn(format="%.0f%%")},
+            )
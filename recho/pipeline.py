@@ -0,0 +1,751 @@
+"""
+Offline build of every dashboard section from raw exports.
+
+``python -m recho.pipeline RAW_DIR --out metrics.db`` reads the raw exports
+in RAW_DIR, each a ``<name>.csv`` / ``<name>.ndjson`` file or a ``<name>/``
+directory of such part files, with the columns declared in ``RAW``:
+
+* ``posts``      one row per organic post;
+* ``accounts``   account metadata (type, creation date, comment karma, ...);
+* ``ad_days``    paid delivery per day, campaign and subreddit;
+* ``campaigns``  campaign budgets, for pacing (optional: without a budget a
+  campaign is paced against its total spend);
+* ``mentions``   raw brand mentions, kept as ``brand.mentions``;
+* ``sessions``   site sessions with source, medium, subreddit, campaign and
+  their conversions.
+
+From them it computes the sections and scalars the dashboard reads
+(ROAS, CPA, pacing, karma velocity, performance tiers, attribution, ...)
+rather than trusting precomputed fields. Posts, ad days and mentions are
+required; without accounts the account metadata is blank, and without
+sessions the traffic and touchpoint sections are written empty.
+
+The work runs on a process pool in three phases:
+
+1. map: each file (NDJSON files in ``MAP_BYTES`` ranges) is parsed (by
+   pyarrow when it is installed), typed
+   with the ``recho.schema`` kinds and split into shards by a stable hash of
+   its ``SHARD_KEYS`` column (account, campaign, subreddit or user), written
+   as pickles to a scratch directory;
+2. reduce: each shard is aggregated on its own. Whatever is keyed by the
+   shard column (account and campaign rows, karma velocity, pacing,
+   attribution paths) is final there; per-day, per-subreddit and per-source
+   sums are partial;
+3. merge: the parent adds up the partial sums, derives the ratios and
+   writes SQLite (``.db``) or the NDJSON section directory that
+   ``recho.ingest`` reads.
+
+Map and reduce tasks are independent, so their time falls with the number
+of workers; the merge only adds up aggregates and puts rows in a fixed
+order, so the output is the same for any worker or shard count.
+"""
+
+import argparse
+import importlib.util
+import io
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from recho import schema
+from recho.attribution import credits
+from recho.derive import PAID_MEASURES, daily_totals, karma_velocity, pacing, per_week, ratios, rolling_roas, safe_div, with_ratios
+from recho.ingest import write_ndjson
+from recho.mentions import OWN_BRAND
+from recho.schema import COUNT, DATE, MONEY, NAME, RATE, TEXT
+from recho.sources import SQLITE_SUFFIXES, write_sqlite
+from recho.store import MetricsStore, concat_frames
+
+logger = logging.getLogger(__name__)
+
+RAW = {
+    "posts": {
+        "post_id": TEXT,
+        "account_name": NAME,
+        "subreddit": NAME,
+        "post_date": DATE,
+        "title": TEXT,
+        "impressions": COUNT,
+        "upvotes": COUNT,
+        "downvotes": COUNT,
+        "comments": COUNT,
+        "clicks": COUNT,
+        "karma": COUNT,
+    },
+    "accounts": {
+        "account_name": NAME,
+        "account_type": NAME,
+        "created": DATE,
+        "comment_karma": COUNT,
+        "total_comments": COUNT,
+        "followers": COUNT,
+    },
+    "ad_days": {
+        "date": DATE,
+        "campaign_id": NAME,
+        "campaign_name": NAME,
+        "subreddit": NAME,
+        "impressions": COUNT,
+        "clicks": COUNT,
+        "spend": MONEY,
+        "conversions": COUNT,
+        "revenue": MONEY,
+    },
+    "campaigns": {
+        "campaign_name": NAME,
+        "budget": MONEY,
+    },
+    "mentions": schema.SECTIONS["brand.mentions"],
+    "sessions": {
+        "user_id": NAME,
+        "date": DATE,
+        "source": NAME,
+        "medium": NAME,
+        "subreddit": NAME,
+        "campaign": NAME,
+        "pageviews": COUNT,
+        "new_user": COUNT,
+        "bounced": COUNT,
+        "duration_seconds": COUNT,
+        "conversions": COUNT,
+        "revenue": MONEY,
+    },
+}
+
+REQUIRED = ("posts", "ad_days", "mentions")
+
+# export -> the column its rows are sharded by; the others are small and
+# read whole by every shard
+SHARD_KEYS = {
+    "posts": "account_name",
+    "ad_days": "campaign_name",
+    "mentions": "subreddit",
+    "sessions": "user_id",
+}
+
+DATE_COLUMNS = {"posts": "post_date", "ad_days": "date", "mentions": "date", "sessions": "date"}
+
+SUFFIXES = (".csv", ".ndjson", ".jsonl")
+
+# pyarrow parses CSV and NDJSON several times faster than the pandas readers.
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+MAP_BYTES = 64 << 20
+SHARDS_PER_WORKER = 4
+
+COST_PER_POST = float(os.environ.get("RECHO_COST_PER_POST", "50"))
+KARMA_PERIOD_DAYS = 7
+ROAS_WINDOW = 7
+PRIMARY_SUBREDDITS = 3
+
+# (minimum ROAS, tier), best first
+TIERS = ((4.0, "Excellent"), (2.5, "Good"), (1.5, "Average"), (0.0, "Poor"))
+
+# partial piece -> columns its rows are summed by in the merge; every other
+# piece is final in its shard and only concatenated
+SUMS = {
+    "posts.by_subreddit": ("subreddit",),
+    "posts.by_day": ("date",),
+    "ads.by_subreddit": ("subreddit",),
+    "ads.by_day": ("date",),
+    "mentions.by_day": ("date",),
+    "mentions.by_sentiment": ("sentiment",),
+    "sessions.by_source": ("source", "medium"),
+    "sessions.by_subreddit": ("subreddit",),
+    "sessions.by_campaign": ("campaign",),
+    "sessions.by_channel": ("channel",),
+}
+
+
+@dataclass
+class BuildStats:
+    """What one build did."""
+
+    rows: dict = field(default_factory=dict)
+    sections: int = 0
+    workers: int = 1
+    shards: int = 1
+    map_seconds: float = 0.0
+    reduce_seconds: float = 0.0
+    merge_seconds: float = 0.0
+    write_seconds: float = 0.0
+    issues: set = field(default_factory=set)
+
+    def __str__(self):
+        rows = ", ".join(f"{name} {n:,}" for name, n in self.rows.items())
+        return (
+            f"{rows} -> {self.sections} sections with {self.workers} workers / {self.shards} shards: "
+            f"map {self.map_seconds:.2f}s, reduce {self.reduce_seconds:.2f}s, "
+            f"merge {self.merge_seconds:.2f}s, write {self.write_seconds:.2f}s"
+        )
+
+
+# ============================================================================
+# READING
+# ============================================================================
+def find_inputs(raw_dir):
+    """Export name -> its files in ``raw_dir``."""
+    found = {}
+    for name in RAW:
+        files = [os.path.join(raw_dir, name + suffix) for suffix in SUFFIXES]
+        files = [path for path in files if os.path.isfile(path)]
+        part_dir = os.path.join(raw_dir, name)
+        if os.path.isdir(part_dir):
+            files += sorted(os.path.join(part_dir, f) for f in os.listdir(part_dir) if f.endswith(SUFFIXES))
+        if files:
+            found[name] = files
+    return found
+
+
+def _read_range(path, start, end):
+    """The lines of ``path`` that start in ``[start, end)``."""
+    with open(path, "rb") as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()
+        block = f.read(max(end - f.tell(), 0))
+        if block and not block.endswith(b"\n"):
+            block += f.readline()
+    return block
+
+
+def typed(name, df, issues=None):
+    """The declared columns of raw export ``name``, converted to their kinds."""
+    section = f"raw.{name}"
+    out = {}
+    for col, kind in RAW[name].items():
+        if col in df.columns:
+            series = df[col]
+        else:
+            if issues is not None:
+                issues.add(f"{section}.{col}: column missing")
+            if (name, col) == ("mentions", "brand"):
+                # A single-brand mention export.
+                series = pd.Series(OWN_BRAND, index=df.index, dtype=object)
+            elif kind in (COUNT, MONEY, RATE):
+                series = pd.Series(np.nan, index=df.index)
+            else:
+                series = pd.Series(None, index=df.index, dtype=object)
+        out[col] = schema.convert(section, col, series, kind, issues)
+        if kind == DATE:
+            # The pyarrow readers give second resolution.
+            out[col] = out[col].astype("datetime64[ns]")
+    return pd.DataFrame(out, index=df.index).reset_index(drop=True)
+
+
+def read_raw(name, path, start=0, end=None, issues=None):
+    """One file, or the ``[start, end)`` byte range of an NDJSON file, of export ``name``."""
+    engine = "pyarrow" if HAS_PYARROW else None
+    if path.endswith(".csv"):
+        df = pd.read_csv(path, engine=engine or "c")
+    else:
+        block = _read_range(path, start, os.path.getsize(path) if end is None else end)
+        if not block.strip():
+            df = pd.DataFrame()
+        elif engine:
+            df = pd.read_json(io.BytesIO(block), lines=True, engine=engine)
+        else:
+            df = pd.read_json(io.BytesIO(block), lines=True, dtype=False, convert_dates=False)
+    return typed(name, df, issues)
+
+
+def _map_tasks(inputs):
+    for name, files in inputs.items():
+        for path in files:
+            if path.endswith(".csv"):
+                yield name, path, 0, None
+                continue
+            size = os.path.getsize(path)
+            for start in range(0, max(size, 1), MAP_BYTES):
+                yield name, path, start, min(start + MAP_BYTES, size)
+
+
+def shard_ids(series, n_shards):
+    """Shard of each value of ``series``: a stable hash of its text, modulo ``n_shards``."""
+    if n_shards == 1:
+        return np.zeros(len(series), dtype=np.intp)
+    values = series.astype("category")
+    labels = np.asarray(values.cat.categories.astype(str), dtype=object)
+    # hash_array is keyed by a fixed key, so every process agrees.
+    by_label = (pd.util.hash_array(labels) % np.uint64(n_shards)).astype(np.intp)
+    codes = values.cat.codes.to_numpy()
+    return np.where(codes >= 0, by_label[codes], 0)
+
+
+def _map(task):
+    """Parse one input piece and write it to the scratch directory, split by shard."""
+    (name, path, start, end), scratch, part, n_shards = task
+    issues = set()
+    df = read_raw(name, path, start, end, issues)
+    date_col = DATE_COLUMNS.get(name)
+    span = (df[date_col].min(), df[date_col].max()) if date_col and len(df) else (pd.NaT, pd.NaT)
+    if name in SHARD_KEYS:
+        ids = shard_ids(df[SHARD_KEYS[name]], n_shards)
+        order = np.argsort(ids, kind="stable")
+        bounds = np.searchsorted(ids[order], np.arange(n_shards + 1))
+        for shard in range(n_shards):
+            rows = order[bounds[shard]:bounds[shard + 1]]
+            if len(rows):
+                piece = df.iloc[rows]
+                # Only the shard's own names go with it, not the whole file's.
+                piece = piece.assign(**{
+                    col: piece[col].cat.remove_unused_categories()
+                    for col in piece.columns if isinstance(piece[col].dtype, pd.CategoricalDtype)
+                })
+                piece.to_pickle(os.path.join(scratch, name, str(shard), f"{part:06d}.pkl"))
+    elif len(df):
+        df.to_pickle(os.path.join(scratch, name, f"{part:06d}.pkl"))
+    return name, len(df), span, issues
+
+
+def _load(scratch, name, shard=None):
+    folder = os.path.join(scratch, name) if shard is None else os.path.join(scratch, name, str(shard))
+    if not os.path.isdir(folder):
+        return None
+    parts = [pd.read_pickle(os.path.join(folder, f)) for f in sorted(os.listdir(folder)) if f.endswith(".pkl")]
+    return concat_frames(parts) if parts else None
+
+
+# ============================================================================
+# REDUCE: ONE SHARD
+# ============================================================================
+def _sums(df, by, **columns):
+    """``df`` grouped by ``by`` with ``name=(column, "sum" / "size")`` aggregates."""
+    return df.groupby(list(by), observed=True).agg(**columns).reset_index()
+
+
+def reduce_posts(posts, context):
+    posts = posts.assign(
+        engagement_rate=safe_div(posts["upvotes"] + posts["comments"], posts["impressions"], 100, 0.0),
+        upvote_rate=safe_div(posts["upvotes"], posts["upvotes"] + posts["downvotes"], 100, 0.0),
+        date=posts["post_date"].dt.floor("D"),
+    )
+    by_account = _sums(
+        posts, ["account_name"],
+        total_posts=("post_id", "size"), post_karma=("karma", "sum"), total_upvotes=("upvotes", "sum"),
+        total_post_comments=("comments", "sum"), total_clicks=("clicks", "sum"),
+        impressions=("impressions", "sum"), upvote_rate_sum=("upvote_rate", "sum"),
+        engagement_rate_sum=("engagement_rate", "sum"), unique_subreddits=("subreddit", "nunique"),
+    )
+    # Most posted-in subreddits first, ties by name.
+    counts = posts.groupby(["account_name", "subreddit"], observed=True).size().rename("n").reset_index()
+    counts = counts.assign(subreddit=counts["subreddit"].astype(str))
+    counts = counts.sort_values(["account_name", "n", "subreddit"], ascending=[True, False, True])
+    primary = counts.groupby("account_name", observed=True)["subreddit"].agg(lambda s: list(s[:PRIMARY_SUBREDDITS]))
+    by_account["primary_subreddits"] = primary.reindex(by_account["account_name"]).tolist()
+    return {
+        "organic.top_posts": posts[list(schema.SECTIONS["organic.top_posts"])],
+        "organic.karma_velocity": karma_velocity(
+            posts, KARMA_PERIOD_DAYS, start=context["post_days"][0], end=context["post_days"][1]
+        ),
+        "posts.by_account": by_account,
+        "posts.by_subreddit": _sums(
+            posts, ["subreddit"],
+            post_count=("post_id", "size"), total_impressions=("impressions", "sum"),
+            total_upvotes=("upvotes", "sum"), total_downvotes=("downvotes", "sum"),
+            total_comments=("comments", "sum"), total_clicks=("clicks", "sum"), total_karma=("karma", "sum"),
+            upvote_rate_sum=("upvote_rate", "sum"), engagement_rate_sum=("engagement_rate", "sum"),
+        ),
+        "posts.by_day": _sums(
+            posts, ["date"],
+            posts=("post_id", "size"), impressions=("impressions", "sum"), upvotes=("upvotes", "sum"),
+            comments=("comments", "sum"), clicks=("clicks", "sum"), karma=("karma", "sum"),
+        ),
+    }
+
+
+def reduce_ad_days(ads, context):
+    sums = {m: (m, "sum") for m in PAID_MEASURES}
+    ads = ads.assign(date=ads["date"].dt.floor("D"))
+    daily = with_ratios(_sums(ads, ["date", "campaign_id", "campaign_name", "subreddit"], **sums))
+    campaigns = with_ratios(_sums(ads, ["campaign_id", "campaign_name"], **sums))
+    totals = campaigns.groupby("campaign_name", observed=True)["spend"].sum()
+    budgets = pd.Series(totals.to_numpy(), index=totals.index.astype(str))
+    if context["budgets"] is not None:
+        budgets.update(context["budgets"])
+    paced = pacing(ads, budgets)
+    return {
+        "paid.daily_metrics": daily[list(schema.SECTIONS["paid.daily_metrics"])],
+        "paid.campaign_summary": campaigns[list(schema.SECTIONS["paid.campaign_summary"])],
+        "paid.spend_pacing": paced[list(schema.SECTIONS["paid.spend_pacing"])],
+        "ads.by_subreddit": _sums(ads, ["subreddit"], **sums),
+        "ads.by_day": _sums(ads, ["date"], **sums),
+    }
+
+
+def reduce_mentions(mentions, context):
+    own = mentions[mentions["brand"] == OWN_BRAND]
+    own = own.assign(
+        date=own["date"].dt.floor("D"),
+        sentiment_sum=own["sentiment_score"].astype(np.float64),
+        positive=(own["sentiment"] == "positive").astype(np.int64),
+    )
+    counts = dict(
+        mention_count=("brand", "size"), total_upvotes=("upvotes", "sum"), total_comments=("comments", "sum"),
+    )
+    return {
+        "brand.mentions": mentions,
+        "mentions.by_subreddit": _sums(own, ["subreddit"], **counts, sentiment_sum=("sentiment_sum", "sum"), positive=("positive", "sum")),
+        "mentions.by_day": _sums(own, ["date"], **counts, sentiment_sum=("sentiment_sum", "sum")),
+        "mentions.by_sentiment": _sums(own, ["sentiment"], **counts),
+    }
+
+
+# traffic sum -> the session column it adds up
+TRAFFIC_SUMS = {
+    "sessions": "user_id",
+    "new_users": "new_user",
+    "pageviews": "pageviews",
+    "conversions": "conversions",
+    "revenue": "revenue",
+    "bounces": "bounced",
+    "duration_seconds": "duration_seconds",
+}
+
+
+def reduce_sessions(sessions, context):
+    sessions = sessions.assign(channel=sessions["medium"])
+    traffic = {name: (col, "size" if name == "sessions" else "sum") for name, col in TRAFFIC_SUMS.items()}
+
+    # Paths never cross users, and every user is in this shard.
+    users, _ = pd.factorize(sessions["user_id"])
+    times = sessions["date"].to_numpy(dtype="datetime64[ns]").view("i8")
+    order = np.lexsort((times, users))
+    order = order[users[order] >= 0]
+    conversions = sessions["conversions"].to_numpy(dtype=np.float64)[order]
+    weights, path, last = credits(users[order], times[order], conversions > 0)
+    path_conversions = conversions[last]
+    multi_touch = np.bincount(path) > 1
+    channels, labels = pd.factorize(sessions["channel"].astype(str).to_numpy()[order])
+    by_channel = pd.DataFrame({
+        "channel": labels,
+        "linear": np.bincount(channels, weights=weights["linear"] * path_conversions[path], minlength=len(labels)),
+        # Conversions of paths with more than one session, by the converting session's channel.
+        "assisted": np.bincount(channels[last], weights=np.where(multi_touch, path_conversions, 0), minlength=len(labels)),
+    })
+
+    return {
+        "traffic.touchpoints": sessions[list(schema.SECTIONS["traffic.touchpoints"])],
+        "sessions.by_source": _sums(sessions, ["source", "medium"], **traffic),
+        "sessions.by_subreddit": _sums(sessions, ["subreddit"], **traffic),
+        "sessions.by_campaign": _sums(sessions[sessions["medium"] == "paid"], ["campaign"], **traffic),
+        "sessions.by_channel": by_channel,
+    }
+
+
+REDUCERS = {
+    "posts": reduce_posts,
+    "ad_days": reduce_ad_days,
+    "mentions": reduce_mentions,
+    "sessions": reduce_sessions,
+}
+
+
+def _reduce(task):
+    """Every piece of one shard."""
+    scratch, shard, context = task
+    pieces = {}
+    for name, reduce in REDUCERS.items():
+        df = _load(scratch, name, shard)
+        if df is not None and len(df):
+            pieces.update(reduce(df, context))
+    return pieces
+
+
+# ============================================================================
+# MERGE
+# ============================================================================
+def _merge_pieces(results):
+    """Shard pieces concatenated, and partial sums added up."""
+    merged = {}
+    for name in {name for pieces in results for name in pieces}:
+        df = concat_frames([pieces[name] for pieces in results if name in pieces])
+        if name in SUMS:
+            by = list(SUMS[name])
+            df = df.groupby(by, observed=True, sort=True).sum(numeric_only=True).reset_index()
+        merged[name] = df
+    return merged
+
+
+def _sorted(df, by, descending=()):
+    """``df`` in a fixed row order, whatever the shard order: by ``by``, names as text."""
+    def key(series):
+        if not isinstance(series.dtype, pd.CategoricalDtype):
+            return series
+        return series.cat.set_categories(sorted(series.cat.categories, key=str), ordered=True).cat.codes
+    return df.sort_values(list(by), ascending=[col not in descending for col in by], kind="stable", key=key, ignore_index=True)
+
+
+def _tier(roas):
+    roas = np.nan_to_num(np.asarray(roas, dtype=np.float64), nan=0.0)
+    return np.select([roas >= floor for floor, _ in TIERS], [tier for _, tier in TIERS], TIERS[-1][1])
+
+
+def _organic(pieces, accounts, as_of, frames):
+    if "posts.by_day" not in pieces:
+        return
+    frames["organic.top_posts"] = _sorted(pieces["organic.top_posts"], ["upvotes", "post_id"], ["upvotes"])
+
+    subs = pieces["posts.by_subreddit"]
+    subs = subs.assign(
+        avg_upvote_rate=safe_div(subs["upvote_rate_sum"], subs["post_count"]),
+        avg_engagement_rate=safe_div(subs["engagement_rate_sum"], subs["post_count"]),
+        ctr=safe_div(subs["total_clicks"], subs["total_impressions"], 100),
+    )
+    frames["organic.subreddit_performance"] = _sorted(subs, ["total_karma", "subreddit"], ["total_karma"])
+
+    measures = ("posts", "impressions", "upvotes", "comments", "clicks", "karma")
+    daily = daily_totals(pieces["posts.by_day"], measures)
+    weekly = daily.groupby(daily["date"] + pd.to_timedelta(6 - daily["date"].dt.dayofweek, unit="D"))[list(measures)].sum()
+    for name, df in (("organic.daily_metrics", daily), ("organic.weekly_metrics", weekly.reset_index())):
+        frames[name] = df.assign(**ratios(df, fill=0.0))
+
+    frames["organic.karma_velocity"] = _sorted(pieces["organic.karma_velocity"], ["date", "account_name"])
+
+    by_account = pieces["posts.by_account"]
+    by_account = by_account.assign(account_name=by_account["account_name"].astype(str))
+    if accounts is not None:
+        meta = accounts.assign(account_name=accounts["account_name"].astype(str)).drop_duplicates("account_name", keep="last")
+        df = meta.merge(by_account, on="account_name", how="outer")
+    else:
+        df = by_account.assign(account_type=None, created=pd.NaT, comment_karma=0, total_comments=0, followers=0)
+    for col in ("total_posts", "post_karma", "total_upvotes", "total_post_comments", "total_clicks",
+                "impressions", "upvote_rate_sum", "engagement_rate_sum", "unique_subreddits", "comment_karma",
+                "total_comments", "followers"):
+        df[col] = df[col].fillna(0)
+    age = ((as_of - df["created"]).dt.days + 1).fillna(0).astype(np.int64)
+    total_karma = df["post_karma"] + df["comment_karma"]
+    df = df.assign(
+        account_age_days=age,
+        total_karma=total_karma,
+        karma_per_day=safe_div(total_karma, age),
+        posts_per_week=per_week(df["total_posts"], age),
+        avg_upvote_ratio=safe_div(df["upvote_rate_sum"], df["total_posts"], 0.01),
+        avg_engagement_rate=safe_div(df["engagement_rate_sum"], df["total_posts"]),
+        avg_ctr=safe_div(df["total_clicks"], df["impressions"], 100),
+        primary_subreddits=[p if isinstance(p, list) else [] for p in df["primary_subreddits"]],
+    )
+    frames["accounts.comparison"] = _sorted(df, ["total_karma", "account_name"], ["total_karma"])
+
+
+def _paid(pieces, frames):
+    if "ads.by_day" not in pieces:
+        return
+    frames["paid.campaign_summary"] = _sorted(pieces["paid.campaign_summary"], ["campaign_id", "campaign_name"])
+    subs = with_ratios(pieces["ads.by_subreddit"])
+    frames["paid.subreddit_performance"] = _sorted(
+        subs.assign(performance_tier=_tier(subs["roas"])), ["roas", "subreddit"], ["roas"]
+    )
+    frames["paid.daily_metrics"] = _sorted(pieces["paid.daily_metrics"], ["date", "campaign_id", "campaign_name", "subreddit"])
+    frames["paid.spend_pacing"] = _sorted(pieces["paid.spend_pacing"], ["date", "campaign_name"])
+    frames["paid.roas_trend"] = rolling_roas(daily_totals(pieces["ads.by_day"], ("spend", "revenue")), ROAS_WINDOW)
+
+
+def _brand(pieces, frames, values):
+    if "mentions.by_day" not in pieces:
+        return
+    mentions = pieces["brand.mentions"]
+    frames["brand.mentions"] = _sorted(mentions, mentions.columns)
+
+    daily = daily_totals(pieces["mentions.by_day"], ("mention_count", "total_upvotes", "total_comments", "sentiment_sum"))
+    frames["brand.mention_trend"] = daily.assign(
+        avg_sentiment=safe_div(daily["sentiment_sum"], daily["mention_count"])
+    )
+
+    subs = pieces["mentions.by_subreddit"]
+    subs = subs.assign(
+        avg_sentiment=safe_div(subs["sentiment_sum"], subs["mention_count"]),
+        positive_rate=safe_div(subs["positive"], subs["mention_count"], 100),
+    )
+    frames["brand.by_subreddit"] = _sorted(subs, ["mention_count", "subreddit"], ["mention_count"])
+
+    sentiment = _sorted(pieces["mentions.by_sentiment"], ["mention_count", "sentiment"], ["mention_count"])
+    total = sentiment["mention_count"].sum()
+    frames["brand.sentiment_distribution"] = sentiment.assign(
+        percentage=safe_div(sentiment["mention_count"], total, 100, 0.0)
+    )
+    positive = sentiment.loc[sentiment["sentiment"] == "positive", "mention_count"].sum()
+    values["brand.sentiment_ratio"] = round(float(safe_div(positive, total, 100, 0.0)), 1)
+
+
+def _traffic(pieces, frames, values):
+    if "sessions.by_source" not in pieces:
+        # No sessions, no conversions to split.
+        values.update({path: 0 for path in schema.VALUES if path.startswith("traffic.assisted_conversions.")})
+        return
+    touchpoints = pieces["traffic.touchpoints"]
+    frames["traffic.touchpoints"] = _sorted(touchpoints, touchpoints.columns)
+
+    def rates(df):
+        return df.assign(
+            conversion_rate=safe_div(df["conversions"], df["sessions"], 100),
+            new_user_rate=safe_div(df["new_users"], df["sessions"], 100),
+            revenue_per_session=safe_div(df["revenue"], df["sessions"]),
+            bounce_rate=safe_div(df["bounces"], df["sessions"], 100),
+            avg_session_duration=safe_div(df["duration_seconds"], df["sessions"]),
+        )
+
+    by_source = rates(pieces["sessions.by_source"])
+    by_medium = by_source.groupby("medium", observed=True)[list(TRAFFIC_SUMS)].sum().reset_index()
+    by_medium = rates(_sorted(by_medium, ["medium"]))
+    frames["traffic.by_source"] = _sorted(by_source, ["sessions", "source", "medium"], ["sessions"])
+    frames["traffic.by_subreddit"] = _sorted(rates(pieces["sessions.by_subreddit"]), ["sessions", "subreddit"], ["sessions"])
+    frames["traffic.by_campaign"] = _sorted(rates(pieces["sessions.by_campaign"]), ["sessions", "campaign"], ["sessions"])
+    frames["traffic.organic_vs_paid"] = by_medium
+
+    channel = by_medium.assign(
+        channel=by_medium["medium"].astype(str).str.capitalize(),
+        avg_order_value=safe_div(by_medium["revenue"], by_medium["conversions"]),
+        session_share=safe_div(by_medium["sessions"], by_medium["sessions"].sum(), 100),
+        revenue_share=safe_div(by_medium["revenue"], by_medium["revenue"].sum(), 100),
+    )
+    frames["cross_channel.contribution"] = channel
+
+    paths = pieces["sessions.by_channel"]
+    total = int(by_medium["conversions"].sum())
+    assisted = int(round(paths["assisted"].sum()))
+    values.update({
+        "traffic.assisted_conversions.total_conversions": total,
+        "traffic.assisted_conversions.last_click_conversions": total - assisted,
+        "traffic.assisted_conversions.assisted_conversions": assisted,
+        "traffic.assisted_conversions.assist_rate": round(float(safe_div(assisted, total, 100, 0.0)), 1),
+    })
+
+
+def _efficiency(pieces, values):
+    if "posts.by_day" not in pieces or "ads.by_day" not in pieces:
+        return
+    posts = int(pieces["posts.by_day"]["posts"].sum())
+    spend = float(pieces["ads.by_day"]["spend"].sum())
+    conversions = int(pieces["ads.by_day"]["conversions"].sum())
+    # Organic conversions as the linear model credits them to organic sessions.
+    paths = pieces.get("sessions.by_channel")
+    organic = float(paths.loc[paths["channel"] == "organic", "linear"].sum()) if paths is not None else 0.0
+    organic_cpa = float(safe_div(COST_PER_POST * posts, organic))
+    paid_cpa = float(safe_div(spend, conversions))
+    values.update({
+        "cross_channel.efficiency.organic.total_posts": posts,
+        "cross_channel.efficiency.organic.estimated_conversions": round(organic, 2),
+        "cross_channel.efficiency.organic.estimated_cpa": round(organic_cpa, 2),
+        "cross_channel.efficiency.organic.cost_per_post": COST_PER_POST,
+        "cross_channel.efficiency.paid.total_spend": round(spend, 2),
+        "cross_channel.efficiency.paid.conversions": conversions,
+        "cross_channel.efficiency.paid.cpa": round(paid_cpa, 2),
+        "cross_channel.efficiency.comparison.cpa_ratio": round(float(safe_div(organic_cpa, paid_cpa)), 2),
+        "cross_channel.efficiency.comparison.efficiency_winner": "Paid" if paid_cpa < organic_cpa else "Organic",
+    })
+
+
+def merge(results, accounts, as_of):
+    """``(frames, values)`` of the dashboard from the shards' pieces."""
+    pieces = _merge_pieces(results)
+    frames, values = {}, {}
+    _organic(pieces, accounts, as_of, frames)
+    _paid(pieces, frames)
+    _brand(pieces, frames, values)
+    _traffic(pieces, frames, values)
+    _efficiency(pieces, values)
+    ordered = {}
+    for section, columns in schema.SECTIONS.items():
+        # Sections of a missing export are written empty.
+        df = frames[section][list(columns)].reset_index(drop=True) if section in frames else pd.DataFrame(columns=list(columns))
+        schema.apply(section, df)
+        ordered[section] = df
+    return ordered, schema.check_values(values)
+
+
+# ============================================================================
+# BUILD
+# ============================================================================
+def _run(pool, fn, tasks):
+    return list(pool.map(fn, tasks)) if pool is not None else [fn(task) for task in tasks]
+
+
+def build(raw_dir, out, workers=None, shards=None, scratch_dir=None):
+    """Build the dashboard sections from the exports in ``raw_dir`` and write them to ``out``."""
+    workers = workers or os.cpu_count() or 1
+    shards = shards or workers * SHARDS_PER_WORKER
+    stats = BuildStats(workers=workers, shards=shards)
+    inputs = find_inputs(raw_dir)
+    missing = [name for name in REQUIRED if name not in inputs]
+    if missing:
+        raise FileNotFoundError(f"No {', '.join(missing)} export in {raw_dir}")
+
+    scratch = tempfile.mkdtemp(prefix="recho-build-", dir=scratch_dir)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for name in inputs:
+            os.makedirs(os.path.join(scratch, name), exist_ok=True)
+            if name in SHARD_KEYS:
+                for shard in range(shards):
+                    os.makedirs(os.path.join(scratch, name, str(shard)))
+
+        started = time.perf_counter()
+        tasks = [(task, scratch, part, shards) for part, task in enumerate(_map_tasks(inputs))]
+        spans = {}
+        for name, rows, span, issues in _run(pool, _map, tasks):
+            stats.rows[name] = stats.rows.get(name, 0) + rows
+            spans.setdefault(name, []).append(span)
+            stats.issues |= issues
+        stats.map_seconds = time.perf_counter() - started
+
+        def span(names):
+            ends = pd.Series([end for name in names for pair in spans.get(name, ()) for end in pair]).dropna()
+            return (ends.min(), ends.max()) if len(ends) else (None, None)
+
+        campaigns = _load(scratch, "campaigns")
+        budgets = None
+        if campaigns is not None:
+            campaigns = campaigns.dropna(subset=["budget"]).drop_duplicates("campaign_name", keep="last")
+            budgets = pd.Series(campaigns["budget"].to_numpy(), index=campaigns["campaign_name"].astype(str))
+        post_days = tuple(None if d is None else np.datetime64(d.floor("D"), "D") for d in span(["posts"]))
+        context = {"budgets": budgets, "post_days": post_days}
+
+        started = time.perf_counter()
+        results = _run(pool, _reduce, [(scratch, shard, context) for shard in range(shards)])
+        stats.reduce_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        as_of = span(list(DATE_COLUMNS))[1]
+        as_of = pd.Timestamp.now().floor("D") if as_of is None else as_of.floor("D")
+        frames, values = merge(results, _load(scratch, "accounts"), as_of)
+        stats.sections = len(frames)
+        stats.merge_seconds = time.perf_counter() - started
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    started = time.perf_counter()
+    store = MetricsStore(frames, values)
+    if out.lower().endswith(SQLITE_SUFFIXES):
+        write_sqlite(store, out)
+    else:
+        write_ndjson(store, out)
+    stats.write_seconds = time.perf_counter() - started
+    for issue in sorted(stats.issues):
+        logger.warning("schema drift in %s: %s", raw_dir, issue)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the dashboard sections from raw exports.")
+    parser.add_argument("raw_dir", help="directory of posts / accounts / ad_days / campaigns / mentions / sessions exports")
+    parser.add_argument("--out", required=True, help="SQLite file (.db) or NDJSON section directory to write")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--shards", type=int, help=f"shards per export (default: {SHARDS_PER_WORKER} per worker)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    started = time.perf_counter()
+    stats = build(args.raw_dir, args.out, args.workers, args.shards)
+    print(f"{stats}; {time.perf_counter() - started:.2f}s total -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
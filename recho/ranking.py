@@ -0,0 +1,206 @@
+"""
+Top-K rankings over table sections.
+
+``Rankings`` keeps, per section and metric, the row positions in descending
+metric order (NaN last, ties in row order), and the same order split by each
+account / campaign / subreddit value. A top-K query walks the lists of the
+selected values in growing blocks, keeps the rows inside the date window and
+stops once it has K of them, so it reads about K / selectivity rows instead
+of sorting the filtered section.
+
+Rows appended to a section are sorted on their own and merged into the
+existing orders with ``np.searchsorted`` / ``np.insert``; only a replaced
+section is sorted again. ``top_k`` is the partition-based path for values
+that have no index, such as ratios of aggregated groups.
+"""
+
+import threading
+
+import numpy as np
+
+from recho.filters import DATE_KEYS, DIMENSIONS
+
+SCAN_BLOCK = 1024
+
+# section -> metrics that also get a SQLite index (see recho.sources). The
+# in-memory rankings index any numeric column on its first query.
+RANKED = {
+    "organic.top_posts": ("upvotes", "engagement_rate", "comments", "clicks"),
+    "traffic.by_subreddit": ("sessions", "conversions", "revenue"),
+    "paid.subreddit_performance": ("roas", "spend", "revenue", "conversions"),
+}
+
+
+def _keys(values, ascending=False):
+    """Ascending sort keys for the requested rank order, with NaN last."""
+    keys = np.array(values, dtype=np.float64)
+    if not ascending:
+        keys = -keys
+    keys[np.isnan(keys)] = np.inf
+    return keys
+
+
+def top_k(values, k, ascending=False):
+    """Positions of the ``k`` largest (or smallest) ``values``, in rank order.
+
+    One ``np.partition`` finds the cut-off and only the values up to it are
+    sorted. NaN ranks last and ties keep position order.
+    """
+    keys = _keys(values, ascending)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(keys):
+        kth = np.partition(keys, k - 1)[k - 1]
+        candidates = np.flatnonzero(keys <= kth)
+    else:
+        candidates = np.arange(len(keys))
+    return candidates[np.argsort(keys[candidates], kind="stable")][:k]
+
+
+def _merge(keys, ranked, new):
+    """Merge rank-ordered positions ``new`` into ``ranked``; ``keys`` covers both."""
+    if not len(new):
+        return ranked
+    # side="right" puts a new row after existing rows with the same value,
+    # which keeps ties in row order since appended rows come last.
+    at = np.searchsorted(keys[ranked], keys[new], side="right")
+    return np.insert(ranked, at, new)
+
+
+def _split(ranked, labels):
+    """``ranked`` split by the label of each position, keeping rank order."""
+    codes, names = labels
+    codes = codes[ranked]
+    by_code = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[by_code], np.arange(len(names) + 1))
+    return {
+        name: ranked[by_code[bounds[i]:bounds[i + 1]]]
+        for i, name in enumerate(names)
+        if bounds[i + 1] > bounds[i]
+    }
+
+
+def _labels(df, dim):
+    return df[dim].cat.codes.to_numpy(), list(df[dim].cat.categories)
+
+
+class _Ranked:
+    """One metric's rank order over a section, overall and per dimension value."""
+
+    def __init__(self, generation, keys, dates, order, by_value):
+        self.generation = generation
+        self.keys = keys
+        self.dates = dates
+        self.order = order
+        self.by_value = by_value
+
+    @property
+    def n_rows(self):
+        return len(self.keys)
+
+    @classmethod
+    def build(cls, df, metric, generation):
+        keys = _keys(df[metric].to_numpy())
+        order = np.argsort(keys, kind="stable")
+        by_value = {dim: _split(order, _labels(df, dim)) for dim in DIMENSIONS if dim in df.columns}
+        return cls(generation, keys, _dates(df), order, by_value)
+
+    def extended(self, df, metric):
+        """A copy that also ranks the rows appended to ``df`` since this one."""
+        n = self.n_rows
+        keys = np.concatenate([self.keys, _keys(df[metric].to_numpy()[n:])])
+        new = n + np.argsort(keys[n:], kind="stable")
+        by_value = {}
+        for dim, lists in self.by_value.items():
+            lists = dict(lists)
+            for name, positions in _split(new, _labels(df, dim)).items():
+                lists[name] = _merge(keys, lists[name], positions) if name in lists else positions
+            by_value[dim] = lists
+        return _Ranked(self.generation, keys, _dates(df), _merge(keys, self.order, new), by_value)
+
+    def _scan(self, ranked, k, keep):
+        if keep is None:
+            return ranked[:k]
+        found = []
+        n_found = 0
+        pos = 0
+        block = max(SCAN_BLOCK, 4 * k)
+        while pos < len(ranked) and n_found < k:
+            chunk = ranked[pos:pos + block]
+            hits = chunk[keep(chunk)]
+            found.append(hits)
+            n_found += len(hits)
+            pos += block
+            block *= 2
+        return np.concatenate(found)[:k] if found else ranked[:0]
+
+    def top(self, k, start=None, end=None, **dims):
+        """Positions of the top ``k`` rows in the date bounds and dimension values."""
+        selected = {dim: values for dim, values in dims.items() if values and dim in self.by_value}
+        lists = [self.order]
+        if selected:
+            dim, values = next(iter(selected.items()))
+            lists = [self.by_value[dim][v] for v in values if v in self.by_value[dim]]
+            del selected[dim]
+        # Further dimensions are checked row by row while scanning.
+        members = [
+            np.concatenate([self.by_value[d][v] for v in values if v in self.by_value[d]] or [self.order[:0]])
+            for d, values in selected.items()
+        ]
+        dated = start is not None and self.dates is not None
+
+        def _keep_rows(chunk):
+            ok = np.ones(len(chunk), dtype=bool)
+            if dated:
+                dates = self.dates[chunk]
+                ok &= (dates >= start) & (dates <= end)
+            for rows in members:
+                ok &= np.isin(chunk, rows)
+            return ok
+
+        keep = _keep_rows if dated or members else None
+        found = [self._scan(ranked, k, keep) for ranked in lists]
+        if len(found) == 1:
+            return found[0]
+        candidates = np.concatenate(found) if found else self.order[:0]
+        # Rank the per-value winners together: by key, then row position.
+        return candidates[np.lexsort((candidates, self.keys[candidates]))][:k]
+
+
+def _dates(df):
+    date_col = next((c for c in DATE_KEYS if c in df.columns), None)
+    if date_col is None:
+        return None
+    return df[date_col].to_numpy(dtype="datetime64[ns]").view("i8")
+
+
+class Rankings:
+    """Lazily built, incrementally maintained rank orders of one store."""
+
+    def __init__(self, store):
+        self._store = store
+        self._ranked = {}
+        self._lock = threading.Lock()
+
+    def _get(self, section, metric):
+        # Generation first: if the section is replaced in between, the stale
+        # generation makes the next query rebuild instead of extending.
+        generation = self._store.generation(section)
+        df = self._store.frame(section)
+        with self._lock:
+            ranked = self._ranked.get((section, metric))
+            if ranked is None or ranked.generation != generation or ranked.n_rows > len(df):
+                ranked = _Ranked.build(df, metric, generation)
+            elif ranked.n_rows < len(df):
+                ranked = ranked.extended(df, metric)
+            self._ranked[(section, metric)] = ranked
+        return ranked
+
+    def top(self, section, metric, k, start=None, end=None, **dims):
+        """Row positions of the ``k`` rows of ``section`` with the largest ``metric``."""
+        return self._get(section, metric).top(k, start, end, **dims)
+
+
+def rankings(store):
+    # Kept across store updates: appended rows are merged in on the next query.
+    return store.persistent("rankings", Rankings)
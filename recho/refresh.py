@@ -0,0 +1,75 @@
+"""
+Background refresh of a loaded source.
+
+A ``Watcher`` polls its ``Ingestor`` on a daemon thread. Changes to the
+source file or new batches in the incoming directory are merged into the
+shared store in place (appends bump ``store.data_version``; a rewritten
+source is parsed into a new store), so the next rerun of every session
+sees them without waiting on, or repeating, the parse. A failed refresh
+keeps serving the last good store and is reported through ``last_error``.
+
+``RECHO_REFRESH_SECONDS`` sets the poll interval (default 2) and
+``RECHO_INCOMING`` the batch directory (default ``incoming/`` beside the
+source).
+"""
+
+import os
+import threading
+import time
+
+DEFAULT_INTERVAL = float(os.environ.get("RECHO_REFRESH_SECONDS", "2"))
+
+
+def incoming_dir(source):
+    """Batch directory for ``source``."""
+    if os.environ.get("RECHO_INCOMING"):
+        return os.environ["RECHO_INCOMING"]
+    source = os.path.abspath(source)
+    base = source if os.path.isdir(source) else os.path.dirname(source)
+    return os.path.join(base, "incoming")
+
+
+class Watcher:
+    """Keeps one ``Ingestor`` in sync with its source on a daemon thread."""
+
+    def __init__(self, ingestor, interval=DEFAULT_INTERVAL):
+        self.ingestor = ingestor
+        self.interval = interval
+        self.checks = 0
+        self.refreshes = 0
+        self.last_change = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def store(self):
+        return self.ingestor.store
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="recho-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self):
+        """Refresh once now; returns the ``IngestStats`` or None if unchanged."""
+        self.checks += 1
+        try:
+            stats = self.ingestor.refresh()
+        except (OSError, ValueError) as exc:
+            # A source caught mid-write fails to parse; retry on the next poll.
+            self.last_error = exc
+            return None
+        self.last_error = None
+        if stats is not None:
+            self.refreshes += 1
+            self.last_change = time.time()
+        return stats
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
@@ -0,0 +1,354 @@
+"""
+Pre-aggregated rollup cubes for KPI totals.
+
+Each cube sums a section's measures into cells over (day × dimension
+values) the first time it is queried after a data load, then prefix-sums the day axis. A total for any
+date window and dimension subset is two cell lookups and a small reduction
+over the selected dimension values, independent of the row count. Only the
+dimension value combinations that occur in the data get a column, so
+high-cardinality dimensions (hundreds of campaigns × subreddits) stay small. KPIs such
+as ROAS, CPA, CVR and engagement rate are derived from those totals.
+
+The dated cubes also serve time series at three resolutions: ``day``,
+``week`` (Monday to Sunday, like ``organic.weekly_metrics``) and ``month``.
+The bucket every day of the history falls into is worked out when the cube
+is built, so the sums of a window's buckets are prefix-sum differences at the
+bucket edges: O(buckets) per query, whatever the window's length.
+``resolution(n_days)`` picks the coarsest bucket that still leaves a window
+``MIN_POINTS`` points, so "All Time" charts draw about as many points as
+"Last 30 Days".
+
+``DailySums`` keeps per-day row counts and measure sums of a section split
+by the values of one or more columns (e.g. mentions per brand and
+subreddit). Unlike the cubes it survives store updates: rows appended to the
+section are added into the existing cells, and only a replaced section is
+summed again, so time-series analytics over raw event rows stay
+O(days x values) per query as the events arrive.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from recho.derive import ratios
+from recho.filters import filter_index, previous_window
+
+DAY_NS = 86_400 * 10**9
+
+# name -> (section, date column, dimensions, measures)
+CUBES = {
+    "paid": (
+        "paid.daily_metrics", "date",
+        ("campaign_name", "subreddit"),
+        ("impressions", "clicks", "spend", "conversions", "revenue"),
+    ),
+    "organic": (
+        "organic.daily_metrics", "date",
+        (),
+        ("posts", "impressions", "upvotes", "comments", "clicks", "karma"),
+    ),
+    "brand": (
+        "brand.mention_trend", "date",
+        (),
+        ("mention_count", "total_upvotes", "total_comments"),
+    ),
+    "traffic": (
+        "traffic.organic_vs_paid", None,
+        ("medium",),
+        ("sessions", "new_users", "conversions", "revenue"),
+    ),
+    "accounts": (
+        "accounts.comparison", None,
+        ("account_name",),
+        ("total_karma", "total_posts", "total_clicks"),
+    ),
+}
+
+
+# Time-series bucket -> its (approximate) length in days, coarsest first.
+RESOLUTIONS = {"month": 30, "week": 7, "day": 1}
+MIN_POINTS = 20
+
+
+def resolution(n_days, min_points=MIN_POINTS):
+    """The coarsest of ``RESOLUTIONS`` that splits ``n_days`` days into at least ``min_points`` buckets."""
+    for name, days in RESOLUTIONS.items():
+        if n_days // days >= min_points:
+            return name
+    return "day"
+
+
+def bucket_starts(days, resolution):
+    """The first day of the ``resolution`` bucket of each of ``days`` (int64 ns at midnight)."""
+    if resolution == "week":
+        # 1970-01-01 was a Thursday, three days after a Monday.
+        return days - (days // DAY_NS + 3) % 7 * DAY_NS
+    if resolution == "month":
+        return days.view("datetime64[ns]").astype("datetime64[M]").astype("datetime64[ns]").view("i8")
+    return days
+
+
+def derive_kpis(totals):
+    """KPIs whose inputs are present in ``totals``, added alongside them."""
+    # KPI cards show 0 rather than NaN for an empty window.
+    return {**totals, **ratios(totals, fill=0.0)}
+
+
+class Cube:
+    """Prefix-summed (day × observed dimension combination) cells for one section."""
+
+    def __init__(self, df, date_col, dims, measures):
+        self.dims = dims
+        self.labels = {dim: list(df[dim].cat.categories) for dim in dims}
+        self._positions = {dim: {v: i for i, v in enumerate(labels)} for dim, labels in self.labels.items()}
+        dim_shape = tuple(len(self.labels[dim]) for dim in dims)
+
+        if date_col is not None:
+            days = df[date_col].dt.floor("D").to_numpy(dtype="datetime64[ns]").view("i8")
+            self.days, day_idx = np.unique(days, return_inverse=True)
+            n_days = len(self.days)
+            self._buckets = {name: bucket_starts(self.days, name) for name in RESOLUTIONS}
+        else:
+            self.days = None
+            self._buckets = None
+            day_idx = np.zeros(len(df), dtype=np.intp)
+            n_days = 1
+
+        codes = [df[dim].cat.codes.to_numpy() for dim in dims]
+        keep = np.ones(len(df), dtype=bool)
+        for c in codes:
+            keep &= c >= 0
+        if dims:
+            combos = np.ravel_multi_index([c[keep] for c in codes], dim_shape)
+            combos, combo_idx = np.unique(combos, return_inverse=True)
+            # Per dimension, the value code of every combination column.
+            self._combo_codes = np.unravel_index(combos, dim_shape)
+        else:
+            combo_idx = np.zeros(int(keep.sum()), dtype=np.intp)
+            self._combo_codes = ()
+        shape = (n_days, len(self._combo_codes[0]) if dims else 1)
+        flat = np.ravel_multi_index([day_idx[keep], combo_idx], shape)
+
+        self._cum = {}
+        # Prefix sums over all combinations, for series with no selection.
+        self._cum_all = {}
+        for measure in measures:
+            values = df[measure].to_numpy()[keep]
+            cells = np.bincount(flat, weights=values, minlength=int(np.prod(shape))).reshape(shape)
+            if np.issubdtype(values.dtype, np.integer):
+                cells = cells.astype(np.int64)
+            cum = np.zeros((n_days + 1, shape[1]), dtype=cells.dtype)
+            np.cumsum(cells, axis=0, out=cum[1:])
+            self._cum[measure] = cum
+            self._cum_all[measure] = cum.sum(axis=1)
+
+    def _day_bounds(self, start, end):
+        if self.days is None:
+            return 0, 1
+        lo = 0 if start is None else int(np.searchsorted(self.days, start, side="left"))
+        hi = len(self.days) if end is None else int(np.searchsorted(self.days, end, side="right"))
+        return lo, hi
+
+    def _mask(self, selections):
+        """Combination columns the selections keep, or None for all of them."""
+        mask = None
+        for dim, combo_codes in zip(self.dims, self._combo_codes):
+            values = selections.get(dim)
+            if values:
+                positions = [self._positions[dim][v] for v in values if v in self._positions[dim]]
+                found = np.isin(combo_codes, positions)
+                mask = found if mask is None else mask & found
+        return mask
+
+    def _select(self, row, selections):
+        mask = self._mask(selections)
+        return row if mask is None else row[mask]
+
+    def n_days(self, start=None, end=None):
+        """Calendar days of the window that fall inside the data's span."""
+        if self.days is None or not len(self.days):
+            return 0
+        first = self.days[0] if start is None else max(start, self.days[0])
+        last = self.days[-1] if end is None else min(end, self.days[-1])
+        if last < first:
+            return 0
+        return int((last - first) // DAY_NS) + 1
+
+    def total(self, start=None, end=None, **selections):
+        lo, hi = self._day_bounds(start, end)
+        return {
+            measure: self._select(cum[hi] - cum[lo], selections).sum().item()
+            for measure, cum in self._cum.items()
+        }
+
+    def series(self, resolution, start=None, end=None, **selections):
+        """Measure sums per ``resolution`` bucket of the window, labelled ``date`` by the bucket's first day."""
+        lo, hi = self._day_bounds(start, end)
+        labels = self._buckets[resolution][lo:hi]
+        # Bucket starts are whole days, so -1 never matches the first one.
+        first = np.flatnonzero(np.diff(labels, prepend=-1))
+        edges = np.append(first + lo, hi)
+        out = {"date": labels[first].view("datetime64[ns]")}
+        mask = self._mask(selections)
+        for measure, cum in self._cum.items():
+            at_edges = self._cum_all[measure][edges] if mask is None else cum[edges][:, mask].sum(axis=1)
+            out[measure] = np.diff(at_edges)
+        return pd.DataFrame(out)
+
+
+class Rollups:
+    """All KPI cubes of one store, queried with the global ``Filters``."""
+
+    def __init__(self, store):
+        self._store = store
+        self._index = filter_index(store)
+        self._cubes = {}
+        self._lock = threading.Lock()
+
+    def cube(self, name):
+        """Cube ``name``, built from its section on first use."""
+        cube = self._cubes.get(name)
+        if cube is None:
+            with self._lock:
+                cube = self._cubes.get(name)
+                if cube is None:
+                    section, date_col, dims, measures = CUBES[name]
+                    cube = self._cubes[name] = Cube(self._store.frame(section), date_col, dims, measures)
+        return cube
+
+    def totals(self, name, filters, previous=False):
+        """Measures and derived KPIs of cube ``name`` under ``filters``, or over the window before theirs.
+
+        The previous window's totals are None unless the data covers all of it.
+        """
+        start, end = self._index.window(filters.days)
+        cube = self.cube(name)
+        if previous:
+            start, end = previous_window(start, end)
+            if start is None or cube.n_days(start, end) < (end - start + 1) // DAY_NS:
+                return None
+        return derive_kpis(cube.total(start, end, account_name=filters.accounts))
+
+    def n_days(self, name, filters):
+        start, end = self._index.window(filters.days)
+        return self.cube(name).n_days(start, end)
+
+    def series(self, name, filters, resolution):
+        """Measures of dated cube ``name`` per ``resolution`` bucket under ``filters``."""
+        start, end = self._index.window(filters.days)
+        return self.cube(name).series(resolution, start, end, account_name=filters.accounts)
+
+
+def rollups(store):
+    return store.derived("rollups", Rollups)
+
+
+# ============================================================================
+# INCREMENTAL DAILY SUMS
+# ============================================================================
+class _Daily:
+    """Row counts and measure sums per (day, key) of one section, keys being ``by`` value tuples."""
+
+    def __init__(self, generation, n_rows=0, first_day=None, keys=(), cells=None):
+        self.generation = generation
+        self.n_rows = n_rows
+        self.first_day = first_day
+        self.keys = list(keys)
+        self._positions = {key: i for i, key in enumerate(self.keys)}
+        # "rows" and each measure -> (days x keys) array
+        self.cells = cells or {}
+
+    def extended(self, df, date_col, by, measures):
+        """A copy that also counts the rows appended to ``df`` since this one."""
+        new = df.iloc[self.n_rows:]
+        days = new[date_col].to_numpy(dtype="datetime64[ns]").view("i8")
+        keep = days != np.iinfo(np.int64).min
+        if by:
+            # Per-column codes combined into one integer per row, then factorized.
+            col_codes, col_labels = zip(*(pd.factorize(new[col]) for col in by))
+            for c in col_codes:
+                keep &= c >= 0
+            sizes = tuple(len(labels) for labels in col_labels)
+            combos, codes = np.unique(np.ravel_multi_index([c[keep] for c in col_codes], sizes), return_inverse=True)
+            uniques = list(zip(*(
+                np.asarray(labels, dtype=object)[idx] for labels, idx in zip(col_labels, np.unravel_index(combos, sizes))
+            )))
+        else:
+            codes, uniques = np.zeros(int(keep.sum()), dtype=np.intp), [()]
+        days = days[keep] // DAY_NS
+
+        keys = list(self.keys)
+        positions = dict(self._positions)
+        for key in uniques:
+            if key not in positions:
+                positions[key] = len(keys)
+                keys.append(key)
+        key_idx = np.array([positions[key] for key in uniques], dtype=np.intp)[codes]
+
+        old_rows = len(self.cells["rows"]) if self.cells else 0
+        first = self.first_day
+        if len(days):
+            first = int(days.min()) if first is None else min(first, int(days.min()))
+        shift = 0 if self.first_day is None else self.first_day - first
+        n_days = max(old_rows + shift, int(days.max()) - first + 1 if len(days) else 0)
+        shape = (n_days, len(keys))
+        flat = np.ravel_multi_index([(days - first).astype(np.intp), key_idx], shape)
+
+        cells = {}
+        for name in ("rows", *measures):
+            if name == "rows":
+                values, dtype = None, np.int64
+            else:
+                values = new[name].to_numpy()[keep]
+                dtype = np.int64 if np.issubdtype(values.dtype, np.integer) else np.float64
+                values = np.nan_to_num(values.astype(np.float64))
+            grid = np.zeros(shape, dtype=dtype)
+            if name in self.cells:
+                old = self.cells[name]
+                grid[shift:shift + old.shape[0], :old.shape[1]] = old
+            grid += np.bincount(flat, weights=values, minlength=grid.size).reshape(shape).astype(dtype)
+            cells[name] = grid
+        return _Daily(self.generation, len(df), first, keys, cells)
+
+    def frame(self, by, measures):
+        """One row per (day, key) with rows: ``day``, the ``by`` columns, ``rows`` and the measures."""
+        if self.first_day is None:
+            return pd.DataFrame(columns=["day", *by, "rows", *measures])
+        day_idx, key_idx = np.nonzero(self.cells["rows"])
+        out = {"day": ((self.first_day + day_idx) * DAY_NS).view("datetime64[ns]")}
+        for i, col in enumerate(by):
+            out[col] = np.array([key[i] for key in self.keys], dtype=object)[key_idx]
+        for name in ("rows", *measures):
+            out[name] = self.cells[name][day_idx, key_idx]
+        return pd.DataFrame(out).sort_values(["day", *by], ignore_index=True)
+
+
+class DailySums:
+    """Per-day sums of store sections, kept up to date as rows are appended."""
+
+    def __init__(self, store):
+        self._store = store
+        self._daily = {}
+        self._lock = threading.Lock()
+
+    def get(self, section, date_col, by=(), measures=()):
+        """Long frame of ``_Daily.frame`` for ``section`` split by the ``by`` columns."""
+        by, measures = tuple(by), tuple(measures)
+        # Generation first, as in recho.ranking.Rankings.
+        generation = self._store.generation(section)
+        df = self._store.frame(section)
+        key = (section, by, measures)
+        with self._lock:
+            daily = self._daily.get(key)
+            if daily is None or daily.generation != generation or daily.n_rows > len(df):
+                daily = _Daily(generation)
+            if daily.n_rows < len(df) or not daily.cells:
+                daily = daily.extended(df, date_col, by, measures)
+            self._daily[key] = daily
+        return daily.frame(by, measures)
+
+
+def daily_sums(store):
+    # Kept across store updates: appended rows are added on the next query.
+    return store.persistent("daily_sums", DailySums)
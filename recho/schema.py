@@ -0,0 +1,436 @@
+"""
+Column types of the metrics export.
+
+Every section is declared here column by column, and ``build_frame``
+converts each chunk of parsed rows to exactly these types:
+
+* ``DATE``: datetime64[ns], i.e. int64 nanoseconds since the epoch;
+* ``NAME``: dictionary-encoded categorical (small integer codes, each
+  distinct account / campaign / subreddit string stored once);
+* ``COUNT``: int32 (impressions, clicks, sessions, ...); widened to int64
+  only for a chunk holding a value outside the int32 range;
+* ``MONEY``: float64 (spend, revenue and running totals of them);
+* ``RATE``: float32 for ratios the export precomputes (ctr, roas, ...),
+  which are only displayed, never summed;
+* ``TEXT`` and ``LIST``: Python objects (post ids and titles, subreddit
+  lists).
+
+Type drift is caught at load time. A value of the wrong type that converts
+without loss, such as a count sent as the string ``"2247"``, is converted
+and reported as an issue; a value that does not convert raises
+``SchemaError``, which keeps the last good store. Columns and sections that
+are not declared here keep the generic typing and are reported too. Scalar
+fields are declared in ``VALUES`` and checked the same way.
+
+Run ``python -m recho.schema PATH`` for the memory of each section as
+parsed JSON rows, as generically typed frames and as typed frames.
+"""
+
+import argparse
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+DATE, NAME, COUNT, MONEY, RATE, TEXT, LIST = "date", "name", "count", "money", "rate", "text", "list"
+
+_INT32 = np.iinfo(np.int32)
+
+# ============================================================================
+# SECTIONS
+# ============================================================================
+_ORGANIC_SERIES = {
+    "date": DATE,
+    "posts": COUNT,
+    "impressions": COUNT,
+    "upvotes": COUNT,
+    "comments": COUNT,
+    "clicks": COUNT,
+    "karma": COUNT,
+    "engagement_rate": RATE,
+    "ctr": RATE,
+}
+
+_TRAFFIC = {
+    "sessions": COUNT,
+    "new_users": COUNT,
+    "conversions": COUNT,
+    "revenue": MONEY,
+    "conversion_rate": RATE,
+}
+
+_MENTIONS = {
+    "mention_count": COUNT,
+    "total_upvotes": COUNT,
+    "total_comments": COUNT,
+}
+
+SECTIONS = {
+    "organic.top_posts": {
+        "post_id": TEXT,
+        "account_name": NAME,
+        "subreddit": NAME,
+        "post_date": DATE,
+        "title": TEXT,
+        "upvotes": COUNT,
+        "comments": COUNT,
+        "clicks": COUNT,
+        "engagement_rate": RATE,
+    },
+    "organic.subreddit_performance": {
+        "subreddit": NAME,
+        "post_count": COUNT,
+        "total_impressions": COUNT,
+        "total_upvotes": COUNT,
+        "total_downvotes": COUNT,
+        "total_comments": COUNT,
+        "total_clicks": COUNT,
+        "total_karma": COUNT,
+        "avg_upvote_rate": RATE,
+        "avg_engagement_rate": RATE,
+        "ctr": RATE,
+    },
+    "organic.daily_metrics": _ORGANIC_SERIES,
+    "organic.weekly_metrics": _ORGANIC_SERIES,
+    "organic.karma_velocity": {
+        "date": DATE,
+        "account_name": NAME,
+        "karma_velocity": RATE,
+        "period_days": COUNT,
+    },
+    "traffic.by_source": {
+        "source": NAME,
+        "medium": NAME,
+        "pageviews": COUNT,
+        **_TRAFFIC,
+        "bounce_rate": RATE,
+        "avg_session_duration": RATE,
+        "new_user_rate": RATE,
+        "revenue_per_session": RATE,
+    },
+    "traffic.touchpoints": {
+        "user_id": NAME,
+        "date": DATE,
+        "channel": NAME,
+        "subreddit": NAME,
+        "campaign": NAME,
+        "conversions": COUNT,
+        "revenue": MONEY,
+    },
+    "traffic.by_subreddit": {"subreddit": NAME, **_TRAFFIC, "revenue_per_session": RATE},
+    "traffic.by_campaign": {"campaign": NAME, **_TRAFFIC},
+    "traffic.organic_vs_paid": {
+        "medium": NAME,
+        **_TRAFFIC,
+        "new_user_rate": RATE,
+        "revenue_per_session": RATE,
+    },
+    "paid.campaign_summary": {
+        "campaign_id": NAME,
+        "campaign_name": NAME,
+        "impressions": COUNT,
+        "clicks": COUNT,
+        "spend": MONEY,
+        "conversions": COUNT,
+        "revenue": MONEY,
+        "roas": RATE,
+        "cpa": RATE,
+        "ctr": RATE,
+        "cpc": RATE,
+        "cvr": RATE,
+    },
+    "paid.subreddit_performance": {
+        "subreddit": NAME,
+        "impressions": COUNT,
+        "clicks": COUNT,
+        "spend": MONEY,
+        "conversions": COUNT,
+        "revenue": MONEY,
+        "roas": RATE,
+        "cpa": RATE,
+        "ctr": RATE,
+        "cvr": RATE,
+        "performance_tier": NAME,
+    },
+    "paid.daily_metrics": {
+        "date": DATE,
+        "campaign_id": NAME,
+        "campaign_name": NAME,
+        "subreddit": NAME,
+        "impressions": COUNT,
+        "clicks": COUNT,
+        "spend": MONEY,
+        "conversions": COUNT,
+        "revenue": MONEY,
+        "ctr": RATE,
+        "cpc": RATE,
+        "cvr": RATE,
+        "cpa": RATE,
+        "roas": RATE,
+        "ecpm": RATE,
+        "aov": RATE,
+    },
+    "paid.spend_pacing": {
+        "date": DATE,
+        "campaign_name": NAME,
+        "cumulative_spend": MONEY,
+        "expected_spend": MONEY,
+        "pacing": RATE,
+        "budget_remaining": MONEY,
+    },
+    "paid.roas_trend": {
+        "date": DATE,
+        "rolling_roas": RATE,
+        "rolling_revenue": MONEY,
+        "rolling_spend": MONEY,
+    },
+    "brand.sentiment_distribution": {"sentiment": NAME, **_MENTIONS, "percentage": RATE},
+    "brand.mention_trend": {"date": DATE, **_MENTIONS, "avg_sentiment": RATE},
+    "brand.mentions": {
+        "date": DATE,
+        "brand": NAME,
+        "subreddit": NAME,
+        "sentiment": NAME,
+        "sentiment_score": RATE,
+        "upvotes": COUNT,
+        "comments": COUNT,
+    },
+    "brand.by_subreddit": {
+        "subreddit": NAME,
+        **_MENTIONS,
+        "avg_sentiment": RATE,
+        "positive_rate": RATE,
+    },
+    "accounts.comparison": {
+        "account_name": NAME,
+        "account_type": NAME,
+        "account_age_days": COUNT,
+        "total_karma": COUNT,
+        "post_karma": COUNT,
+        "comment_karma": COUNT,
+        "karma_per_day": RATE,
+        "total_posts": COUNT,
+        "total_comments": COUNT,
+        "posts_per_week": RATE,
+        "avg_upvote_ratio": RATE,
+        "total_upvotes": COUNT,
+        "total_post_comments": COUNT,
+        "avg_engagement_rate": RATE,
+        "total_clicks": COUNT,
+        "avg_ctr": RATE,
+        "followers": COUNT,
+        "primary_subreddits": LIST,
+        "unique_subreddits": COUNT,
+    },
+    "cross_channel.contribution": {
+        "channel": NAME,
+        "sessions": COUNT,
+        "conversions": COUNT,
+        "revenue": MONEY,
+        "conversion_rate": RATE,
+        "revenue_per_session": RATE,
+        "avg_order_value": RATE,
+        "session_share": RATE,
+        "revenue_share": RATE,
+    },
+}
+
+VALUES = {
+    "traffic.assisted_conversions.total_conversions": COUNT,
+    "traffic.assisted_conversions.last_click_conversions": COUNT,
+    "traffic.assisted_conversions.assisted_conversions": COUNT,
+    "traffic.assisted_conversions.assist_rate": RATE,
+    "brand.sentiment_ratio": RATE,
+    "cross_channel.efficiency.organic.total_posts": COUNT,
+    "cross_channel.efficiency.organic.estimated_conversions": RATE,
+    "cross_channel.efficiency.organic.estimated_cpa": MONEY,
+    "cross_channel.efficiency.organic.cost_per_post": MONEY,
+    "cross_channel.efficiency.paid.total_spend": MONEY,
+    "cross_channel.efficiency.paid.conversions": COUNT,
+    "cross_channel.efficiency.paid.cpa": MONEY,
+    "cross_channel.efficiency.comparison.cpa_ratio": RATE,
+    "cross_channel.efficiency.comparison.efficiency_winner": TEXT,
+}
+
+
+class SchemaError(ValueError):
+    """A value that cannot be converted to its declared type."""
+
+
+def _report(issues, issue):
+    if issues is not None:
+        issues.add(issue)
+
+
+def _numbers(section, col, series, issues):
+    """``series`` as a numeric series; numbers sent as strings are converted."""
+    if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+        converted = pd.to_numeric(series, errors="coerce")
+        bad = converted.isna() & series.notna()
+        if bad.any():
+            sample = ", ".join(repr(v) for v in series[bad].unique()[:3])
+            raise SchemaError(f"{section}.{col}: not a number: {sample}")
+        _report(issues, f"{section}.{col}: {series.dtype} values converted to numbers")
+        series = converted
+    return series
+
+
+def _count(section, col, series, issues):
+    series = _numbers(section, col, series, issues)
+    if series.isna().any():
+        _report(issues, f"{section}.{col}: missing counts, kept as float64")
+        return series.astype("float64")
+    if pd.api.types.is_float_dtype(series):
+        if not (series == np.floor(series)).all():
+            _report(issues, f"{section}.{col}: fractional counts, kept as float64")
+            return series
+        _report(issues, f"{section}.{col}: counts sent as floats")
+    if len(series) and (series.min() < _INT32.min or series.max() > _INT32.max):
+        _report(issues, f"{section}.{col}: counts beyond int32, widened to int64")
+        return series.astype("int64")
+    return series.astype("int32")
+
+
+def _date(section, col, series, issues):
+    if pd.api.types.is_datetime64_dtype(series):
+        return series
+    converted = pd.to_datetime(series, errors="coerce")
+    bad = converted.isna() & series.notna()
+    if bad.any():
+        sample = ", ".join(repr(v) for v in series[bad].unique()[:3])
+        raise SchemaError(f"{section}.{col}: not a date: {sample}")
+    return converted
+
+
+def convert(section, col, series, kind, issues=None):
+    """``series`` converted to the column type ``kind``."""
+    if kind == DATE:
+        return _date(section, col, series, issues)
+    if kind == NAME:
+        return series.astype("category")
+    if kind == COUNT:
+        return _count(section, col, series, issues)
+    if kind == MONEY:
+        return _numbers(section, col, series, issues).astype("float64")
+    if kind == RATE:
+        return _numbers(section, col, series, issues).astype("float32")
+    return series
+
+
+def apply(section, df, issues=None):
+    """``df`` with the declared types of ``section``; drift is added to ``issues``.
+
+    Returns the declared columns, or None if the section is not declared.
+    """
+    columns = SECTIONS.get(section)
+    if columns is None:
+        _report(issues, f"{section}: section not in schema")
+        return None
+    if not len(df.columns):
+        return columns
+    for col in df.columns:
+        if col in columns:
+            df[col] = convert(section, col, df[col], columns[col], issues)
+        else:
+            _report(issues, f"{section}.{col}: column not in schema")
+    for col in columns:
+        if col not in df.columns:
+            _report(issues, f"{section}.{col}: column missing")
+    return columns
+
+
+def check_values(values, issues=None):
+    """Scalar ``values`` with the declared types; drift is added to ``issues``."""
+    checked = {}
+    for path, value in values.items():
+        kind = VALUES.get(path)
+        if kind is None:
+            _report(issues, f"{path}: value not in schema")
+        elif kind in (COUNT, MONEY, RATE) and value is not None:
+            number = value
+            if isinstance(value, str) or isinstance(value, bool):
+                try:
+                    number = float(value)
+                except ValueError:
+                    raise SchemaError(f"{path}: not a number: {value!r}") from None
+                _report(issues, f"{path}: {type(value).__name__} value converted to a number")
+            if kind == COUNT and float(number).is_integer():
+                number = int(number)
+            value = number
+        checked[path] = value
+    return checked
+
+
+# ============================================================================
+# MEMORY REPORT
+# ============================================================================
+def _object_bytes(obj, seen):
+    """Deep ``sys.getsizeof`` of parsed JSON, counting shared objects once."""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_object_bytes(k, seen) + _object_bytes(v, seen) for k, v in obj.items())
+    elif isinstance(obj, list):
+        size += sum(_object_bytes(v, seen) for v in obj)
+    return size
+
+
+def _walk(node, path=""):
+    for key, value in node.items():
+        name = f"{path}.{key}" if path else key
+        if isinstance(value, dict):
+            yield from _walk(value, name)
+        else:
+            yield name, value
+
+
+def memory_report(path, issues=None):
+    """Per-section ``(name, rows, json_bytes, generic_bytes, typed_bytes)``.
+
+    Schema drift found while typing the sections is added to ``issues``.
+    """
+    from recho.store import build_frame
+
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    report = []
+    values = {}
+    for name, rows in _walk(raw):
+        if not isinstance(rows, list):
+            values[name] = rows
+            continue
+        generic = build_frame(rows)
+        typed = build_frame(rows, name, issues)
+        report.append((
+            name,
+            len(rows),
+            _object_bytes(rows, set()),
+            int(generic.memory_usage(deep=True).sum()),
+            int(typed.memory_usage(deep=True).sum()),
+        ))
+    check_values(values, issues)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check and size a metrics export against the schema.")
+    parser.add_argument("path", nargs="?", default="dashboard_metrics.json")
+    args = parser.parse_args(argv)
+
+    issues = set()
+    report = memory_report(args.path, issues)
+    print(f"{'section':<32} {'rows':>9} {'json KiB':>10} {'generic KiB':>12} {'typed KiB':>10} {'vs json':>8}")
+    totals = ["total", sum(r[1] for r in report)] + [sum(r[i] for r in report) for i in (2, 3, 4)]
+    for name, rows, raw_bytes, generic, typed in report + [tuple(totals)]:
+        print(f"{name:<32} {rows:>9,} {raw_bytes / 1024:>10,.0f} {generic / 1024:>12,.0f} "
+              f"{typed / 1024:>10,.0f} {raw_bytes / max(typed, 1):>7.1f}x")
+    print(f"\n{len(issues)} schema issues" + (":" if issues else ""))
+    for issue in sorted(issues):
+        print(f"  {issue}")
+
+
+if __name__ == "__main__":
+    main()
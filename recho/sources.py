@@ -0,0 +1,594 @@
+"""
+Data sources behind ``load_data``.
+
+A source hands out a query object for its current data. Pages, the sidebar
+and exports only talk to that object, so they run unchanged on either
+backend:
+
+* ``JsonSource``    today's behaviour: ``dashboard_metrics.json`` (or an NDJSON
+  directory) parsed into an in-memory ``MetricsStore`` that a ``Watcher``
+  keeps in sync; queries run on the filter index and rollup cubes;
+* ``SqliteSource``  an embedded SQLite file holding one table per section,
+  indexed on date, account, subreddit and campaign. Filters, sums, group-bys,
+  sorting and limits are pushed down as SQL, so only the rows or groups a
+  page shows are read into pandas, and the data can outgrow the worker's RAM.
+
+``open_source`` picks the backend from the path (``.db``, ``.sqlite`` and
+``.sqlite3`` are SQLite). Run ``python -m recho.sources PATH --sqlite OUT.db``
+to build a SQLite file from a JSON or NDJSON source.
+
+Query objects provide:
+
+* ``data_version``, ``sections``, ``values``, ``value(path)``, ``load(sections)``;
+* ``view(section, filters, limit=None)``: the rows the filters select, in
+  the section's order;
+* ``aggregate(section, filters, by, measures, sort, ascending, limit)``:
+  measures summed per ``by`` value with their ratios, optionally sorted by a
+  measure or ratio and cut to the top ``limit`` groups;
+* ``top(section, filters, metric, k)``: the ``k`` selected rows with the
+  largest ``metric``, from the ranking index (``recho.ranking``) or an
+  ``ORDER BY ... LIMIT`` on an index of the metric;
+* ``totals(name, filters, previous=False)`` / ``n_days(name, filters)``: KPI
+  totals of the rollup cube ``name`` (see ``recho.rollups.CUBES``); with
+  ``previous``, over the window of the same length before the filters' (None
+  unless the data covers it all);
+* ``series(name, filters, resolution)``: the cube's measures summed per
+  day, week or month of the window, from the cube's prefix sums or a
+  ``GROUP BY`` on the day;
+* ``daily(section, by, measures)``: row counts and measure sums per day and
+  ``by`` value tuple over the whole section, from ``recho.rollups.DailySums``
+  or a ``GROUP BY`` on the day; ``window(filters)`` gives the date bounds
+  the filters select, for slicing such series;
+* ``distinct(section, column)``, ``count(section, filters)`` and
+  ``chunks(section, filters, size, order)`` for controls, exports and
+  streaming analytics; ``order`` names columns whose equal values come
+  together, in ascending order of the last one within them.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.request import pathname2url
+
+import numpy as np
+import pandas as pd
+
+from recho.derive import PAID_MEASURES, RATIOS, aggregate, with_ratios
+from recho.filters import DATE_KEYS, anchor, filter_index, previous_window, window
+from recho.ingest import Ingestor
+from recho.ranking import RANKED, rankings, top_k
+from recho.refresh import Watcher, incoming_dir
+from recho.rollups import CUBES, DAY_NS, bucket_starts, daily_sums, derive_kpis, rollups
+from recho.store import value_at
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+CHUNK_ROWS = 50_000
+
+# Columns that get an index in the SQLite backend. Dimension indexes lead
+# with the dimension and end with the section's date, so a dimension filter
+# inside a date window is one range scan per value, and touchpoints stream
+# in (user_id, date) order without a sort.
+INDEXED_DIMENSIONS = ("account_name", "subreddit", "campaign_name", "campaign", "campaign_id", "user_id")
+
+
+# ============================================================================
+# IN-MEMORY QUERIES
+# ============================================================================
+def _n_selected(positions):
+    if isinstance(positions, slice):
+        return positions.stop - positions.start
+    return len(positions)
+
+
+def _blocks(positions, size):
+    if isinstance(positions, slice):
+        for start in range(positions.start, positions.stop, size):
+            yield slice(start, min(start + size, positions.stop))
+    else:
+        for start in range(0, len(positions), size):
+            yield positions[start:start + size]
+
+
+class FrameQueries:
+    """Queries over a ``MetricsStore`` through its filter index and cubes."""
+
+    def __init__(self, store):
+        self._store = store
+        self._index = filter_index(store)
+        self._cubes = rollups(store)
+
+    @property
+    def data_version(self):
+        return self._store.data_version
+
+    @property
+    def sections(self):
+        return self._store.sections
+
+    @property
+    def values(self):
+        return self._store.values
+
+    def value(self, path):
+        return self._store.value(path)
+
+    def load(self, sections):
+        self._store.load(sections)
+
+    def _rows(self, section, filters):
+        start, end = self._index.window(filters.days)
+        return self._index.rows(section, start, end, account_name=filters.accounts)
+
+    def view(self, section, filters, limit=None):
+        df = self._index.view(section, filters)
+        return df if limit is None else df.iloc[:limit]
+
+    def aggregate(self, section, filters, by, measures=PAID_MEASURES, sort=None, ascending=False, limit=None):
+        df = aggregate(self.view(section, filters), by, measures).sort_values(by, ignore_index=True)
+        if sort is None:
+            return df if limit is None else df.iloc[:limit]
+        if limit is None:
+            return df.sort_values(sort, ascending=ascending, kind="stable", ignore_index=True)
+        return df.iloc[top_k(df[sort].to_numpy(), limit, ascending)].reset_index(drop=True)
+
+    def top(self, section, filters, metric, k):
+        start, end = self._index.window(filters.days)
+        positions = rankings(self._store).top(section, metric, k, start, end, account_name=filters.accounts)
+        return self._store.frame(section).iloc[positions]
+
+    def totals(self, name, filters, previous=False):
+        return self._cubes.totals(name, filters, previous)
+
+    def n_days(self, name, filters):
+        return self._cubes.n_days(name, filters)
+
+    def series(self, name, filters, resolution):
+        return self._cubes.series(name, filters, resolution)
+
+    def daily(self, section, by=(), measures=()):
+        date_col = next(c for c in DATE_KEYS if c in self._store.frame(section).columns)
+        return daily_sums(self._store).get(section, date_col, by, measures)
+
+    def window(self, filters):
+        return self._index.window(filters.days)
+
+    def distinct(self, section, column):
+        return self._store.frame(section)[column].drop_duplicates().tolist()
+
+    def count(self, section, filters):
+        return _n_selected(self._rows(section, filters))
+
+    def chunks(self, section, filters, size=CHUNK_ROWS, order=None):
+        """The rows of ``view`` in frames of at most ``size`` rows.
+
+        A section with no selected rows yields one empty frame, so its
+        columns are still known. With ``order``, rows are grouped by the
+        leading columns' values and sorted by the last one within a group.
+        """
+        df = self._store.frame(section)
+        positions = self._rows(section, filters)
+        if not _n_selected(positions):
+            yield df.iloc[:0]
+            return
+        if order:
+            if isinstance(positions, slice):
+                positions = np.arange(positions.start, positions.stop)
+            *groups, last = order
+            keys = [df[last].to_numpy()[positions]]
+            keys += [pd.factorize(df[col].to_numpy()[positions])[0] for col in reversed(groups)]
+            positions = positions[np.lexsort(keys)]
+        for block in _blocks(positions, size):
+            yield df.iloc[block]
+
+
+def frame_queries(store):
+    return store.derived("queries", FrameQueries)
+
+
+class JsonSource:
+    """A JSON or NDJSON source held in memory and refreshed in the background."""
+
+    def __init__(self, path, watch=True):
+        self.path = path
+        # The watcher merges source changes and dropped batches in place.
+        self.watcher = Watcher(Ingestor(path, incoming=incoming_dir(path)))
+        if watch:
+            self.watcher.start()
+
+    @property
+    def last_error(self):
+        return self.watcher.last_error
+
+    def queries(self):
+        return frame_queries(self.watcher.store)
+
+
+# ============================================================================
+# SQLITE
+# ============================================================================
+def _q(name):
+    """SQL identifier for a section or column name."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _kind(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "date"
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return "category"
+    if pd.api.types.is_bool_dtype(series):
+        return "bool"
+    if pd.api.types.is_integer_dtype(series) or pd.api.types.is_float_dtype(series):
+        # The numpy dtype name, so int32 / float32 columns read back as such.
+        return series.dtype.name
+    if series.map(lambda v: isinstance(v, (list, dict))).any():
+        return "json"
+    return "text"
+
+
+SQL_TYPES = {"date": "INTEGER", "bool": "INTEGER"}
+
+
+def _numeric(kind):
+    """numpy dtype of a numeric column kind (``"int"`` / ``"float"`` in older files)."""
+    if kind is None:
+        return None
+    try:
+        dtype = np.dtype({"int": "int64", "float": "float64"}.get(kind, kind))
+    except TypeError:
+        return None
+    return dtype if dtype.kind in "iuf" else None
+
+
+def _sql_type(kind):
+    dtype = _numeric(kind)
+    if dtype is not None:
+        return "REAL" if dtype.kind == "f" else "INTEGER"
+    return SQL_TYPES.get(kind, "TEXT")
+
+
+def _sql_rows(chunk, kinds):
+    """Rows of ``chunk`` as tuples of SQLite values (dates as int64 ns)."""
+    columns = []
+    for col, kind in kinds.items():
+        series = chunk[col]
+        if kind == "date":
+            values = series.to_numpy(dtype="datetime64[ns]").view("i8").tolist()
+        elif kind == "json":
+            values = [json.dumps(v) for v in series.tolist()]
+        else:
+            values = series.astype(object).tolist()
+        missing = series.isna().to_numpy()
+        if missing.any():
+            values = [None if m else v for v, m in zip(values, missing)]
+        columns.append(values)
+    return zip(*columns)
+
+
+def write_sqlite(store, path, chunk_rows=CHUNK_ROWS):
+    """Write every section and scalar of ``store`` to a SQLite file at ``path``.
+
+    The file is built beside ``path`` and renamed into place, so readers
+    only ever open a complete database. Sections without columns (empty
+    lists in the export) are left out.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.execute("CREATE TABLE _columns (position INTEGER PRIMARY KEY, section TEXT, name TEXT, kind TEXT)")
+        conn.execute("CREATE TABLE _values (path TEXT PRIMARY KEY, value TEXT)")
+        for section in store.sections:
+            df = store.frame(section)
+            if not len(df.columns):
+                continue
+            kinds = {col: _kind(df[col]) for col in df.columns}
+            conn.executemany(
+                "INSERT INTO _columns (section, name, kind) VALUES (?, ?, ?)",
+                [(section, col, kind) for col, kind in kinds.items()],
+            )
+            columns = ", ".join(f"{_q(col)} {_sql_type(kind)}" for col, kind in kinds.items())
+            conn.execute(f"CREATE TABLE {_q(section)} ({columns})")
+            insert = f"INSERT INTO {_q(section)} VALUES ({', '.join('?' * len(kinds))})"
+            for start in range(0, len(df), chunk_rows):
+                conn.executemany(insert, _sql_rows(df.iloc[start:start + chunk_rows], kinds))
+
+            date_col = next((c for c in DATE_KEYS if c in kinds), None)
+            if date_col is not None:
+                conn.execute(f"CREATE INDEX {_q(f'{section}:{date_col}')} ON {_q(section)} ({_q(date_col)})")
+            for dim in INDEXED_DIMENSIONS:
+                if dim in kinds:
+                    keys = ", ".join(_q(c) for c in (dim, date_col) if c is not None)
+                    conn.execute(f"CREATE INDEX {_q(f'{section}:{dim}')} ON {_q(section)} ({keys})")
+            # Descending metric indexes (ties in rowid order) let a top-K
+            # query read rows in rank order and stop after K matches.
+            for metric in RANKED.get(section, ()):
+                if metric in kinds:
+                    conn.execute(f"CREATE INDEX {_q(f'{section}:{metric}')} ON {_q(section)} ({_q(metric)} DESC)")
+        conn.executemany(
+            "INSERT INTO _values VALUES (?, ?)",
+            [(name, json.dumps(value)) for name, value in store.values.items()],
+        )
+        conn.commit()
+        # Table statistics let the planner pick between date and dimension indexes.
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+
+
+class SqlQueries:
+    """Queries pushed down to one version of a SQLite file."""
+
+    def __init__(self, path, signature):
+        self.path = path
+        self.signature = signature
+        self.data_version = "sqlite-{}-{}".format(*signature)
+        self._uri = f"file:{pathname2url(os.path.abspath(path))}?mode=ro"
+        self._local = threading.local()
+        self._daily = {}
+
+        conn = self._conn()
+        self._kinds = {}
+        for section, name, kind in conn.execute("SELECT section, name, kind FROM _columns ORDER BY position"):
+            self._kinds.setdefault(section, {})[name] = kind
+        self._values = {name: json.loads(value) for name, value in conn.execute("SELECT path, value FROM _values")}
+        self._date_cols = {
+            section: next((c for c in DATE_KEYS if c in kinds), None) for section, kinds in self._kinds.items()
+        }
+        # The date indexes make every MAX a single lookup.
+        self.end_date = anchor(
+            conn.execute(f"SELECT MAX({_q(col)}) FROM {_q(section)}").fetchone()[0]
+            for section, col in self._date_cols.items() if col is not None
+        )
+
+    def _conn(self):
+        # sqlite3 connections belong to the thread that opened them, and every
+        # session reruns on its own thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+        return conn
+
+    @property
+    def sections(self):
+        return tuple(self._kinds)
+
+    @property
+    def values(self):
+        return dict(self._values)
+
+    def value(self, path):
+        return value_at(self._values, path)
+
+    def load(self, sections):
+        pass
+
+    def _where(self, section, filters, bounds=None):
+        """The WHERE clause selecting ``filters`` (over ``bounds`` instead of their window, if given)."""
+        clauses, params = [], []
+        date_col = self._date_cols[section]
+        start, end = bounds or window(self.end_date, filters.days)
+        if date_col is not None and start is not None:
+            clauses.append(f"{_q(date_col)} BETWEEN ? AND ?")
+            params += [int(start), int(end)]
+        if filters.accounts and "account_name" in self._kinds[section]:
+            clauses.append(f"account_name IN ({', '.join('?' * len(filters.accounts))})")
+            params += filters.accounts
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _frame(self, section, rows, names):
+        """Rows fetched from ``section`` as a frame with the store's dtypes."""
+        df = pd.DataFrame.from_records(rows, columns=names)
+        kinds = self._kinds[section]
+        for col in names:
+            kind = kinds.get(col)
+            if kind == "date":
+                # NaT is the smallest int64 in datetime64[ns].
+                ns = df[col].fillna(np.iinfo(np.int64).min).astype("int64").to_numpy()
+                df[col] = ns.view("datetime64[ns]")
+            elif kind == "category":
+                df[col] = df[col].astype("category")
+            elif kind == "json":
+                df[col] = df[col].map(lambda v: v if v is None else json.loads(v))
+            elif kind == "bool" and not df[col].isna().any():
+                df[col] = df[col].astype("bool")
+            elif _numeric(kind) is not None:
+                dtype = _numeric(kind)
+                if dtype.kind != "f" and df[col].isna().any():
+                    dtype = np.dtype("float64")
+                df[col] = df[col].astype(dtype)
+        return df
+
+    def _read(self, section, sql, params):
+        cursor = self._conn().execute(sql, params)
+        names = [d[0] for d in cursor.description]
+        return self._frame(section, cursor.fetchall(), names)
+
+    def view(self, section, filters, limit=None):
+        where, params = self._where(section, filters)
+        sql = f"SELECT * FROM {_q(section)}{where} ORDER BY rowid"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._read(section, sql, params)
+
+    def _order_term(self, sort, measures):
+        if sort in measures:
+            return f"SUM({_q(sort)})"
+        if sort in RATIOS:
+            num, den, scale = RATIOS[sort]
+            return f"SUM({_q(num)}) * {float(scale)} / NULLIF(SUM({_q(den)}), 0)"
+        raise ValueError(f"Cannot sort aggregates by {sort!r}")
+
+    def aggregate(self, section, filters, by, measures=PAID_MEASURES, sort=None, ascending=False, limit=None):
+        where, params = self._where(section, filters)
+        sums = ", ".join(f"COALESCE(SUM({_q(m)}), 0) AS {_q(m)}" for m in measures)
+        order = _q(by)
+        if sort is not None:
+            term = self._order_term(sort, measures)
+            # Groups without a value (a zero denominator) sort last either way.
+            order = f"({term}) IS NULL, {term} {'ASC' if ascending else 'DESC'}, {_q(by)}"
+        sql = f"SELECT {_q(by)}, {sums} FROM {_q(section)}{where} GROUP BY {_q(by)} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return with_ratios(self._read(section, sql, params))
+
+    def top(self, section, filters, metric, k):
+        where, params = self._where(section, filters)
+        # NULLs sort lowest in SQLite, so they come last in DESC order.
+        sql = f"SELECT * FROM {_q(section)}{where} ORDER BY {_q(metric)} DESC, rowid LIMIT ?"
+        return self._read(section, sql, params + [k])
+
+    def totals(self, name, filters, previous=False):
+        section, _, _, measures = CUBES[name]
+        bounds = None
+        if previous:
+            bounds = previous_window(*window(self.end_date, filters.days))
+            start, end = bounds
+            if start is None or self._n_days(section, start, end) < (end - start + 1) // DAY_NS:
+                return None
+        where, params = self._where(section, filters, bounds)
+        sums = ", ".join(f"COALESCE(SUM({_q(m)}), 0)" for m in measures)
+        row = self._conn().execute(f"SELECT {sums} FROM {_q(section)}{where}", params).fetchone()
+        return derive_kpis(dict(zip(measures, row)))
+
+    def n_days(self, name, filters):
+        """Calendar days of the window that fall inside the section's span."""
+        return self._n_days(CUBES[name][0], *window(self.end_date, filters.days))
+
+    def _n_days(self, section, start, end):
+        date_col = self._date_cols[section]
+        if date_col is None:
+            return 0
+        first, last = self._conn().execute(
+            f"SELECT MIN({_q(date_col)}), MAX({_q(date_col)}) FROM {_q(section)}"
+        ).fetchone()
+        if first is None:
+            return 0
+        first, last = first // DAY_NS * DAY_NS, last // DAY_NS * DAY_NS
+        if start is not None:
+            first, last = max(first, start), min(last, end)
+        if last < first:
+            return 0
+        return (last - first) // DAY_NS + 1
+
+    def series(self, name, filters, resolution):
+        """Buckets of the memoized per-day sums, so a rerun reads no rows."""
+        section, _, _, measures = CUBES[name]
+        df = self.daily(section, (), measures)
+        days = df["day"].to_numpy(dtype="datetime64[ns]").view("i8")
+        start, end = window(self.end_date, filters.days)
+        if start is not None:
+            keep = (days >= start) & (days <= end)
+            df, days = df[keep], days[keep]
+        # Days are bucketed like the cubes do, so both backends label buckets alike.
+        df = df[list(measures)].groupby(bucket_starts(days, resolution).view("datetime64[ns]"), sort=True).sum()
+        return df.rename_axis("date").reset_index()
+
+    def daily(self, section, by=(), measures=()):
+        by, measures = tuple(by), tuple(measures)
+        # One version of the file never changes, so results are kept per query object.
+        key = (section, by, measures)
+        if key not in self._daily:
+            date_col = _q(self._date_cols[section])
+            cols = "".join(f", {_q(c)}" for c in by)
+            sums = "".join(f", COALESCE(SUM({_q(m)}), 0) AS {_q(m)}" for m in measures)
+            present = "".join(f" AND {_q(c)} IS NOT NULL" for c in by)
+            sql = (
+                f"SELECT {date_col} / {DAY_NS} AS day{cols}, COUNT(*) AS rows{sums} FROM {_q(section)} "
+                f"WHERE {date_col} IS NOT NULL{present} GROUP BY day{cols} ORDER BY day{cols}"
+            )
+            # Sums keep SQLite's int64 / float64 rather than the column's storage dtype.
+            df = pd.DataFrame.from_records(self._conn().execute(sql).fetchall(), columns=["day", *by, "rows", *measures])
+            df["day"] = (df["day"].to_numpy(dtype=np.int64) * DAY_NS).view("datetime64[ns]")
+            self._daily[key] = df
+        return self._daily[key].copy(deep=False)
+
+    def window(self, filters):
+        return window(self.end_date, filters.days)
+
+    def distinct(self, section, column):
+        cursor = self._conn().execute(
+            f"SELECT {_q(column)} FROM {_q(section)} GROUP BY {_q(column)} ORDER BY MIN(rowid)"
+        )
+        return [row[0] for row in cursor]
+
+    def count(self, section, filters):
+        where, params = self._where(section, filters)
+        return self._conn().execute(f"SELECT COUNT(*) FROM {_q(section)}{where}", params).fetchone()[0]
+
+    def chunks(self, section, filters, size=CHUNK_ROWS, order=None):
+        where, params = self._where(section, filters)
+        keys = "".join(f"{_q(col)}, " for col in order or ())
+        cursor = self._conn().execute(f"SELECT * FROM {_q(section)}{where} ORDER BY {keys}rowid", params)
+        names = [d[0] for d in cursor.description]
+        rows = cursor.fetchmany(size)
+        yield self._frame(section, rows, names)
+        while len(rows) == size:
+            rows = cursor.fetchmany(size)
+            if rows:
+                yield self._frame(section, rows, names)
+
+
+class SqliteSource:
+    """A SQLite file written by ``write_sqlite``; reopened when it is replaced."""
+
+    def __init__(self, path):
+        self.path = path
+        self.last_error = None
+        self._queries = None
+        self._lock = threading.Lock()
+        self.queries()
+
+    def _signature(self):
+        st = os.stat(self.path)
+        return st.st_size, st.st_mtime_ns
+
+    def queries(self):
+        signature = self._signature()
+        with self._lock:
+            if self._queries is None or self._queries.signature != signature:
+                try:
+                    self._queries = SqlQueries(self.path, signature)
+                    self.last_error = None
+                except sqlite3.DatabaseError as exc:
+                    if self._queries is None:
+                        raise ValueError(f"{self.path} is not a RECHO SQLite database: {exc}") from exc
+                    # Keep serving the last good file.
+                    self.last_error = exc
+            return self._queries
+
+
+def open_source(path, watch=True):
+    """The backend for ``path``: SQLite by extension, otherwise JSON/NDJSON."""
+    if path.lower().endswith(SQLITE_SUFFIXES):
+        return SqliteSource(path)
+    return JsonSource(path, watch=watch)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a dashboard metrics source.")
+    parser.add_argument("path", help="dashboard_metrics.json or an NDJSON section directory")
+    parser.add_argument("--sqlite", metavar="OUT", required=True, help="SQLite file to write")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    store = Ingestor(args.path, use_disk_cache=False).store
+    write_sqlite(store, args.sqlite)
+    rows = sum(len(store.frame(section)) for section in store.sections)
+    print(
+        f"Wrote {rows:,} rows in {len(store.sections)} sections to {args.sqlite} "
+        f"({os.path.getsize(args.sqlite) / 2**20:,.1f} MiB) in {time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
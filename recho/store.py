@@ -0,0 +1,259 @@
+"""
+Columnar in-memory metrics store.
+
+Every list section of dashboard_metrics.json (``organic.daily_metrics``,
+``paid.spend_pacing``, ...) is parsed exactly once into a DataFrame with the
+column types declared in ``recho.schema``: dates become datetime64, repeated
+names categoricals, counts int32 and displayed ratios float32. Scalar fields
+(``brand.sentiment_ratio``, ``traffic.assisted_conversions.*``) are kept as
+plain values. Pages get read-only views, so one store instance can
+be shared by every rerun without being copied.
+
+A section may also be given as a zero-argument loader instead of a frame
+(the disk cache does this); it is materialized the first time a page asks
+for it, so a page only pays for the sections it reads.
+
+New rows are merged with ``update()``, which bumps ``version`` and drops
+everything built through ``derived()``. Structures that can absorb appended
+rows themselves are built through ``persistent()`` instead and survive it;
+``generation(section)`` tells them when a section was replaced rather than
+appended to.
+"""
+
+import json
+import threading
+import uuid
+
+import pandas as pd
+
+from recho import perf, schema
+
+# With copy-on-write, a shallow copy behaves like an independent frame:
+# pages can add or overwrite columns on a view without touching the store.
+pd.set_option("mode.copy_on_write", True)
+
+DATE_COLUMNS = ("date", "post_date")
+
+CATEGORY_COLUMNS = (
+    "account_name",
+    "account_type",
+    "campaign",
+    "campaign_id",
+    "campaign_name",
+    "channel",
+    "medium",
+    "performance_tier",
+    "sentiment",
+    "source",
+    "subreddit",
+)
+
+
+def build_frame(rows, section=None, issues=None):
+    """Turn a list of row dicts into a typed DataFrame.
+
+    Columns of a ``section`` declared in ``recho.schema`` get its types, and
+    drift from them is added to the ``issues`` set; other columns are typed
+    by name.
+    """
+    with perf.span("build_frame", rows=len(rows)):
+        df = pd.DataFrame.from_records(rows)
+        declared = schema.apply(section, df, issues) if section is not None else None
+        for col in df.columns:
+            if declared and col in declared:
+                continue
+            if col in DATE_COLUMNS:
+                df[col] = pd.to_datetime(df[col])
+            elif col in CATEGORY_COLUMNS:
+                df[col] = df[col].astype("category")
+        return df
+
+
+def concat_frames(frames):
+    """Concatenate typed frames, keeping categorical columns categorical."""
+    frames = [df for df in frames if len(df)] or list(frames[:1])
+    if len(frames) == 1:
+        return frames[0]
+    frames = list(frames)
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            # pd.concat only keeps the category dtype when every part has
+            # identical categories.
+            categories = pd.Index([])
+            for df in frames:
+                categories = categories.union(df[col].cat.categories, sort=False)
+            for i, df in enumerate(frames):
+                frames[i] = df.assign(**{col: df[col].cat.set_categories(categories)})
+    return pd.concat(frames, ignore_index=True)
+
+
+def newest_date(df):
+    """Newest date in ``df`` as int64 nanoseconds, or None if it has none."""
+    for col in DATE_COLUMNS:
+        if col in df.columns and len(df):
+            return int(df[col].max().value)
+    return None
+
+
+def value_at(values, path):
+    """``values[path]``, or a dict of the entries below ``path``."""
+    if path in values:
+        return values[path]
+    prefix = path + "."
+    children = {k[len(prefix):]: v for k, v in values.items() if k.startswith(prefix)}
+    if not children:
+        raise KeyError(path)
+    return children
+
+
+class MetricsStore:
+    """Typed, read-only view over one load of the dashboard metrics."""
+
+    def __init__(self, frames, values, newest=None):
+        self._frames = frames
+        self._values = values
+        # section -> newest date (int64 ns), known without loading the section
+        self._newest = dict(newest or {})
+        self._derived = {}
+        self._persistent = {}
+        # section -> times it was replaced (appends keep the generation)
+        self._generations = {}
+        self._lock = threading.RLock()
+        self._token = uuid.uuid4().hex[:12]
+        self.version = 0
+
+    @classmethod
+    def from_dict(cls, raw, issues=None):
+        frames = {}
+        values = {}
+
+        def walk(node, path):
+            for key, value in node.items():
+                name = f"{path}.{key}" if path else key
+                if isinstance(value, dict):
+                    walk(value, name)
+                elif isinstance(value, list):
+                    frames[name] = build_frame(value, name, issues)
+                else:
+                    values[name] = value
+
+        walk(raw, "")
+        return cls(frames, schema.check_values(values, issues))
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+    @property
+    def data_version(self):
+        """Changes whenever the data does; downstream caches key on it."""
+        return f"{self._token}-{self.version}"
+
+    def parts(self):
+        """``(frames, values)`` snapshot, for serializing the store."""
+        frames = {section: self.frame(section) for section in self._frames}
+        return frames, dict(self._values)
+
+    @property
+    def sections(self):
+        return tuple(self._frames)
+
+    @property
+    def loaded_sections(self):
+        """Sections materialized so far."""
+        return tuple(s for s, df in self._frames.items() if isinstance(df, pd.DataFrame))
+
+    def frame(self, section):
+        """Read-only view of a table section, e.g. ``'paid.daily_metrics'``."""
+        df = self._frames[section]
+        if not isinstance(df, pd.DataFrame):
+            df = self._load(section)
+        return df.copy(deep=False)
+
+    def _load(self, section):
+        with self._lock:
+            df = self._frames[section]
+            if not isinstance(df, pd.DataFrame):
+                with perf.span("load_section", section=section):
+                    df = df()
+                self._frames = {**self._frames, section: df}
+            return df
+
+    def load(self, sections):
+        """Materialize ``sections`` now rather than on first access."""
+        for section in sections:
+            if section in self._frames:
+                self.frame(section)
+
+    def newest_date(self, section):
+        """Newest date of ``section`` (int64 ns) without loading it if known."""
+        if section not in self._newest:
+            self._newest[section] = newest_date(self.frame(section))
+        return self._newest[section]
+
+    @property
+    def values(self):
+        """Every scalar field, keyed by its dotted path."""
+        return dict(self._values)
+
+    def value(self, path):
+        """Scalar field, or a dict of the scalar fields below ``path``."""
+        return value_at(self._values, path)
+
+    def update(self, appended=None, replaced=None, values=None):
+        """Append rows to sections, swap in rebuilt ones and update scalars.
+
+        The section dict is replaced in one assignment, so a rerun that is
+        reading the store sees either the old or the new data, never a mix.
+        """
+        frames = dict(self._frames)
+        for section, df in (appended or {}).items():
+            frames[section] = concat_frames([self.frame(section), df]) if section in frames else df
+        frames.update(replaced or {})
+        with self._lock:
+            for section in set(replaced or {}) | (set(appended or {}) - set(self._frames)):
+                self._generations[section] = self._generations.get(section, 0) + 1
+            self._frames = frames
+            for section in {**(appended or {}), **(replaced or {})}:
+                self._newest.pop(section, None)
+            if values:
+                self._values = {**self._values, **values}
+            self._derived = {}
+            self.version += 1
+
+    def derived(self, name, build):
+        """Build ``build(store)`` once per store and reuse it afterwards.
+
+        Indexes, rollups and other structures that are a pure function of the
+        loaded data hang off the store this way, so they are rebuilt exactly
+        when the data is.
+        """
+        try:
+            derived = self._derived[name]
+        except KeyError:
+            pass
+        else:
+            perf.cache_event("derived", True)
+            return derived
+        with self._lock:
+            if name not in self._derived:
+                perf.cache_event("derived", False)
+                with perf.span("derive", structure=name):
+                    self._derived[name] = build(self)
+            return self._derived[name]
+
+    def generation(self, section):
+        """Changes when ``section`` is replaced; appending rows keeps it."""
+        return self._generations.get(section, 0)
+
+    def persistent(self, name, build):
+        """Like ``derived()``, but kept across ``update()``.
+
+        The structure must bring itself up to date on use, e.g. by comparing
+        ``generation()`` and the row count with what it last saw.
+        """
+        with self._lock:
+            if name not in self._persistent:
+                self._persistent[name] = build(self)
+            return self._persistent[name]
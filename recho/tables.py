@@ -0,0 +1,101 @@
+"""
+Shared rendering for every ``st.dataframe`` in the dashboard.
+
+Numbers stay numeric: currency, ratio and percentage formatting is applied
+by the grid through ``st.column_config`` instead of turning columns into
+strings, so they still sort numerically and no per-cell Python runs.
+Column selection happens on copy-on-write views, and tables longer than
+``PAGE_SIZE`` rows are paged so only the visible page is serialized.
+"""
+
+import math
+
+import streamlit as st
+
+from recho import perf
+
+PAGE_SIZE = 200
+
+MONEY = "$%,.0f"
+MONEY_CENTS = "$%,.2f"
+COUNT = "%,d"
+RATIO = "%.2fx"
+PERCENT = "%.2f%%"
+
+# column -> (label, format); columns not listed keep their name and the
+# grid's default formatting.
+COLUMNS = {
+    "account_name": ("Account", None),
+    "account_type": ("Type", None),
+    "campaign": ("Campaign", None),
+    "campaign_name": ("Campaign", None),
+    "channel": ("Channel", None),
+    "subreddit": ("Subreddit", None),
+    "title": ("Title", None),
+    "spend": ("Spend", MONEY),
+    "revenue": ("Revenue", MONEY),
+    "cpa": ("CPA", MONEY_CENTS),
+    "cpc": ("CPC", MONEY_CENTS),
+    "roas": ("ROAS", RATIO),
+    "ctr": ("CTR", PERCENT),
+    "cvr": ("CVR", PERCENT),
+    "engagement_rate": ("Engagement", PERCENT),
+    "avg_upvote_rate": ("Upvote Rate", PERCENT),
+    "conversions": ("Conversions", COUNT),
+    "sessions": ("Sessions", COUNT),
+    "clicks": ("Clicks", COUNT),
+    "total_clicks": ("Clicks", COUNT),
+    "upvotes": ("Upvotes", COUNT),
+    "total_upvotes": ("Upvotes", COUNT),
+    "comments": ("Comments", COUNT),
+    "post_count": ("Posts", COUNT),
+    "total_karma": ("Karma", COUNT),
+    "posts_per_week": ("Posts/Week", "%.1f"),
+    "karma_velocity": ("Karma/Day", "%,.1f"),
+    "karma_per_week": ("Karma/Week", "%,.0f"),
+}
+
+
+def column_config(columns, overrides=None):
+    """``st.column_config`` entries for ``columns``, with ``overrides`` winning."""
+    config = {}
+    for col in columns:
+        if col not in COLUMNS:
+            continue
+        label, fmt = COLUMNS[col]
+        if fmt is None:
+            config[col] = st.column_config.TextColumn(label)
+        else:
+            config[col] = st.column_config.NumberColumn(label, format=fmt)
+    config.update(overrides or {})
+    return config
+
+
+def _page(df, key, page_size):
+    n_pages = math.ceil(len(df) / page_size)
+    page = st.number_input(
+        f"Page (of {n_pages:,}, {len(df):,} rows)",
+        min_value=1, max_value=n_pages, value=1, step=1, key=f"{key}_page",
+    )
+    start = (int(page) - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+
+def render_table(df, columns=None, key=None, page_size=PAGE_SIZE, column_overrides=None):
+    """Render ``df`` (optionally just ``columns``) with shared formats and paging.
+
+    ``key`` is required once a table can exceed ``page_size`` rows, since it
+    names the page selector's widget state.
+    """
+    columns = list(df.columns if columns is None else columns)
+    if len(df) > page_size:
+        if key is None:
+            raise ValueError("render_table needs a key to page tables over page_size rows")
+        df = _page(df, key, page_size)
+    with perf.span("dataframe", rows=len(df)):
+        st.dataframe(
+            df[columns],
+            column_config=column_config(columns, column_overrides),
+            use_container_width=True,
+            hide_index=True,
+        )
@@ -0,0 +1,42 @@
+"""
+Shared fixtures.
+
+Every test reads the same small synthetic export: two copies of the bundled
+``dashboard_metrics.json`` (see ``benchmarks/synth.py``) with touchpoints and
+raw mentions added, written once per session along with its SQLite
+conversion.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synth import generate  # noqa: E402
+from recho.sources import write_sqlite  # noqa: E402
+from recho.store import MetricsStore  # noqa: E402
+
+SEED = os.path.join(ROOT, "dashboard_metrics.json")
+SCALE = 2
+USERS = 400
+MENTIONS = 3_000
+
+
+@pytest.fixture(scope="session")
+def metrics_json(tmp_path_factory):
+    return generate(SCALE, SEED, str(tmp_path_factory.mktemp("data") / "metrics.json"), USERS, MENTIONS)
+
+
+@pytest.fixture(scope="session")
+def store(metrics_json):
+    return MetricsStore.from_json(metrics_json)
+
+
+@pytest.fixture(scope="session")
+def metrics_db(store, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("sqlite") / "metrics.db")
+    write_sqlite(store, path)
+    return path
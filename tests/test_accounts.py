@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recho.accounts import POSTS, SECTION, TOP_POSTS, VELOCITY, build_detail, build_table, table
+from recho.filters import Filters
+from recho.sources import FrameQueries, SqliteSource
+
+
+@pytest.fixture(scope="module", params=["frames", "sqlite"])
+def data(request, store, metrics_db):
+    if request.param == "frames":
+        return FrameQueries(store)
+    return SqliteSource(metrics_db).queries()
+
+
+def _velocity(store, start, end):
+    """Mean karma velocity per calendar day of ``[start, end]``, days without rows counting as zero."""
+    df = store.frame(VELOCITY)
+    daily = df.assign(day=df["date"].dt.floor("D")).pivot_table(
+        index="day", columns="account_name", values="karma_velocity", aggfunc="sum", observed=True
+    )
+    days = pd.date_range(daily.index.min(), daily.index.max(), freq="D")
+    daily = daily.reindex(days, fill_value=0).fillna(0)
+    return daily[(daily.index >= start) & (daily.index <= end)].mean()
+
+
+def test_table_matches_pandas(store, data):
+    filters = Filters("Last 30 Days")
+    got = build_table(data, filters).set_index("account_name")
+    rows = store.frame(SECTION).assign(account_name=lambda df: df["account_name"].astype(str)).set_index("account_name")
+    assert sorted(got.index) == sorted(rows.index)
+    for col in ("total_karma", "total_posts"):
+        np.testing.assert_allclose(got[col], rows.loc[got.index, col])
+    np.testing.assert_allclose(
+        got["posts_per_week"], rows.loc[got.index, "total_posts"] / (rows.loc[got.index, "account_age_days"] / 7)
+    )
+    np.testing.assert_allclose(
+        got["post_karma_share"], 100 * rows.loc[got.index, "post_karma"] / rows.loc[got.index, "total_karma"]
+    )
+
+    start, end = (pd.Timestamp(ns) for ns in data.window(filters))
+    want = _velocity(store, start.floor("D"), end)
+    np.testing.assert_allclose(got.loc[want.index.astype(str), "velocity"], want.to_numpy(), rtol=1e-6)
+    length = end.floor("D") - start.floor("D") + pd.Timedelta(days=1)
+    before = _velocity(store, start.floor("D") - length, start.floor("D") - pd.Timedelta(days=1))
+    np.testing.assert_allclose(
+        got.loc[want.index.astype(str), "velocity_change"], 100 * (want - before) / before, rtol=1e-6
+    )
+    assert got["trend"].map(len).max() <= 30
+
+    # Most karma first.
+    assert got["total_karma"].is_monotonic_decreasing
+
+
+def test_account_filter(store, data):
+    accounts = tuple(store.frame(SECTION)["account_name"].cat.categories[:2])
+    got = build_table(data, Filters("All Time", accounts))
+    assert sorted(got["account_name"]) == sorted(accounts)
+    # All Time has no window before it.
+    assert got["velocity_change"].isna().all()
+
+
+def test_detail(store, data):
+    filters = Filters("Last 90 Days")
+    account = build_table(data, filters)["account_name"].iloc[0]
+    found = build_detail(data, filters, account)
+    assert found.account["account_name"] == account
+    start, end = (pd.Timestamp(ns) for ns in data.window(filters))
+    velocity = store.frame(VELOCITY)
+    own = velocity[(velocity["account_name"] == account) & velocity["date"].between(start, end)]
+    assert len(found.velocity) == len(own)
+    posts = store.frame(POSTS)
+    own_posts = posts[(posts["account_name"] == account) & posts["post_date"].between(start, end)]
+    assert list(found.top_posts["upvotes"]) == sorted(own_posts["upvotes"], reverse=True)[:TOP_POSTS]
+    assert build_detail(data, filters, "nobody") is None
+
+
+def test_table_is_cached_per_version_and_filters(store):
+    data = FrameQueries(store)
+    assert table(data, Filters("Last 7 Days")) is table(data, Filters("Last 7 Days"))
+    assert table(data, Filters("Last 7 Days")) is not table(data, Filters("Last 30 Days"))
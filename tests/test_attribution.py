@@ -0,0 +1,121 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recho.attribution import COLUMNS, GROUPS, MODELS, NO_VALUE, SECTION, attribute, attribution
+from recho.filters import Filters
+from recho.sources import FrameQueries, SqliteSource
+
+
+def _reference(df, by, half_life_days=7.0):
+    """Credits per ``by`` value, path by path in plain Python."""
+    df = df[df["user_id"].notna()].sort_values(["user_id", "date"], kind="stable")
+    sums = defaultdict(lambda: dict.fromkeys(COLUMNS, 0.0))
+    paths, path, user = [], [], None
+    for row in df.itertuples(index=False):
+        if row.user_id != user and path:
+            paths.append(path)
+            path = []
+        user = row.user_id
+        path.append(row)
+        if row.conversions > 0:
+            paths.append(path)
+            path = []
+    paths.append(path)
+
+    for path in paths:
+        for row in path:
+            sums[_label(getattr(row, by))]["sessions"] += 1
+        end = path[-1] if path else None
+        if end is None or not end.conversions > 0:
+            # A path without a conversion gets no credit.
+            continue
+        decay = [0.5 ** ((end.date - row.date).total_seconds() / 86_400 / half_life_days) for row in path]
+        weights = {
+            "last_click": [0.0] * (len(path) - 1) + [1.0],
+            "first_click": [1.0] + [0.0] * (len(path) - 1),
+            "linear": [1.0 / len(path)] * len(path),
+            "time_decay": [d / sum(decay) for d in decay],
+        }
+        revenue = 0.0 if pd.isna(end.revenue) else end.revenue
+        for model, shares in weights.items():
+            for row, share in zip(path, shares):
+                sums[_label(getattr(row, by))][model] += share * end.conversions
+                sums[_label(getattr(row, by))][f"{model}_revenue"] += share * revenue
+    return sums
+
+
+def _label(value):
+    return NO_VALUE if pd.isna(value) else str(value)
+
+
+def _assert_matches(got, want, by):
+    assert sorted(got[by]) == sorted(want)
+    for row in got.itertuples(index=False):
+        expected = want[getattr(row, by)]
+        for col in COLUMNS:
+            assert getattr(row, col) == pytest.approx(expected[col], rel=1e-9, abs=1e-9), (getattr(row, by), col)
+
+
+def _chunks(df, size):
+    df = df.sort_values(["user_id", "date"], kind="stable")
+    return (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+
+def test_credits_of_one_path():
+    df = pd.DataFrame({
+        "user_id": ["u1"] * 3 + ["u2"],
+        "date": pd.to_datetime(["2026-01-01", "2026-01-08", "2026-01-15", "2026-01-02"]),
+        "channel": ["organic", "paid", "organic", "paid"],
+        "conversions": [0, 0, 2, 0],
+        "revenue": [np.nan, np.nan, 100.0, np.nan],
+    })
+    got = attribute([df], "channel").set_index("channel")
+    assert got.loc["organic", "last_click"] == 2
+    assert got.loc["paid", "last_click"] == 0
+    assert got.loc["organic", "first_click"] == 2
+    assert got.loc["paid", "linear"] == pytest.approx(2 / 3)
+    # Ages of 14, 7 and 0 days with a 7-day half-life weigh 1/4, 1/2 and 1.
+    assert got.loc["paid", "time_decay_revenue"] == pytest.approx(100 * 0.5 / 1.75)
+    # u2 never converted: its session is counted but earns nothing.
+    assert got.loc["paid", "sessions"] == 2
+
+
+@pytest.mark.parametrize("by", GROUPS)
+@pytest.mark.parametrize("size", [1, 7, 1_000, 10**6])
+def test_chunked_stream_matches_per_path_reference(store, by, size):
+    df = store.frame(SECTION)
+    _assert_matches(attribute(_chunks(df, size), by), _reference(df, by), by)
+
+
+@pytest.mark.parametrize("half_life_days", [1.0, 30.0])
+def test_half_life(store, half_life_days):
+    df = store.frame(SECTION)
+    got = attribute(_chunks(df, 500), "channel", half_life_days)
+    _assert_matches(got, _reference(df, "channel", half_life_days), "channel")
+
+
+@pytest.mark.parametrize("date_range", ["Last 30 Days", "All Time"])
+@pytest.mark.parametrize("by", GROUPS)
+def test_backends_match_reference(store, metrics_db, date_range, by):
+    filters = Filters(date_range)
+    for data in (FrameQueries(store), SqliteSource(metrics_db).queries()):
+        _assert_matches(attribution(data, filters, by), _reference(data.view(SECTION, filters), by), by)
+
+
+def test_models_conserve_conversions(store):
+    got = attribute(_chunks(store.frame(SECTION), 100), "subreddit")
+    converted = store.frame(SECTION)["conversions"].sum()
+    for model in MODELS:
+        assert got[model].sum() == pytest.approx(converted)
+
+
+def test_results_are_sorted_and_cached(store):
+    data = FrameQueries(store)
+    first = attribution(data, Filters("All Time"), "campaign")
+    assert first["last_click"].is_monotonic_decreasing
+    # A copy of the cached frame, so callers can add columns safely.
+    first["extra"] = 1
+    assert "extra" not in attribution(data, Filters("All Time"), "campaign").columns
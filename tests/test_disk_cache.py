@@ -0,0 +1,63 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from recho import disk_cache
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.delenv("RECHO_CACHE_DIR", raising=False)
+    path = tmp_path / "metrics.json"
+    path.write_text("{}")
+    return str(path)
+
+
+def test_round_trip(store, source):
+    target = disk_cache.write(source, ("sig", 1), store, {"spans": {}})
+    assert os.path.dirname(target) == os.path.join(os.path.dirname(source), disk_cache.CACHE_DIR_NAME)
+    cached, state = disk_cache.read(source, ("sig", 1))
+    assert state == {"spans": {}}
+    assert cached.values == store.values
+    for section in store.sections:
+        # The manifest knows each newest date before the section is mapped.
+        assert cached.newest_date(section) == store.newest_date(section)
+    assert not cached.loaded_sections
+    for section in store.sections:
+        pd.testing.assert_frame_equal(cached.frame(section), store.frame(section), check_categorical=False)
+
+
+def test_other_signature_misses(store, source):
+    disk_cache.write(source, ("sig", 1), store, {})
+    assert disk_cache.read(source, ("sig", 2)) is None
+
+
+def test_superseded_entries_outlive_grace_period(store, source):
+    old = disk_cache.write(source, 1, store, {})
+    current = disk_cache.write(source, 2, store, {})
+    # Still readable by processes that map it lazily.
+    assert os.path.isdir(old)
+    assert disk_cache.read(source, 1) is not None
+
+    marker = os.path.join(old, disk_cache.SUPERSEDED)
+    expired = time.time() - disk_cache.PRUNE_GRACE_SECONDS - 1
+    os.utime(marker, (expired, expired))
+    newest = disk_cache.write(source, 3, store, {})
+    assert not os.path.exists(old)
+    assert os.path.isdir(current) and os.path.isdir(newest)
+
+
+def test_entry_current_again_is_kept(store, source):
+    first = disk_cache.write(source, 1, store, {})
+    disk_cache.write(source, 2, store, {})
+    assert disk_cache.write(source, 1, store, {}) == first
+    assert not os.path.exists(os.path.join(first, disk_cache.SUPERSEDED))
+
+
+def test_unwritable_root_runs_without_cache(store, source, monkeypatch):
+    blocker = os.path.join(os.path.dirname(source), "file")
+    open(blocker, "w").close()
+    monkeypatch.setenv("RECHO_CACHE_DIR", os.path.join(blocker, "cache"))
+    assert disk_cache.write(source, 1, store, {}) is None
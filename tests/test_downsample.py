@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from recho.downsample import SCATTERGL_THRESHOLD, downsample, downsample_groups, lttb, minmax, scatter
+
+
+def _reference_lttb(x, y, n_out):
+    """LTTB as published, one bucket at a time."""
+    n = len(y)
+    every = (n - 2) / (n_out - 2)
+    keep = [0]
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        nxt_lo, nxt_hi = hi, min(int((i + 2) * every) + 1, n)
+        if i == n_out - 3:
+            nxt_lo, nxt_hi = n - 1, n
+        avg_x, avg_y = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+    return np.array(keep)
+
+
+@pytest.mark.parametrize("n, n_out", [(1_000, 100), (997, 61), (50, 3)])
+def test_lttb_matches_reference(n, n_out):
+    rng = np.random.default_rng(n)
+    x = np.arange(n, dtype=np.float64)
+    y = np.cumsum(rng.normal(size=n))
+    np.testing.assert_array_equal(lttb(x, y, n_out), _reference_lttb(x, y, n_out))
+
+
+def test_lttb_accepts_dates():
+    dates = pd.date_range("2026-01-01", periods=500, freq="h").to_numpy()
+    y = np.sin(np.arange(500) / 20)
+    np.testing.assert_array_equal(lttb(dates, y, 50), lttb(np.arange(500) * 3600e9, y, 50))
+
+
+def test_short_series_are_kept_whole():
+    assert list(lttb(np.arange(5), np.arange(5), 10)) == list(range(5))
+    assert list(minmax(np.arange(5), 10)) == list(range(5))
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    rng = np.random.default_rng(1)
+    y = rng.normal(size=1_003)
+    y[417] = 50
+    y[800] = -50
+    keep = minmax(y, 100)
+    assert len(keep) <= 100
+    assert 417 in keep and 800 in keep
+    size = -(-len(y) // 50)
+    for start in range(0, len(y), size):
+        bucket = y[start:start + size]
+        assert start + int(np.argmax(bucket)) in keep
+        assert start + int(np.argmin(bucket)) in keep
+
+
+def test_downsample_keeps_each_series_extremes():
+    n = 5_000
+    df = pd.DataFrame({"date": pd.date_range("2020-01-01", periods=n), "a": np.zeros(n), "b": np.zeros(n)})
+    df.loc[1_234, "a"] = 10
+    df.loc[3_456, "b"] = -10
+    out = downsample(df, "date", ["a", "b"], budget=200)
+    assert len(out) < 400
+    assert {0, 1_234, 3_456, n - 1} <= set(out.index)
+    assert out["date"].is_monotonic_increasing
+    assert len(downsample(df.iloc[:100], "date", ["a"], budget=200)) == 100
+
+
+def test_downsample_groups_bounds_each_group():
+    n = 2_000
+    df = pd.DataFrame({
+        "date": np.tile(pd.date_range("2020-01-01", periods=n), 2),
+        "y": np.random.default_rng(2).normal(size=2 * n),
+        "account": np.repeat(["a", "b"], n),
+    })
+    out = downsample_groups(df, "date", "y", "account", budget=100)
+    assert out.groupby("account").size().max() <= 100
+    assert set(out["account"]) == {"a", "b"}
+
+
+def test_scatter_switches_to_webgl():
+    assert isinstance(scatter(list(range(10)), list(range(10))), go.Scatter)
+    n = SCATTERGL_THRESHOLD + 1
+    assert isinstance(scatter(list(range(n)), list(range(n))), go.Scattergl)
@@ -0,0 +1,116 @@
+import io
+import json
+import math
+import time
+import zipfile
+
+import pandas as pd
+import pytest
+
+from recho import export
+from recho.export import VALUES_FILE, Exporter, write_export
+from recho.filters import Filters
+from recho.sources import FrameQueries, SqliteSource
+
+
+@pytest.fixture(scope="module", params=["frames", "sqlite"])
+def data(request, store, metrics_db):
+    if request.param == "frames":
+        return FrameQueries(store)
+    return SqliteSource(metrics_db).queries()
+
+
+FILTERS = Filters("Last 30 Days")
+
+
+def _numeric(df):
+    return df.select_dtypes("number").sum()
+
+
+def test_csv_round_trip(data, tmp_path):
+    path = tmp_path / "out.zip"
+    rows = write_export(data, FILTERS, "csv", str(path))
+    assert rows == sum(data.count(section, FILTERS) for section in data.sections)
+    with zipfile.ZipFile(path) as archive:
+        assert sorted(archive.namelist()) == sorted([f"{s}.csv" for s in data.sections] + [VALUES_FILE])
+        assert json.loads(archive.read(VALUES_FILE)) == json.loads(json.dumps(data.values, default=str))
+        for section in data.sections:
+            got = pd.read_csv(io.BytesIO(archive.read(f"{section}.csv")))
+            want = data.view(section, FILTERS)
+            assert len(got) == data.count(section, FILTERS), section
+            assert list(got.columns) == list(want.columns), section
+            pd.testing.assert_series_equal(_numeric(got), _numeric(want).loc[_numeric(got).index], check_dtype=False)
+
+
+def test_chunks_and_progress(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "CHUNK_ROWS", 500)
+    data = FrameQueries(store)
+    calls = []
+    rows = write_export(data, Filters("All Time"), "csv", str(tmp_path / "out.zip"), lambda *args: calls.append(args))
+
+    assert calls[-1][1] == rows
+    assert [n for _, n in calls] == sorted(n for _, n in calls)
+    for section in data.sections:
+        n_rows = data.count(section, Filters("All Time"))
+        assert sum(1 for s, _ in calls if s == section) == math.ceil(n_rows / 500), section
+
+
+def test_parquet_round_trip(store, tmp_path):
+    pytest.importorskip("pyarrow")
+    data = FrameQueries(store)
+    path = tmp_path / "out.zip"
+    write_export(data, FILTERS, "parquet", str(path))
+    with zipfile.ZipFile(path) as archive:
+        for section in data.sections:
+            got = pd.read_parquet(io.BytesIO(archive.read(f"{section}.parquet")))
+            pd.testing.assert_frame_equal(
+                got, data.view(section, FILTERS).reset_index(drop=True), check_dtype=False, check_categorical=False
+            )
+
+
+def test_xlsx_sheets(store, tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    data = FrameQueries(store)
+    path = tmp_path / "out.xlsx"
+    write_export(data, FILTERS, "xlsx", str(path))
+    book = openpyxl.load_workbook(path, read_only=True)
+    for section in data.sections:
+        # One header row above the data.
+        assert book[section[-31:]].max_row == data.count(section, FILTERS) + 1, section
+
+
+def test_html_rows_are_capped(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "HTML_MAX_ROWS", 10)
+    data = FrameQueries(store)
+    path = tmp_path / "out.html"
+    write_export(data, Filters("All Time"), "html", str(path))
+    text = path.read_text(encoding="utf-8")
+    n_rows = data.count("brand.mentions", Filters("All Time"))
+    assert f"First 10 of {n_rows:,} rows." in text
+    assert text.endswith("</table></body></html>")
+
+
+def _wait(job):
+    deadline = time.monotonic() + 30
+    while not job.done and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_exporter_jobs(store, tmp_path):
+    exporter = Exporter(str(tmp_path))
+    job = _wait(exporter.submit(FrameQueries(store), FILTERS, "csv"))
+    assert job.status == "done"
+    assert exporter.job(job.id) is job
+    assert zipfile.is_zipfile(job.path)
+
+
+def test_failed_export_removes_its_file(store, tmp_path):
+    class Broken(FrameQueries):
+        def chunks(self, section, filters, size=None, order=None):
+            raise RuntimeError("source went away")
+
+    job = _wait(Exporter(str(tmp_path)).submit(Broken(store), FILTERS, "csv"))
+    assert job.status == "failed"
+    assert job.error == "RuntimeError: source went away"
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,51 @@
+import plotly.graph_objects as go
+
+from recho.figure_cache import FigureCache
+
+
+def _figure(n=3):
+    return go.Figure(go.Scatter(x=list(range(n)), y=list(range(n)), name="line"))
+
+
+def test_hit_skips_the_builder():
+    cache = FigureCache()
+    calls = []
+
+    def build():
+        calls.append(1)
+        return _figure()
+
+    first = cache.get(("overview", "trend", "v1"), build)
+    again = cache.get(("overview", "trend", "v1"), build)
+    assert calls == [1]
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert again.to_dict() == first.to_dict()
+    # Each hit is a new figure, so a page can change it freely.
+    assert again is not first
+
+
+def test_other_keys_miss():
+    cache = FigureCache()
+    cache.get(("overview", "trend", "v1"), _figure)
+    cache.get(("overview", "trend", "v2"), _figure)
+    assert cache.misses == 2 and len(cache) == 2
+
+
+def test_size_cap_evicts_least_recently_used():
+    size = len(_figure().to_json())
+    cache = FigureCache(max_bytes=2 * size)
+    cache.get("a", _figure)
+    cache.get("b", _figure)
+    cache.get("a", _figure)
+    cache.get("c", _figure)
+    assert len(cache) == 2 and cache.size_bytes <= 2 * size
+    cache.get("a", _figure)
+    assert cache.hits == 2
+    cache.get("b", _figure)
+    assert cache.misses == 4
+
+
+def test_figure_larger_than_the_cap_is_not_kept():
+    cache = FigureCache(max_bytes=100)
+    assert cache.get("big", lambda: _figure(1_000)) is not None
+    assert len(cache) == 0 and cache.size_bytes == 0
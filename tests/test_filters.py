@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recho.filters import DATE_KEYS, DATE_RANGES, FilterIndex, Filters, day_positions, previous_window, window
+
+DAY = np.timedelta64(1, "D")
+
+
+def _dates(df):
+    col = next(c for c in DATE_KEYS if c in df.columns)
+    return df[col].to_numpy(dtype="datetime64[ns]").view("i8")
+
+
+def _expected(df, start=None, end=None, **dims):
+    keep = np.ones(len(df), dtype=bool)
+    if start is not None:
+        dates = _dates(df)
+        keep &= (dates >= start) & (dates <= end)
+    for dim, values in dims.items():
+        if values:
+            keep &= df[dim].isin(values).to_numpy()
+    return df[keep]
+
+
+def test_window_covers_whole_days():
+    start, end = window(np.datetime64("2026-02-15"), 7)
+    assert pd.Timestamp(start) == pd.Timestamp("2026-02-09")
+    assert pd.Timestamp(end) == pd.Timestamp("2026-02-15 23:59:59.999999999")
+    assert window(np.datetime64("2026-02-15"), None) == (None, None)
+
+
+def test_previous_window_ends_before_window():
+    start, end = window(np.datetime64("2026-02-15"), 30)
+    before = previous_window(start, end)
+    assert before[1] == start - 1
+    assert before[1] - before[0] == end - start
+    assert previous_window(None, None) == (None, None)
+
+
+def test_day_positions():
+    days = np.arange(np.datetime64("2026-01-01"), np.datetime64("2026-01-31"))
+    start, end = window(days[-1], 7)
+    assert day_positions(days, start, end) == ((23, 30), (16, 23))
+    # The month does not reach back two 30-day windows.
+    assert day_positions(days, *window(days[-1], 30)) == ((0, 30), None)
+    assert day_positions(days, None, None) == ((0, 30), None)
+
+
+def test_anchor_is_newest_row_of_any_section(store):
+    newest = max(pd.Timestamp(_dates(store.frame(s)).max()) for s in store.sections if _has_date(store.frame(s)))
+    assert FilterIndex(store).end_date == np.datetime64(newest.floor("D"), "D")
+
+
+def _has_date(df):
+    return any(c in df.columns for c in DATE_KEYS) and len(df)
+
+
+@pytest.mark.parametrize("date_range", list(DATE_RANGES))
+def test_date_windows_match_a_scan(store, date_range):
+    index = FilterIndex(store)
+    start, end = index.window(DATE_RANGES[date_range])
+    for section in store.sections:
+        df = store.frame(section)
+        if not _has_date(df):
+            continue
+        pd.testing.assert_frame_equal(index.select(section, start, end), _expected(df, start, end))
+
+
+@pytest.mark.parametrize("section", ["organic.top_posts", "organic.karma_velocity", "accounts.comparison"])
+def test_account_filter_matches_a_scan(store, section):
+    index = FilterIndex(store)
+    df = store.frame(section)
+    accounts = tuple(df["account_name"].cat.categories[::2])
+    for date_range in DATE_RANGES:
+        filters = Filters(date_range, accounts)
+        start, end = index.window(filters.days) if _has_date(df) else (None, None)
+        pd.testing.assert_frame_equal(index.view(section, filters), _expected(df, start, end, account_name=accounts))
+
+
+def test_several_dimensions_intersect(store):
+    index = FilterIndex(store)
+    df = store.frame("paid.daily_metrics")
+    campaigns = list(df["campaign_name"].cat.categories[:3])
+    subreddits = list(df["subreddit"].cat.categories[1::2])
+    # Paid data stops before the newest organic day, so window on its own end.
+    start, end = window(_dates(df).max().astype("datetime64[ns]").astype("datetime64[D]"), 30)
+    got = index.select("paid.daily_metrics", start, end, campaign_name=campaigns, subreddit=subreddits)
+    want = _expected(df, start, end, campaign_name=campaigns, subreddit=subreddits)
+    assert len(want)
+    pd.testing.assert_frame_equal(got, want)
+
+
+def test_unknown_values_select_nothing(store):
+    index = FilterIndex(store)
+    assert not len(index.select("organic.karma_velocity", account_name=["nobody"]))
+    # Dimensions a section does not have are ignored.
+    assert len(index.select("paid.daily_metrics", account_name=["nobody"])) == len(store.frame("paid.daily_metrics"))
+
+
+def test_from_controls_drops_all_accounts():
+    assert Filters.from_controls("Last 7 Days", ["All Accounts", "b"]).accounts == ()
+    assert Filters.from_controls("Last 7 Days", ["b", "a"]).accounts == ("a", "b")
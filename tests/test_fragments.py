@@ -0,0 +1,39 @@
+from streamlit.testing.v1 import AppTest
+
+
+def _app():
+    import streamlit as st
+
+    from recho.fragments import begin_run, end_run, fragment
+
+    started = begin_run()
+
+    @fragment
+    def section(name):
+        st.write(f"section {name}")
+        return name
+
+    assert section("a") == "a"
+    # AppTest cannot rerun a fragment on its own; calling it again within the
+    # same full run looks the same to it (the run id has not changed).
+    section("b")
+    end_run(started)
+
+
+def _captions(at):
+    return [element.value for element in at.caption]
+
+
+def test_fragment_rerun_reports_the_skipped_full_run():
+    at = AppTest.from_function(_app, default_timeout=30).run()
+    assert not at.exception
+    assert [m.value for m in at.markdown] == ["section a", "section b"]
+    # No full run has been timed yet.
+    assert not _captions(at)
+
+    at.run()
+    captions = _captions(at)
+    assert len(captions) == 1
+    assert "Updated this section only" in captions[0]
+    assert "skipped a" in captions[0]
+    assert at.session_state["_recho_run_id"] == 2
@@ -0,0 +1,189 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from recho.ingest import Ingestor, split_to_ndjson
+from recho.store import MetricsStore
+
+from conftest import SEED
+
+
+def _write(path, doc):
+    # Bump the mtime past the last write so every change is a new signature.
+    mtime = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2)
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+
+def _assert_same(store, reference):
+    assert sorted(store.sections) == sorted(reference.sections)
+    for section in reference.sections:
+        pd.testing.assert_frame_equal(
+            store.frame(section).reset_index(drop=True),
+            reference.frame(section).reset_index(drop=True),
+            check_dtype=False,
+            check_categorical=False,
+        )
+    assert store.values == reference.values
+
+
+def _next_day(row):
+    return dict(row, date=str(pd.Timestamp(row["date"]) + pd.Timedelta(days=1)))
+
+
+@pytest.fixture
+def doc():
+    with open(SEED, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def source(tmp_path, doc):
+    path = str(tmp_path / "metrics.json")
+    _write(path, doc)
+    return path
+
+
+def test_full_load_matches_json_load(source):
+    _assert_same(Ingestor(source, use_disk_cache=False).store, MetricsStore.from_json(source))
+
+
+def test_append_reads_only_new_rows(source, doc):
+    ingestor = Ingestor(source, use_disk_cache=False)
+    total = ingestor.last_stats.rows_read
+    rows = doc["paid"]["daily_metrics"]
+    rows.append(_next_day(rows[-1]))
+    _write(source, doc)
+
+    stats = ingestor.refresh()
+    assert stats.rows_appended == 1
+    assert stats.rows_read < total // 10
+    _assert_same(ingestor.store, MetricsStore.from_json(source))
+
+
+def _restate(doc):
+    doc["paid"]["daily_metrics"][0]["spend"] += 1000.5
+
+
+def _reorder(doc):
+    rows = doc["organic"]["daily_metrics"]
+    rows[1], rows[2] = rows[2], rows[1]
+
+
+def _shrink(doc):
+    del doc["paid"]["daily_metrics"][-3:]
+
+
+@pytest.mark.parametrize("change", [_restate, _reorder, _shrink])
+def test_changed_history_reloads_in_full(source, doc, change):
+    ingestor = Ingestor(source, use_disk_cache=False)
+    total = ingestor.last_stats.rows_read
+    change(doc)
+    # Grow the file as well, which alone would suggest an append.
+    rows = doc["organic"]["daily_metrics"]
+    rows.append(_next_day(rows[-1]))
+    _write(source, doc)
+
+    stats = ingestor.refresh()
+    assert stats.rows_read >= total - 3
+    _assert_same(ingestor.store, MetricsStore.from_json(source))
+
+
+def test_summary_change_rebuilds_summary(source, doc):
+    ingestor = Ingestor(source, use_disk_cache=False)
+    doc["paid"]["campaign_summary"][0]["spend"] = 1.0
+    _write(source, doc)
+    stats = ingestor.refresh()
+    assert stats.rows_appended == 0
+    _assert_same(ingestor.store, MetricsStore.from_json(source))
+
+
+def test_unchanged_source_is_not_read(source):
+    ingestor = Ingestor(source, use_disk_cache=False)
+    assert ingestor.refresh() is None
+
+
+def test_spans_survive_the_disk_cache(tmp_path, source, doc, monkeypatch):
+    monkeypatch.setenv("RECHO_CACHE_DIR", str(tmp_path / "cache"))
+    Ingestor(source, use_disk_cache=True)
+    ingestor = Ingestor(source, use_disk_cache=True)
+    assert ingestor.last_stats.from_cache
+    rows = doc["paid"]["daily_metrics"]
+    rows.append(_next_day(rows[-1]))
+    _write(source, doc)
+
+    stats = ingestor.refresh()
+    assert stats.rows_appended == 1
+    _assert_same(ingestor.store, MetricsStore.from_json(source))
+
+
+def test_refresh_links_unchanged_sections(tmp_path, source, doc, monkeypatch):
+    monkeypatch.setenv("RECHO_CACHE_DIR", str(tmp_path / "cache"))
+    incoming = tmp_path / "incoming"
+    incoming.mkdir()
+    Ingestor(source, use_disk_cache=True, incoming=str(incoming))
+    ingestor = Ingestor(source, use_disk_cache=True, incoming=str(incoming))
+    assert ingestor.last_stats.from_cache
+    old = ingestor._entry[1]
+    row = _next_day(doc["organic"]["daily_metrics"][-1])
+    (incoming / "0001.json").write_text(json.dumps({"organic": {"daily_metrics": [row]}}))
+
+    ingestor.refresh()
+    new = ingestor._entry[1]
+    assert new != old
+
+    def inode(entry, section):
+        return os.stat(os.path.join(entry, section, "c0.npy")).st_ino
+
+    # Only the section that grew is written again.
+    assert inode(new, "organic.daily_metrics") != inode(old, "organic.daily_metrics")
+    for section in ingestor.store.sections:
+        if section != "organic.daily_metrics" and os.path.exists(os.path.join(old, section, "c0.npy")):
+            assert inode(new, section) == inode(old, section), section
+
+    doc["organic"]["daily_metrics"].append(row)
+    reference = tmp_path / "reference.json"
+    _write(str(reference), doc)
+    reread = Ingestor(source, use_disk_cache=True, incoming=str(incoming))
+    assert reread.last_stats.from_cache
+    _assert_same(reread.store, MetricsStore.from_json(str(reference)))
+
+
+def test_ndjson_append(tmp_path, source, doc):
+    out = str(tmp_path / "ndjson")
+    split_to_ndjson(source, out)
+    ingestor = Ingestor(out, use_disk_cache=False)
+    _assert_same(ingestor.store, MetricsStore.from_json(source))
+
+    row = _next_day(doc["paid"]["daily_metrics"][-1])
+    with open(os.path.join(out, "paid.daily_metrics.ndjson"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(row) + "\n")
+    doc["paid"]["daily_metrics"].append(row)
+    _write(source, doc)
+
+    stats = ingestor.refresh()
+    assert stats.rows_read == stats.rows_appended == 1
+    _assert_same(ingestor.store, MetricsStore.from_json(source))
+
+
+def test_batches_append_dated_rows(tmp_path, source, doc):
+    incoming = tmp_path / "incoming"
+    incoming.mkdir()
+    ingestor = Ingestor(source, use_disk_cache=False, incoming=str(incoming))
+    row = _next_day(doc["organic"]["daily_metrics"][-1])
+    (incoming / "0001.json").write_text(json.dumps({"organic": {"daily_metrics": [row]}}))
+
+    stats = ingestor.refresh()
+    assert stats.batches_applied == 1
+    doc["organic"]["daily_metrics"].append(row)
+    _write(source, doc)
+    frame = ingestor.store.frame("organic.daily_metrics")
+    pd.testing.assert_frame_equal(
+        frame.reset_index(drop=True),
+        MetricsStore.from_json(source).frame("organic.daily_metrics").reset_index(drop=True),
+        check_dtype=False,
+        check_categorical=False,
+    )
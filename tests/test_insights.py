@@ -0,0 +1,122 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recho import insights
+from recho.insights import WEEK, Insights, InsightsWorker, compute, cpa_over_target, pct_change
+from recho.sources import FrameQueries
+
+
+def test_pct_change():
+    assert pct_change(120, 100) == pytest.approx(20)
+    assert pct_change(-50, -100) == pytest.approx(50)
+    assert np.isnan(pct_change(1, 0))
+    assert np.isnan(pct_change(1, None))
+
+
+def test_weekly_changes_match_pandas(store):
+    found = compute(FrameQueries(store))
+    df = store.frame("paid.daily_metrics")
+    days = df["date"].dt.floor("D")
+    end = days.max()
+    this = df[days > end - pd.Timedelta(days=WEEK)]
+    last = df[(days > end - pd.Timedelta(days=2 * WEEK)) & (days <= end - pd.Timedelta(days=WEEK))]
+    assert found.week_end == end
+    for measure in ("spend", "revenue", "conversions"):
+        want = (this[measure].sum(), last[measure].sum())
+        assert found.changes[measure][:2] == pytest.approx(want)
+        assert found.changes[measure][2] == pytest.approx(pct_change(*want))
+    assert found.summary == ""
+    assert found.actions and all(a["Deadline"] for a in found.actions)
+
+
+def test_cpa_over_target():
+    campaigns = pd.DataFrame({
+        "campaign_name": ["a", "b", "c"],
+        "spend": [100.0, 300.0, 50.0],
+        "conversions": [10, 5, 0],
+    })
+    over = cpa_over_target(campaigns, target=20)
+    assert list(over["campaign_name"]) == ["b"]
+    assert over["cpa"].iloc[0] == pytest.approx(60)
+
+
+# ============================================================================
+# WORKER
+# ============================================================================
+class _Data:
+    def __init__(self, version):
+        self.data_version = version
+
+    def load(self, sections):
+        pass
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    """Holds every compute() until set; counts the calls."""
+    release = threading.Event()
+    calls = []
+
+    def fake(data, target=None):
+        calls.append(data.data_version)
+        assert release.wait(10)
+        if data.data_version == "broken":
+            raise RuntimeError("bad data")
+        return Insights(version=data.data_version)
+
+    monkeypatch.setattr(insights, "compute", fake)
+    release.calls = calls
+    return release
+
+
+def test_one_job_per_version(gate):
+    worker = InsightsWorker(summarize=lambda found: f"summary of {found.version}")
+    first = worker.request(_Data("v1"))
+    assert worker.request(_Data("v1")) is first
+    # Nothing is ready yet: pages get a placeholder instead of waiting.
+    assert worker.latest() is None
+    gate.set()
+    assert first.result(10).summary == "summary of v1"
+    assert worker.latest().version == "v1"
+    assert gate.calls == ["v1"]
+
+
+def test_latest_keeps_serving_the_previous_version(gate):
+    worker = InsightsWorker()
+    gate.set()
+    worker.request(_Data("v1")).result(10)
+    gate.clear()
+    pending = worker.request(_Data("v2"))
+    assert worker.latest().version == "v1"
+    gate.set()
+    pending.result(10)
+    assert worker.latest().version == "v2"
+
+
+def test_failed_job_is_skipped_and_can_rerun(gate):
+    worker = InsightsWorker()
+    gate.set()
+    worker.request(_Data("v1")).result(10)
+    broken = worker.request(_Data("broken"))
+    with pytest.raises(RuntimeError):
+        broken.result(10)
+    assert worker.latest().version == "v1"
+    rerun = worker.refresh(_Data("broken"))
+    assert rerun is not broken
+    with pytest.raises(RuntimeError):
+        rerun.result(10)
+    assert gate.calls.count("broken") == 2
+
+
+def test_only_recent_versions_are_kept(gate):
+    worker = InsightsWorker(keep=2)
+    gate.set()
+    futures = [worker.request(_Data(f"v{i}")) for i in range(3)]
+    for future in futures:
+        future.result(10)
+    assert list(worker._jobs) == ["v1", "v2"]
+    # An evicted version runs again when it is requested again.
+    assert worker.request(_Data("v0")) is not futures[0]
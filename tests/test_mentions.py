@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recho.filters import Filters
+from recho.mentions import (
+    EWMA_SPAN,
+    MENTIONS,
+    OWN_BRAND,
+    WARMUP_DAYS,
+    build_report,
+    changepoints,
+    ewma,
+    ewma_zscores,
+    robust_z,
+)
+from recho.rollups import daily_sums
+from recho.sources import FrameQueries
+from recho.store import MetricsStore, build_frame
+
+ALPHA = 2 / (EWMA_SPAN + 1)
+
+
+def _counts(n=120, seed=0):
+    return np.random.default_rng(seed).poisson(20, n).astype(np.float64)
+
+
+def _reference_zscores(counts):
+    """The EWMA mean and (biased) variance by their recurrences, one day at a time."""
+    mean, var = counts[0], 0.0
+    baseline = np.full(len(counts), np.nan)
+    z = np.full(len(counts), np.nan)
+    for t in range(1, len(counts)):
+        if t >= WARMUP_DAYS:
+            baseline[t] = mean
+            z[t] = (counts[t] - mean) / max(np.sqrt(var), np.sqrt(max(mean, 1)))
+        var = (1 - ALPHA) * (var + ALPHA * (counts[t] - mean) ** 2)
+        mean = ALPHA * counts[t] + (1 - ALPHA) * mean
+    return baseline, z
+
+
+def test_ewma_matches_recurrence():
+    counts = _counts()
+    want = [counts[0]]
+    for value in counts[1:]:
+        want.append(ALPHA * value + (1 - ALPHA) * want[-1])
+    np.testing.assert_allclose(ewma(counts), want)
+    # Columns of a 2-D array are independent series.
+    both = np.column_stack([counts, counts[::-1]])
+    np.testing.assert_allclose(ewma(both)[:, 1], ewma(counts[::-1]))
+
+
+def test_ewma_zscores_match_recurrence():
+    counts = _counts()
+    baseline, z = ewma_zscores(counts)
+    want_baseline, want_z = _reference_zscores(counts)
+    np.testing.assert_allclose(baseline, want_baseline)
+    np.testing.assert_allclose(z, want_z)
+    assert np.isnan(z[:WARMUP_DAYS]).all()
+
+    grid = np.column_stack([counts, _counts(seed=1)])
+    np.testing.assert_allclose(ewma_zscores(grid)[1][:, 1], _reference_zscores(grid[:, 1])[1])
+
+
+def test_quiet_series_is_floored_at_poisson_noise():
+    counts = np.zeros(40)
+    counts[30] = 1
+    _, z = ewma_zscores(counts)
+    # One mention after weeks of silence is one standard deviation, not infinity.
+    assert z[30] == pytest.approx(1.0)
+
+
+def test_changepoints_find_a_level_shift():
+    rng = np.random.default_rng(2)
+    values = np.concatenate([rng.poisson(10, 60), rng.poisson(40, 60)]).astype(np.float64)
+    at, before, after = changepoints(values)
+    assert len(at) == 1
+    assert abs(at[0] - 60) <= 2
+    assert before[0] == pytest.approx(10, abs=3)
+    assert after[0] == pytest.approx(40, abs=5)
+
+
+def test_changepoints_ignore_noise_and_short_series():
+    assert not len(changepoints(_counts(200))[0])
+    assert not len(changepoints(np.arange(10.0))[0])
+
+
+def test_robust_z():
+    values = np.array([1.0, 2.0, 3.0, 4.0, 100.0])
+    mad = 1.4826 * np.median(np.abs(values - 3.0))
+    np.testing.assert_allclose(robust_z(values), (values - 3.0) / mad)
+    assert np.isnan(robust_z(np.ones(5))).all()
+
+
+# ============================================================================
+# DAILY SUMS
+# ============================================================================
+def _groupby(df, by, measures):
+    grouped = df.assign(day=df["date"].dt.floor("D")).groupby(["day", *by], observed=True)
+    out = grouped[list(measures)].sum()
+    out.insert(0, "rows", grouped.size())
+    return out.reset_index()
+
+
+def _assert_sums(got, want, by):
+    got = got.sort_values(["day", *by], ignore_index=True)
+    want = want.sort_values(["day", *by], ignore_index=True)
+    for col in by:
+        got[col] = got[col].astype(str)
+        want[col] = want[col].astype(str)
+    pd.testing.assert_frame_equal(got, want, check_dtype=False)
+
+
+@pytest.mark.parametrize("by", [(), ("brand",), ("brand", "subreddit")])
+def test_daily_sums_match_groupby(store, by):
+    df = store.frame(MENTIONS)
+    measures = ("upvotes", "sentiment_score")
+    got = daily_sums(store).get(MENTIONS, "date", by, measures)
+    _assert_sums(got, _groupby(df, by, measures), by)
+
+
+def test_daily_sums_add_appended_rows(store):
+    full = store.frame(MENTIONS)
+    head, tail = full.iloc[:4_000], full.iloc[4_000:].copy()
+    # New values and days before the first one must fit into the grid too.
+    tail.loc[tail.index[:50], "date"] = full["date"].min() - pd.Timedelta(days=3)
+    tail["brand"] = tail["brand"].cat.add_categories(["New Brand"])
+    tail.loc[tail.index[50:80], "brand"] = "New Brand"
+
+    partial = MetricsStore({MENTIONS: head.reset_index(drop=True)}, {})
+    by, measures = ("brand",), ("upvotes",)
+    daily_sums(partial).get(MENTIONS, "date", by, measures)
+    partial.update(appended={MENTIONS: tail.reset_index(drop=True)})
+    got = daily_sums(partial).get(MENTIONS, "date", by, measures)
+    _assert_sums(got, _groupby(pd.concat([head, tail]), by, measures), by)
+
+
+# ============================================================================
+# REPORT
+# ============================================================================
+def _mentions(counts, brand=OWN_BRAND, first_day="2026-01-01"):
+    days = pd.Timestamp(first_day) + pd.to_timedelta(np.repeat(np.arange(len(counts)), counts.astype(int)), unit="D")
+    return pd.DataFrame({
+        "date": days,
+        "brand": brand,
+        "subreddit": "r/test",
+        "sentiment": "positive",
+        "sentiment_score": 0.75,
+        "upvotes": 1,
+        "comments": 0,
+    })
+
+
+def test_report_flags_injected_spike():
+    counts = 20.0 + np.random.default_rng(4).integers(-3, 4, 90)
+    counts[80] = 200
+    rows = pd.concat([_mentions(counts), _mentions(_counts(90, seed=3), brand="Competitor A")])
+    store = MetricsStore({MENTIONS: build_frame(rows.to_dict("records"), MENTIONS)}, {})
+    report = build_report(FrameQueries(store), Filters("Last 30 Days"))
+
+    assert report.mentions == counts[-30:].sum()
+    assert report.previous_mentions == counts[-60:-30].sum()
+    assert report.sentiment == pytest.approx(0.75)
+    assert list(report.spikes["date"]) == [pd.Timestamp("2026-01-01") + pd.Timedelta(days=80)]
+    assert report.daily["spike"].sum() == 1
+    assert report.share_of_voice["share"].sum() == pytest.approx(100)
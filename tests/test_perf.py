@@ -0,0 +1,89 @@
+import contextvars
+import gc
+import tracemalloc
+
+import pytest
+
+from recho import perf
+
+
+@pytest.fixture(autouse=True)
+def _no_env(monkeypatch):
+    monkeypatch.setattr(perf, "PERF_ENV", "")
+    monkeypatch.setattr(perf, "PERF_FILE", None)
+    assert not tracemalloc.is_tracing()
+
+
+def test_mode():
+    assert perf.mode(None) == ""
+    assert perf.mode("0") == ""
+    assert perf.mode("1") == "1"
+    assert perf.mode("yes") == "1"
+    assert perf.mode("Memory") == perf.MEMORY
+
+
+def test_off_path_records_nothing(monkeypatch):
+    monkeypatch.setattr(perf, "CACHE_TOTALS", {})
+    assert perf.begin(None) is None
+    assert perf.span("query", rows=1) is perf._NOOP
+    perf.cache_event("figure", True)
+    assert perf.CACHE_TOTALS == {}
+
+
+def test_spans_nest_and_count_caches(monkeypatch):
+    monkeypatch.setattr(perf, "CACHE_TOTALS", {})
+    trace = perf.begin("1", page="overview")
+    with perf.span("load"):
+        with perf.span("query", section="paid.daily_metrics") as inner:
+            inner.set(rows=3)
+    perf.cache_event("figure", False)
+    perf.cache_event("figure", True)
+    perf.end(trace)
+
+    by_name = {s.name: s for s in trace.spans}
+    assert by_name["query"].parent == by_name["load"].span_id
+    assert by_name["query"].depth == 2
+    assert by_name["query"].attributes == {"section": "paid.daily_metrics", "rows": 3}
+    assert by_name["rerun"].attributes == {"page": "overview"}
+    assert trace.caches["figure"] == {"hit": 1, "miss": 1}
+    assert perf.CACHE_TOTALS["figure"] == {"hit": 1, "miss": 1}
+    # The rerun is over: later spans are no-ops again.
+    assert perf.span("late") is perf._NOOP
+
+
+def test_memory_mode_stops_tracing_after_end():
+    trace = perf.begin(perf.MEMORY)
+    assert tracemalloc.is_tracing()
+    with perf.span("alloc"):
+        blob = [0] * 100_000
+    perf.end(trace)
+    assert not tracemalloc.is_tracing()
+    assert next(s for s in trace.spans if s.name == "alloc").alloc >= 8 * len(blob)
+
+
+def test_overlapping_memory_traces_share_tracing():
+    first = perf.begin(perf.MEMORY)
+    # Another session's rerun, on its own context.
+    second = contextvars.copy_context().run(perf.begin, perf.MEMORY)
+    perf.end(first)
+    # Still needed by the rerun that has not ended.
+    assert tracemalloc.is_tracing()
+    perf.end(second)
+    assert not tracemalloc.is_tracing()
+
+
+def test_abandoned_memory_trace_stops_tracing():
+    perf.begin(perf.MEMORY)
+    # A rerun cut short by st.stop() never calls end().
+    perf._current.set(None)
+    gc.collect()
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracing_started_elsewhere_is_left_on():
+    tracemalloc.start()
+    try:
+        perf.end(perf.begin(perf.MEMORY))
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.raw import generate
+from recho import pipeline
+from recho.filters import Filters
+from recho.ingest import Ingestor
+from recho.sources import SqliteSource
+
+from conftest import SEED
+
+
+@pytest.fixture(scope="module")
+def raw_dir(tmp_path_factory):
+    return generate(1, SEED, str(tmp_path_factory.mktemp("raw") / "raw"), per_account=50, n_mentions=500, n_users=100, parts=3)
+
+
+def _build(raw_dir, out, **kwargs):
+    pipeline.build(raw_dir, str(out), **kwargs)
+    return Ingestor(str(out), use_disk_cache=False).store
+
+
+@pytest.fixture(scope="module")
+def built(raw_dir, tmp_path_factory):
+    return _build(raw_dir, tmp_path_factory.mktemp("built") / "out", workers=1, shards=1)
+
+
+def _raw(raw_dir, name):
+    return pd.concat([pipeline.read_raw(name, path) for path in pipeline.find_inputs(raw_dir)[name]], ignore_index=True)
+
+
+def _assert_same(a, b):
+    assert sorted(a.sections) == sorted(b.sections)
+    for section in a.sections:
+        pd.testing.assert_frame_equal(
+            a.frame(section), b.frame(section), check_dtype=False, check_categorical=False, obj=section
+        )
+    assert a.values == pytest.approx(b.values)
+
+
+@pytest.mark.parametrize("workers, shards", [(1, 7), (2, 3)])
+def test_output_does_not_depend_on_workers_or_shards(raw_dir, built, tmp_path, workers, shards):
+    _assert_same(_build(raw_dir, tmp_path / "out", workers=workers, shards=shards), built)
+
+
+def test_byte_range_map_tasks(raw_dir, built, tmp_path, monkeypatch):
+    # NDJSON parts split into many ranges must read every line exactly once.
+    monkeypatch.setattr(pipeline, "MAP_BYTES", 4096)
+    _assert_same(_build(raw_dir, tmp_path / "out", workers=1, shards=2), built)
+
+
+def test_sqlite_output(raw_dir, built, tmp_path):
+    path = tmp_path / "metrics.db"
+    pipeline.build(raw_dir, str(path), workers=1, shards=2)
+    sql = SqliteSource(str(path)).queries()
+    for section in built.sections:
+        pd.testing.assert_frame_equal(
+            sql.view(section, Filters("All Time")).reset_index(drop=True),
+            built.frame(section),
+            check_dtype=False,
+            check_categorical=False,
+            obj=section,
+        )
+
+
+def test_paid_sums_match_raw_ad_days(raw_dir, built):
+    ads = _raw(raw_dir, "ad_days")
+    measures = ["impressions", "clicks", "spend", "conversions", "revenue"]
+    want = ads.groupby(["date", "campaign_name", "subreddit"], observed=True)[measures].sum().reset_index()
+    got = built.frame("paid.daily_metrics")[["date", "campaign_name", "subreddit", *measures]]
+    pd.testing.assert_frame_equal(
+        got.sort_values(["date", "campaign_name", "subreddit"], ignore_index=True).astype({"campaign_name": str, "subreddit": str}),
+        want.sort_values(["date", "campaign_name", "subreddit"], ignore_index=True).astype({"campaign_name": str, "subreddit": str}),
+        check_dtype=False,
+    )
+
+    summary = built.frame("paid.campaign_summary").set_index("campaign_name")
+    by_campaign = ads.groupby("campaign_name", observed=True)[measures].sum()
+    for campaign, sums in by_campaign.iterrows():
+        for measure in measures:
+            assert summary.loc[campaign, measure] == pytest.approx(sums[measure])
+        assert summary.loc[campaign, "roas"] == pytest.approx(sums["revenue"] / sums["spend"])
+
+
+def test_organic_sums_match_raw_posts(raw_dir, built):
+    posts = _raw(raw_dir, "posts")
+    per_day = posts.groupby(posts["post_date"].dt.floor("D")).agg(posts=("post_id", "size"), karma=("karma", "sum"))
+    daily = built.frame("organic.daily_metrics").set_index("date")
+    # Days without posts are written as zeros.
+    assert daily["posts"].sum() == len(posts)
+    pd.testing.assert_series_equal(
+        daily.loc[per_day.index, "posts"], per_day["posts"], check_dtype=False, check_names=False
+    )
+    assert daily["karma"].sum() == posts["karma"].sum()
+
+    accounts = built.frame("accounts.comparison").set_index("account_name")
+    for account, n in posts.groupby("account_name", observed=True).size().items():
+        assert accounts.loc[account, "total_posts"] == n
+
+
+def test_raw_rows_are_kept(raw_dir, built):
+    assert len(built.frame("brand.mentions")) == len(_raw(raw_dir, "mentions"))
+    sessions = _raw(raw_dir, "sessions")
+    touchpoints = built.frame("traffic.touchpoints")
+    assert len(touchpoints) == len(sessions)
+    assert touchpoints["conversions"].sum() == sessions["conversions"].sum()
+
+
+def test_shard_ids_are_stable():
+    values = pd.Series(["a", "b", "c", None, "a"])
+    ids = pipeline.shard_ids(values, 4)
+    assert ids[0] == ids[4]
+    assert ((ids >= 0) & (ids < 4)).all()
+    # The same names land in the same shard whatever else is in the file.
+    np.testing.assert_array_equal(pipeline.shard_ids(pd.Series(["c", "a"]), 4), ids[[2, 0]])
+    assert not pipeline.shard_ids(values, 1).any()
+
+
+def test_missing_required_export(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        pipeline.build(str(tmp_path), str(tmp_path / "out"), workers=1)
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recho.ranking import SCAN_BLOCK, Rankings, top_k
+from recho.store import MetricsStore
+
+SECTION = "organic.top_posts"
+
+
+def _posts(n, seed=0, first_day="2026-01-01"):
+    rng = np.random.default_rng(seed)
+    upvotes = rng.integers(0, 500, n).astype(np.float64)
+    # Plenty of ties and a few missing values.
+    upvotes[rng.random(n) < 0.02] = np.nan
+    return pd.DataFrame({
+        "post_date": pd.Timestamp(first_day) + pd.to_timedelta(rng.integers(0, 90, n), unit="D"),
+        "account_name": pd.Categorical(rng.choice(["a", "b", "c", "d"], n, p=[0.85, 0.1, 0.04, 0.01])),
+        "subreddit": pd.Categorical(rng.choice([f"r/{i}" for i in range(12)], n)),
+        "upvotes": upvotes,
+    })
+
+
+def _reference(df, metric, k, start=None, end=None, **dims):
+    """Positions of the k largest, NaN last and ties in row order, by a full sort."""
+    keep = np.ones(len(df), dtype=bool)
+    if start is not None:
+        dates = df["post_date"].to_numpy(dtype="datetime64[ns]").view("i8")
+        keep &= (dates >= start) & (dates <= end)
+    for dim, values in dims.items():
+        if values:
+            keep &= df[dim].isin(values).to_numpy()
+    positions = np.flatnonzero(keep)
+    values = df[metric].to_numpy()[positions]
+    order = np.lexsort((positions, np.isnan(values), -np.nan_to_num(values, nan=0.0)))
+    return positions[order][:k]
+
+
+def _ns(day):
+    return pd.Timestamp(day).value
+
+
+@pytest.mark.parametrize("ascending", [False, True])
+@pytest.mark.parametrize("k", [0, 1, 5, 50, 10_000])
+def test_top_k_matches_a_full_sort(k, ascending):
+    values = np.random.default_rng(1).integers(0, 20, 2_000).astype(np.float64)
+    values[::97] = np.nan
+    keys = np.where(np.isnan(values), np.inf, values if ascending else -values)
+    want = np.argsort(keys, kind="stable")[:k]
+    np.testing.assert_array_equal(top_k(values, k, ascending), want)
+
+
+QUERIES = [
+    {},
+    {"start": _ns("2026-02-01"), "end": _ns("2026-02-07 23:59:59")},
+    {"account_name": ["d"]},
+    {"account_name": ["c", "d"], "start": _ns("2026-03-01"), "end": _ns("2026-03-31")},
+    {"account_name": ["b", "d"], "subreddit": ["r/3", "r/7"]},
+    {"account_name": ["nobody"]},
+]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+@pytest.mark.parametrize("k", [1, 10, 300])
+def test_rankings_match_a_full_sort(query, k):
+    # Enough rows that selective queries scan several growing blocks.
+    df = _posts(20 * SCAN_BLOCK)
+    store = MetricsStore({SECTION: df}, {})
+    got = Rankings(store).top(SECTION, "upvotes", k, **query)
+    np.testing.assert_array_equal(got, _reference(df, "upvotes", k, **query))
+
+
+def test_appended_rows_are_merged():
+    df = _posts(3 * SCAN_BLOCK)
+    store = MetricsStore({SECTION: df}, {})
+    rankings = Rankings(store)
+    rankings.top(SECTION, "upvotes", 10)
+
+    # New rows, with a new account among them.
+    new = _posts(500, seed=2, first_day="2026-03-15")
+    new["account_name"] = new["account_name"].cat.rename_categories({"d": "e"})
+    store.update(appended={SECTION: new})
+    full = store.frame(SECTION)
+    for query in QUERIES + [{"account_name": ["e"]}]:
+        got = rankings.top(SECTION, "upvotes", 40, **query)
+        np.testing.assert_array_equal(got, _reference(full, "upvotes", 40, **query))
+
+
+def test_replaced_section_is_ranked_again():
+    store = MetricsStore({SECTION: _posts(1_000)}, {})
+    rankings = Rankings(store)
+    rankings.top(SECTION, "upvotes", 10)
+    replaced = _posts(800, seed=3)
+    store.update(replaced={SECTION: replaced})
+    np.testing.assert_array_equal(rankings.top(SECTION, "upvotes", 10), _reference(replaced, "upvotes", 10))
@@ -0,0 +1,79 @@
+import json
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from recho.ingest import Ingestor
+from recho.refresh import Watcher, incoming_dir
+
+
+@pytest.fixture
+def watcher(tmp_path, metrics_json):
+    incoming = tmp_path / "incoming"
+    incoming.mkdir()
+    return Watcher(Ingestor(metrics_json, use_disk_cache=False, incoming=str(incoming)), interval=0.01)
+
+
+def _batch(watcher, name, text):
+    path = os.path.join(watcher.ingestor.incoming, name)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(text)
+    # Renamed into place, as batch writers are told to.
+    os.rename(path + ".tmp", path)
+
+
+def _rows(rows):
+    return json.dumps({"organic": {"daily_metrics": rows}}, default=str)
+
+
+def _next_day(watcher):
+    row = watcher.store.frame("organic.daily_metrics").iloc[-1].to_dict()
+    return {**row, "date": str(row["date"] + pd.Timedelta(days=1))}
+
+
+def test_check_merges_new_batches(watcher):
+    assert watcher.check() is None
+    version = watcher.store.version
+    n_rows = len(watcher.store.frame("organic.daily_metrics"))
+    _batch(watcher, "0001.json", _rows([_next_day(watcher)]))
+
+    stats = watcher.check()
+    assert stats.batches_applied == 1 and stats.rows_appended == 1
+    assert watcher.store.version > version
+    assert len(watcher.store.frame("organic.daily_metrics")) == n_rows + 1
+    assert (watcher.checks, watcher.refreshes) == (2, 1)
+    assert watcher.last_change is not None
+    # Applied once only.
+    assert watcher.check() is None
+
+
+def test_failed_refresh_keeps_the_store(watcher):
+    store = watcher.store
+    _batch(watcher, "0001.json", '{"organic": {"daily')
+    assert watcher.check() is None
+    assert isinstance(watcher.last_error, ValueError)
+    assert watcher.store is store
+    assert watcher.refreshes == 0
+
+
+def test_background_thread_picks_up_batches(watcher):
+    n_rows = len(watcher.store.frame("organic.daily_metrics"))
+    watcher.start()
+    try:
+        _batch(watcher, "0001.json", _rows([_next_day(watcher)]))
+        deadline = time.monotonic() + 10
+        while not watcher.refreshes and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        watcher.stop()
+    assert watcher.refreshes == 1
+    assert len(watcher.store.frame("organic.daily_metrics")) == n_rows + 1
+
+
+def test_incoming_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("RECHO_INCOMING", raising=False)
+    assert incoming_dir(str(tmp_path / "metrics.json")) == str(tmp_path / "incoming")
+    monkeypatch.setenv("RECHO_INCOMING", "/data/batches")
+    assert incoming_dir(str(tmp_path / "metrics.json")) == "/data/batches"
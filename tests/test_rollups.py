@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recho.filters import DATE_RANGES, Filters, filter_index, previous_window
+from recho.rollups import CUBES, MIN_POINTS, RESOLUTIONS, Cube, Rollups, resolution
+
+CUBE_NAMES = list(CUBES)
+
+
+def _rows(store, name, start=None, end=None):
+    section, date_col, _, _ = CUBES[name]
+    df = store.frame(section)
+    if date_col is not None and start is not None:
+        dates = df[date_col].to_numpy(dtype="datetime64[ns]").view("i8")
+        df = df[(dates >= start) & (dates <= end)]
+    return df
+
+
+def _assert_sums(got, df, measures):
+    for measure in measures:
+        assert got[measure] == pytest.approx(df[measure].sum(), rel=1e-9), measure
+
+
+@pytest.mark.parametrize("name", CUBE_NAMES)
+@pytest.mark.parametrize("date_range", list(DATE_RANGES))
+def test_totals_match_pandas(store, name, date_range):
+    filters = Filters(date_range)
+    start, end = filter_index(store).window(filters.days)
+    _assert_sums(Rollups(store).totals(name, filters), _rows(store, name, start, end), CUBES[name][3])
+
+
+def test_account_totals_match_pandas(store):
+    df = store.frame("accounts.comparison")
+    accounts = tuple(df["account_name"].cat.categories[1::2])
+    got = Rollups(store).totals("accounts", Filters("All Time", accounts))
+    _assert_sums(got, df[df["account_name"].isin(accounts)], CUBES["accounts"][3])
+
+
+def test_selections_match_groupby(store):
+    section, date_col, dims, measures = CUBES["paid"]
+    df = store.frame(section)
+    cube = Cube(df, date_col, dims, measures)
+    days = df[date_col].to_numpy(dtype="datetime64[ns]").view("i8")
+    start, end = np.quantile(days, [0.25, 0.75]).astype(np.int64)
+    window = df[(days >= start) & (days <= end)]
+
+    by_campaign = window.groupby("campaign_name", observed=True)[list(measures)].sum()
+    for campaign, sums in by_campaign.iterrows():
+        _assert_sums(cube.total(start, end, campaign_name=[campaign]), sums.to_frame().T, measures)
+
+    campaigns = list(df["campaign_name"].cat.categories[:2])
+    subreddits = list(df["subreddit"].cat.categories[::3])
+    selected = window[window["campaign_name"].isin(campaigns) & window["subreddit"].isin(subreddits)]
+    _assert_sums(cube.total(start, end, campaign_name=campaigns, subreddit=subreddits), selected, measures)
+
+
+def test_integer_measures_stay_integers(store):
+    totals = Rollups(store).totals("organic", Filters("All Time"))
+    assert isinstance(totals["posts"], int)
+
+
+def test_kpis_derived_from_totals(store):
+    totals = Rollups(store).totals("paid", Filters("All Time"))
+    assert totals["roas"] == pytest.approx(totals["revenue"] / totals["spend"])
+    assert totals["cpa"] == pytest.approx(totals["spend"] / totals["conversions"])
+
+
+@pytest.mark.parametrize("date_range", ["Last 7 Days", "Last 30 Days", "Last 90 Days"])
+def test_previous_window_totals(store, date_range):
+    filters = Filters(date_range)
+    start, end = previous_window(*filter_index(store).window(filters.days))
+    got = Rollups(store).totals("organic", filters, previous=True)
+    days = _rows(store, "organic")["date"]
+    if days.min() > pd.Timestamp(start):
+        # The history does not reach back a full window.
+        assert got is None
+    else:
+        _assert_sums(got, _rows(store, "organic", start, end), CUBES["organic"][3])
+
+
+def test_previous_window_needs_full_history(store):
+    rollups = Rollups(store)
+    assert rollups.totals("organic", Filters("All Time"), previous=True) is None
+    # A window that starts on the first day has nothing before it.
+    cube = rollups.cube("organic")
+    assert cube.n_days(*previous_window(cube.days[0], cube.days[-1])) == 0
+
+
+def test_empty_window_totals_are_zero(store):
+    cube = Rollups(store).cube("organic")
+    before = cube.days[0] - 10 * 86_400 * 10**9
+    assert all(value == 0 for value in cube.total(before, before + 1).values())
+    assert cube.n_days(before, before + 1) == 0
+
+
+def test_cube_only_keeps_observed_combinations(store):
+    section, date_col, dims, measures = CUBES["paid"]
+    df = store.frame(section)
+    cube = Cube(df, date_col, dims, measures)
+    pairs = df[list(dims)].drop_duplicates()
+    assert cube._cum["spend"].shape == (df[date_col].dt.floor("D").nunique() + 1, len(pairs))
+
+
+def _buckets(dates, resolution):
+    days = dates.dt.floor("D")
+    if resolution == "week":
+        return days - pd.to_timedelta(days.dt.weekday, unit="D")
+    if resolution == "month":
+        return days.dt.to_period("M").dt.start_time
+    return days
+
+
+@pytest.mark.parametrize("resolution", list(RESOLUTIONS))
+@pytest.mark.parametrize("date_range", list(DATE_RANGES))
+def test_series_match_resample(store, resolution, date_range):
+    filters = Filters(date_range)
+    start, end = filter_index(store).window(filters.days)
+    df = _rows(store, "paid", start, end)
+    measures = list(CUBES["paid"][3])
+    want = df.groupby(_buckets(df["date"], resolution).rename("date"))[measures].sum().reset_index()
+    got = Rollups(store).series("paid", filters, resolution)
+    pd.testing.assert_frame_equal(got, want, check_dtype=False)
+
+
+def test_series_selections(store):
+    section, date_col, dims, measures = CUBES["paid"]
+    df = store.frame(section)
+    campaigns = list(df["campaign_name"].cat.categories[::2])
+    selected = df[df["campaign_name"].isin(campaigns)]
+    want = selected.groupby(_buckets(selected["date"], "week").rename("date"))[list(measures)].sum().reset_index()
+    got = Cube(df, date_col, dims, measures).series("week", campaign_name=campaigns)
+    # Weeks in which only other campaigns ran are zero rows in the cube.
+    got = got[got["date"].isin(want["date"])].reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, want, check_dtype=False)
+
+
+def test_resolution_keeps_enough_points():
+    assert resolution(7) == "day"
+    assert resolution(30) == "day"
+    assert resolution(200) == "week"
+    assert resolution(1_000) == "month"
+    for n_days in (7, 30, 90, 365, 3_000):
+        if n_days >= MIN_POINTS:
+            assert n_days // RESOLUTIONS[resolution(n_days)] >= MIN_POINTS
@@ -0,0 +1,103 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recho import schema
+from recho.ingest import Ingestor
+from recho.schema import COUNT, DATE, MONEY, NAME, RATE, SchemaError, check_values, convert
+from recho.store import build_frame
+
+DTYPES = {DATE: "datetime64[ns]", COUNT: "int32", MONEY: "float64", RATE: "float32"}
+
+
+def test_loaded_sections_have_declared_types(store):
+    for section in store.sections:
+        df = store.frame(section)
+        for col, kind in schema.SECTIONS[section].items():
+            if kind == NAME:
+                assert isinstance(df[col].dtype, pd.CategoricalDtype), (section, col)
+            elif kind in DTYPES:
+                assert df[col].dtype == DTYPES[kind], (section, col)
+
+
+def test_numbers_sent_as_strings_are_converted():
+    issues = set()
+    got = convert("paid.daily_metrics", "clicks", pd.Series(["2247", "3"]), COUNT, issues)
+    assert got.dtype == "int32" and list(got) == [2247, 3]
+    assert issues == {"paid.daily_metrics.clicks: object values converted to numbers"}
+    assert convert("paid.daily_metrics", "spend", pd.Series(["1.5"]), MONEY).dtype == "float64"
+    assert convert("paid.daily_metrics", "ctr", pd.Series([0.25]), RATE).dtype == "float32"
+
+
+def test_counts_widen_or_stay_float():
+    issues = set()
+    big = convert("s", "n", pd.Series([1, 2**40]), COUNT, issues)
+    assert big.dtype == "int64"
+    fractional = convert("s", "f", pd.Series([1.0, 2.5]), COUNT, issues)
+    assert fractional.dtype == "float64"
+    missing = convert("s", "m", pd.Series([1.0, np.nan]), COUNT, issues)
+    assert missing.dtype == "float64"
+    whole = convert("s", "w", pd.Series([1.0, 2.0]), COUNT, issues)
+    assert whole.dtype == "int32"
+    assert issues == {
+        "s.n: counts beyond int32, widened to int64",
+        "s.f: fractional counts, kept as float64",
+        "s.m: missing counts, kept as float64",
+        "s.w: counts sent as floats",
+    }
+
+
+def test_unconvertible_values_raise():
+    with pytest.raises(SchemaError, match="not a number: 'n/a'"):
+        convert("paid.daily_metrics", "clicks", pd.Series(["1", "n/a"]), COUNT)
+    with pytest.raises(SchemaError, match="not a date"):
+        convert("paid.daily_metrics", "date", pd.Series(["2026-01-01", "soon"]), DATE)
+
+
+def test_undeclared_columns_and_sections_are_reported():
+    issues = set()
+    rows = [{"date": "2026-01-01", "posts": 1, "extra": "x"}]
+    df = build_frame(rows, "organic.daily_metrics", issues)
+    assert df["date"].dtype == "datetime64[ns]"
+    assert df["posts"].dtype == "int32"
+    assert "organic.daily_metrics.extra: column not in schema" in issues
+    assert "organic.daily_metrics.karma: column missing" in issues
+
+    issues = set()
+    assert schema.apply("new.section", pd.DataFrame({"a": [1]}), issues) is None
+    assert issues == {"new.section: section not in schema"}
+
+
+def test_check_values():
+    issues = set()
+    checked = check_values({
+        "brand.sentiment_ratio": "0.5",
+        "cross_channel.efficiency.paid.conversions": 12.0,
+        "cross_channel.efficiency.comparison.efficiency_winner": "organic",
+        "something.new": 1,
+    }, issues)
+    assert checked["brand.sentiment_ratio"] == 0.5
+    assert checked["cross_channel.efficiency.paid.conversions"] == 12
+    assert isinstance(checked["cross_channel.efficiency.paid.conversions"], int)
+    assert checked["cross_channel.efficiency.comparison.efficiency_winner"] == "organic"
+    assert issues == {
+        "brand.sentiment_ratio: str value converted to a number",
+        "something.new: value not in schema",
+    }
+    with pytest.raises(SchemaError):
+        check_values({"brand.sentiment_ratio": "high"})
+
+
+def test_bad_batch_keeps_the_last_good_store(tmp_path, metrics_json):
+    incoming = tmp_path / "incoming"
+    incoming.mkdir()
+    ingestor = Ingestor(metrics_json, use_disk_cache=False, incoming=str(incoming))
+    before = ingestor.store.frame("paid.daily_metrics")
+    row = before.iloc[-1].to_dict()
+    row = {**row, "date": str(row["date"] + pd.Timedelta(days=1)), "clicks": "n/a"}
+    (incoming / "0001.json").write_text(json.dumps({"paid": {"daily_metrics": [row]}}, default=str))
+    with pytest.raises(SchemaError):
+        ingestor.refresh()
+    pd.testing.assert_frame_equal(ingestor.store.frame("paid.daily_metrics"), before)
@@ -0,0 +1,54 @@
+import os
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from recho import pages, sources
+
+from conftest import ROOT
+
+APP = os.path.join(ROOT, "app.py")
+
+
+def test_concurrent_first_page_loads(monkeypatch):
+    for label in pages.PAGES:
+        monkeypatch.delitem(sys.modules, f"{pages.__name__}.{pages.PAGES[label]}", raising=False)
+    labels = list(pages.PAGES) * 4
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        modules = list(pool.map(pages.load, labels))
+    for label, module in zip(labels, modules):
+        assert module is sys.modules[f"{pages.__name__}.{pages.PAGES[label]}"]
+        assert callable(module.render) and isinstance(module.SECTIONS, tuple)
+
+
+def test_sessions_share_one_source(metrics_json, monkeypatch):
+    opened = []
+
+    class CountingSource(sources.JsonSource):
+        def __init__(self, *args, **kwargs):
+            opened.append(1)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(sources, "JsonSource", CountingSource)
+    monkeypatch.setenv("RECHO_DATA", metrics_json)
+    monkeypatch.setenv("RECHO_DISK_CACHE", "0")
+    st.cache_resource.clear()
+    try:
+        sessions = [AppTest.from_file(APP, default_timeout=60).run() for _ in range(3)]
+        sessions[1].sidebar.radio[0].set_value("💰 Paid Ads").run()
+        for at in sessions:
+            assert not at.exception
+        assert len(opened) == 1
+        # Sessions hold view state only, never a copy of the data.
+        for at in sessions:
+            for key in at.session_state:
+                try:
+                    size = len(pickle.dumps(at.session_state[key]))
+                except Exception:  # widgets can hold unpicklable values
+                    continue
+                assert size < 10_000, key
+    finally:
+        st.cache_resource.clear()
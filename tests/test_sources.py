@@ -0,0 +1,124 @@
+import pandas as pd
+import pytest
+
+from recho.filters import DATE_RANGES, Filters
+from recho.ranking import RANKED
+from recho.rollups import CUBES, RESOLUTIONS
+from recho.sources import FrameQueries, SqliteSource, open_source
+
+
+def _filters(store):
+    accounts = tuple(store.frame("accounts.comparison")["account_name"].cat.categories[:2])
+    return [Filters(date_range) for date_range in DATE_RANGES] + [Filters("Last 30 Days", accounts)]
+
+
+@pytest.fixture(scope="module")
+def backends(store, metrics_db):
+    return FrameQueries(store), SqliteSource(metrics_db).queries()
+
+
+def _assert_frames(a, b):
+    pd.testing.assert_frame_equal(
+        a.reset_index(drop=True), b.reset_index(drop=True), check_dtype=False, check_categorical=False
+    )
+
+
+def test_open_source_picks_backend(metrics_json, metrics_db):
+    assert isinstance(open_source(metrics_db), SqliteSource)
+    assert not isinstance(open_source(metrics_json, watch=False), SqliteSource)
+
+
+def test_sections_and_values(backends):
+    frames, sql = backends
+    assert sorted(frames.sections) == sorted(sql.sections)
+    assert frames.values == sql.values
+
+
+def test_views_and_counts(store, backends):
+    frames, sql = backends
+    for filters in _filters(store):
+        for section in frames.sections:
+            _assert_frames(frames.view(section, filters), sql.view(section, filters))
+            assert frames.count(section, filters) == sql.count(section, filters)
+        assert frames.window(filters) == sql.window(filters)
+
+
+@pytest.mark.parametrize("name", list(CUBES))
+def test_totals(store, backends, name):
+    frames, sql = backends
+    for filters in _filters(store):
+        assert frames.n_days(name, filters) == sql.n_days(name, filters)
+        for previous in (False, True):
+            a, b = frames.totals(name, filters, previous), sql.totals(name, filters, previous)
+            if a is None:
+                assert b is None
+            else:
+                assert a == pytest.approx(b, rel=1e-9)
+
+
+@pytest.mark.parametrize("name", [name for name, cube in CUBES.items() if cube[1] is not None])
+@pytest.mark.parametrize("resolution", list(RESOLUTIONS))
+def test_series(store, backends, name, resolution):
+    frames, sql = backends
+    for filters in _filters(store):
+        _assert_frames(frames.series(name, filters, resolution), sql.series(name, filters, resolution))
+
+
+@pytest.mark.parametrize("sort, limit", [(None, None), ("roas", 3), ("cpa", None)])
+def test_aggregate(store, backends, sort, limit):
+    frames, sql = backends
+    for filters in _filters(store):
+        for by in ("campaign_name", "subreddit"):
+            a = frames.aggregate("paid.daily_metrics", filters, by, sort=sort, limit=limit)
+            b = sql.aggregate("paid.daily_metrics", filters, by, sort=sort, limit=limit)
+            _assert_frames(a, b)
+
+
+@pytest.mark.parametrize("section", list(RANKED))
+def test_top(store, backends, section):
+    frames, sql = backends
+    for filters in _filters(store):
+        for metric in RANKED[section]:
+            _assert_frames(frames.top(section, filters, metric, 5), sql.top(section, filters, metric, 5))
+
+
+def test_daily(backends):
+    frames, sql = backends
+    for by in ((), ("brand",), ("brand", "subreddit")):
+        _assert_frames(
+            frames.daily("brand.mentions", by, ("upvotes", "sentiment_score")),
+            sql.daily("brand.mentions", by, ("upvotes", "sentiment_score")),
+        )
+
+
+def test_distinct(backends):
+    frames, sql = backends
+    assert sorted(frames.distinct("paid.daily_metrics", "campaign_name")) == sorted(
+        sql.distinct("paid.daily_metrics", "campaign_name")
+    )
+
+
+@pytest.mark.parametrize("size", [1, 100, 10**6])
+def test_chunks_cover_the_view(store, backends, size):
+    filters = Filters("Last 90 Days")
+    for queries in backends:
+        chunks = list(queries.chunks("paid.daily_metrics", filters, size))
+        assert all(len(chunk) <= size for chunk in chunks)
+        _assert_frames(pd.concat(chunks), queries.view("paid.daily_metrics", filters))
+
+
+def test_ordered_chunks(backends):
+    order = ("user_id", "date")
+    frames, sql = [
+        pd.concat(queries.chunks("traffic.touchpoints", Filters("All Time"), 97, order=order))
+        for queries in backends
+    ]
+    for chunked in (frames, sql):
+        users = chunked["user_id"].to_numpy()
+        # Each user's rows come together, in date order.
+        assert len(pd.unique(users)) == (users[1:] != users[:-1]).sum() + 1
+        assert chunked.groupby("user_id", observed=True, sort=False)["date"].apply(
+            lambda d: d.is_monotonic_increasing
+        ).all()
+    # The order of the users themselves is up to the backend.
+    _assert_frames(*(chunked.sort_values("user_id", kind="stable") for chunked in (frames, sql)))
@@ -0,0 +1,78 @@
+import json
+
+import pandas as pd
+import pytest
+
+from recho.store import MetricsStore, build_frame, newest_date
+
+
+def test_sections_and_values_match_the_document(store, metrics_json):
+    with open(metrics_json, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    rows = raw["paid"]["daily_metrics"]
+    df = store.frame("paid.daily_metrics")
+    assert len(df) == len(rows)
+    assert df["spend"].sum() == pytest.approx(sum(row["spend"] for row in rows))
+    assert df["date"].iloc[0] == pd.Timestamp(rows[0]["date"])
+    assert store.value("brand.sentiment_ratio") == pytest.approx(raw["brand"]["sentiment_ratio"])
+    assert set(store.value("traffic.assisted_conversions")) == set(raw["traffic"]["assisted_conversions"])
+    with pytest.raises(KeyError):
+        store.value("no.such.value")
+
+
+def test_frames_are_views(store):
+    df = store.frame("paid.daily_metrics")
+    df["spend"] = 0.0
+    df["extra"] = 1
+    fresh = store.frame("paid.daily_metrics")
+    assert fresh["spend"].sum() > 0
+    assert "extra" not in fresh.columns
+
+
+def _small():
+    rows = [{"date": f"2026-01-0{d}", "posts": d} for d in range(1, 4)]
+    return MetricsStore({"organic.daily_metrics": build_frame(rows, "organic.daily_metrics")}, {"brand.sentiment_ratio": 0.5})
+
+
+def test_update_appends_and_replaces():
+    store = _small()
+    version = store.data_version
+    built = store.derived("total", lambda s: s.frame("organic.daily_metrics")["posts"].sum())
+    extra = build_frame([{"date": "2026-01-04", "posts": 4}], "organic.daily_metrics")
+    store.update(appended={"organic.daily_metrics": extra}, values={"brand.sentiment_ratio": 0.6})
+
+    assert store.data_version != version
+    assert list(store.frame("organic.daily_metrics")["posts"]) == [1, 2, 3, 4]
+    assert store.newest_date("organic.daily_metrics") == pd.Timestamp("2026-01-04").value
+    assert store.value("brand.sentiment_ratio") == 0.6
+    # Derived structures are rebuilt on the new rows.
+    assert store.derived("total", lambda s: s.frame("organic.daily_metrics")["posts"].sum()) == built + 4
+    assert store.generation("organic.daily_metrics") == 0
+
+    store.update(replaced={"organic.daily_metrics": extra})
+    assert store.generation("organic.daily_metrics") == 1
+    assert len(store.frame("organic.daily_metrics")) == 1
+
+
+def test_persistent_survives_update():
+    store = _small()
+    marker = store.persistent("index", lambda s: object())
+    store.update(values={"brand.sentiment_ratio": 0.7})
+    assert store.persistent("index", lambda s: object()) is marker
+
+
+def test_lazy_sections_load_on_first_read():
+    calls = []
+    df = build_frame([{"date": "2026-01-01", "posts": 1}], "organic.daily_metrics")
+
+    def load():
+        calls.append(1)
+        return df
+
+    store = MetricsStore({"organic.daily_metrics": load}, {}, {"organic.daily_metrics": newest_date(df)})
+    assert store.newest_date("organic.daily_metrics") == pd.Timestamp("2026-01-01").value
+    assert not store.loaded_sections and not calls
+    store.frame("organic.daily_metrics")
+    store.frame("organic.daily_metrics")
+    assert calls == [1]
+    assert store.loaded_sections == ("organic.daily_metrics",)
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from recho.tables import MONEY, PERCENT, column_config
+
+
+def _app(n_rows, page_size=None, key="campaigns"):
+    import pandas as pd
+
+    from recho.tables import render_table
+
+    df = pd.DataFrame({
+        "campaign_name": [f"c{i}" for i in range(n_rows)],
+        "spend": [float(i) for i in range(n_rows)],
+        "ctr": [0.5] * n_rows,
+        "internal": [0] * n_rows,
+    })
+    kwargs = {} if page_size is None else {"page_size": page_size}
+    render_table(df, ["campaign_name", "spend", "ctr"], key=key, **kwargs)
+
+
+def _run(*args):
+    return AppTest.from_function(_app, args=args, default_timeout=30).run()
+
+
+def test_numbers_stay_numeric():
+    at = _run(5)
+    shown = at.dataframe[0].value
+    assert list(shown.columns) == ["campaign_name", "spend", "ctr"]
+    assert pd.api.types.is_float_dtype(shown["spend"])
+    assert not at.number_input
+
+
+def test_long_tables_are_paged():
+    at = _run(25, 10)
+    assert len(at.dataframe[0].value) == 10
+    at.number_input(key="campaigns_page").set_value(3).run()
+    assert list(at.dataframe[0].value["campaign_name"]) == [f"c{i}" for i in range(20, 25)]
+
+
+def test_paging_needs_a_key():
+    at = _run(25, 10, None)
+    assert "needs a key" in at.exception[0].message
+
+
+def test_column_config():
+    config = column_config(["campaign_name", "spend", "ctr", "internal"], {"ctr": None})
+    assert set(config) == {"campaign_name", "spend", "ctr"}
+    assert config["spend"]["label"] == "Spend"
+    assert config["spend"]["type_config"]["format"] == MONEY
+    assert config["ctr"] is None
+    assert column_config(["ctr"])["ctr"]["type_config"]["format"] == PERCENT
+
+
+@pytest.mark.parametrize("n_rows", [0, 1])
+def test_small_tables(n_rows):
+    assert len(_run(n_rows).dataframe[0].value) == n_rows